@@ -21,27 +21,60 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+#SCSI peripheral device type for CD/DVD/BD drives (see include/scsi/scsi_proto.h).
+TYPE_ROM = 5
+
+#Descriptions for what optical drives can do, most capable first, like lshw's.
+DriveDescriptions = [("Can write DVD-RAM", "DVD-RAM writer"), ("Can write DVD-R", "DVD writer"), ("Can write CD-RW", "CD-R/CD-RW writer"), ("Can write CD-R", "CD-R writer"), ("Can read DVD", "DVD reader")]
+
+#Begin Wrapped Output.
+class WrappedOutput():
+    """A file-like wrapper for lshw's XML output that puts it all inside one root element. Some versions of lshw (eg the one in Ubuntu 12.04 LTS) output several root nodes instead of a list, which isn't well-formed XML."""
+    def __init__(self, File):
+        """Set up the wrapper, keeping any XML declaration at the start"""
+        self.File = File
+        self.Buffer = b""
+        self.Finished = False
+
+        FirstLine = File.readline()
+
+        if FirstLine.lstrip().startswith(b"<?xml"):
+            self.Buffer = FirstLine+b"<lshw>"
+
+        else:
+            self.Buffer = b"<lshw>"+FirstLine
+
+    def read(self, Size=-1):
+        """Return up to Size bytes of the wrapped output"""
+        if self.Buffer == b"" and self.Finished == False:
+            self.Buffer = self.File.read(Size if Size > 0 else -1)
+
+            if self.Buffer == b"":
+                self.Buffer = b"</lshw>"
+                self.Finished = True
+
+        if Size < 0:
+            Size = len(self.Buffer)
+
+        Data = self.Buffer[:Size]
+        self.Buffer = self.Buffer[Size:]
+        return Data
+
+#End Wrapped Output.
 #Begin Main Class.
 class Main():
-    def GetVendor(self, Node):
-        """Get the vendor"""
-        try:
-            return unicode(Node.vendor.string)
+    def GetText(self, Node, Tag):
+        """Get the text of one of the node's own fields (eg vendor), or "Unknown" if it doesn't have it"""
+        Field = Node.find(Tag)
 
-        except AttributeError:
+        if Field == None or Field.text == None:
             return "Unknown"
 
-    def GetProduct(self, Node):
-        """Get the product"""
-        try:
-            return unicode(Node.product.string)
-
-        except AttributeError:
-            return "Unknown"
+        return unicode(Field.text.strip())
 
     def GetDeviceInfo(self, Node):
         """Get Device Information"""
-        HostDisk = unicode(Node.logicalname.string)
+        HostDisk = self.GetText(Node, "logicalname")
 
         #Ignore non-optical devices.
         if "/dev/sr" not in HostDisk and "/dev/cdrom" not in HostDisk and "/dev/dvd" not in HostDisk:
@@ -49,56 +82,159 @@ class Main():
  
         DiskInfo[HostDisk] = {}
         DiskInfo[HostDisk]["Name"] = HostDisk
-        DiskInfo[HostDisk]["Vendor"] = self.GetVendor(Node)
-        DiskInfo[HostDisk]["Product"] = self.GetProduct(Node)
-        DiskInfo[HostDisk]["Description"] = unicode(Node.description.string)
+        DiskInfo[HostDisk]["Vendor"] = self.GetText(Node, "vendor")
+        DiskInfo[HostDisk]["Product"] = self.GetText(Node, "product")
+        DiskInfo[HostDisk]["Description"] = self.GetText(Node, "description")
 
         return HostDisk
 
-    def GetInfo(self, Standalone=False):
-        """Get Disk Information."""
-        logger.info("GetDevInfo: Main().GetInfo(): Preparing to get Disk info...")
+    def ReadSysfsFile(self, Path):
+        """Return the contents of a sysfs attribute without surrounding whitespace, or "Unknown" if it can't be read"""
+        try:
+            with open(Path, "r") as File:
+                Value = unicode(File.read().strip())
 
-        #Run lshw to try and get disk information.
-        logger.debug("GetDevInfo: Main().GetInfo(): Running 'LC_ALL=C lshw -sanitize -class disk -class volume -xml'...")
-        runcmd = subprocess.Popen("LC_ALL=C pkexec lshw -sanitize -class disk -class volume -xml", stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True)
+        except (IOError, OSError, UnicodeDecodeError):
+            return "Unknown"
 
-        #Get the output.
-        stdout, stderr = runcmd.communicate()
+        if Value == "":
+            return "Unknown"
 
-        if Standalone:
-            global DiskInfo
-            DiskInfo = {}
+        return Value
 
-        logger.debug("GetDevInfo: Main().GetInfo(): Done.")
+    def GetDriveCapabilities(self, Path="/proc/sys/dev/cdrom/info"):
+        """Return a dictionary of {drive name: {capability: True/False}} from the kernel's CD-ROM driver, which anyone can read. It has a column for each drive."""
+        Capabilities = {}
 
-        #Parse XML as HTML to support Ubuntu 12.04 LTS. Otherwise output is cut off.
-        self.Output = BeautifulSoup(stdout, "html.parser")
+        try:
+            with open(Path, "r") as File:
+                Lines = File.readlines()
 
-        #Support for Ubuntu 12.04 LTS as that lshw outputs XML differently in that release.
-        if unicode(type(self.Output.list)) == "<type 'NoneType'>":
-            ListOfDevices = self.Output.children
+        except (IOError, OSError):
+            return Capabilities
 
-        else:
-            ListOfDevices = self.Output.list.children
+        Drives = []
+
+        for Line in Lines:
+            if ":" not in Line:
+                continue
+
+            Name, Values = Line.split(":", 1)
+            Values = Values.split()
+
+            if Name == "drive name":
+                Drives = Values
+                Capabilities = dict((Drive, {}) for Drive in Drives)
+
+            elif Name.startswith("Can "):
+                for Drive, Value in zip(Drives, Values):
+                    Capabilities[Drive][Name] = (Value == "1")
+
+        return Capabilities
 
-        #Find the disks.
-        for Node in ListOfDevices:
-            if unicode(type(Node)) != "<class 'bs4.element.Tag'>":
+    def GetDescription(self, Capabilities):
+        """Describe an optical drive from its capabilities"""
+        for Capability, Description in DriveDescriptions:
+            if Capabilities.get(Capability):
+                return Description
+
+        if Capabilities == {}:
+            return "Optical drive"
+
+        return "CD-ROM"
+
+    def GetInfoFromSysfs(self, SysfsPath="/sys/class/block"):
+        """Get information about optical drives from sysfs, which doesn't need root access and doesn't probe the hardware"""
+        logger.debug("GetDevInfo: Main().GetInfoFromSysfs(): Looking for optical drives in "+SysfsPath+"...")
+        Capabilities = self.GetDriveCapabilities()
+
+        for Device in sorted(os.listdir(SysfsPath)):
+            DevicePath = os.path.join(SysfsPath, Device, "device")
+
+            #Partitions and virtual devices don't have a SCSI device type, and other devices aren't optical drives.
+            if self.ReadSysfsFile(os.path.join(DevicePath, "type")) != unicode(TYPE_ROM):
                 continue
 
-            #These are devices.
-            self.GetDeviceInfo(Node)
+            HostDisk = "/dev/"+Device
+            DiskInfo[HostDisk] = {}
+            DiskInfo[HostDisk]["Name"] = HostDisk
+            DiskInfo[HostDisk]["Vendor"] = self.ReadSysfsFile(os.path.join(DevicePath, "vendor"))
+            DiskInfo[HostDisk]["Product"] = self.ReadSysfsFile(os.path.join(DevicePath, "model"))
+            DiskInfo[HostDisk]["Description"] = self.GetDescription(Capabilities.get(Device, {}))
+
+        logger.debug("GetDevInfo: Main().GetInfoFromSysfs(): Done.")
+        return DiskInfo
+
+    def GetInfo(self, Standalone=False):
+        """Get Disk Information, and return it in a new dictionary. Uses sysfs if it's there, and otherwise falls back to lshw, which needs root access."""
+        logger.info("GetDevInfo: Main().GetInfo(): Preparing to get Disk info...")
+
+        #Start again each time, so drives that have been removed aren't returned.
+        global DiskInfo
+        DiskInfo = {}
+
+        if os.path.isdir("/sys/class/block"):
+            self.GetInfoFromSysfs()
+
+        else:
+            logger.info("GetDevInfo: Main().GetInfo(): sysfs isn't available. Falling back to lshw...")
+            self.GetInfoFromLshw()
 
         logger.info("GetDevInfo: Main().GetInfo(): Finished!")
         return DiskInfo
 
+    def GetInfoFromLshw(self):
+        """Get Disk Information from lshw"""
+        #Run lshw to try and get disk information.
+        logger.debug("GetDevInfo: Main().GetInfoFromLshw(): Running 'LC_ALL=C lshw -sanitize -class disk -class volume -xml'...")
+        runcmd = subprocess.Popen("LC_ALL=C pkexec lshw -sanitize -class disk -class volume -xml", stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
+
+        try:
+            self.ParseLshwOutput(runcmd.stdout)
+
+        except SyntaxError as Error:
+            #ElementTree's ParseError is a SyntaxError.
+            logger.error("GetDevInfo: Main().GetInfoFromLshw(): Couldn't parse lshw's output ("+unicode(Error)+")! Using what we found before that...")
+
+        #lshw only writes a few warnings (if any) to stderr, so this can't fill up while we read stdout.
+        stdout, stderr = runcmd.communicate()
+        logger.debug("GetDevInfo: Main().GetInfoFromLshw(): Done.")
+        return DiskInfo
+
+    def ParseLshwOutput(self, File):
+        """Parse lshw's XML output from File as it's read, keeping only the devices we need. The devices are either inside a list, or (in older versions of lshw) root nodes themselves."""
+        #How deep the device nodes are (the wrapper counts as 1), once we've seen the first one.
+        DeviceDepth = None
+        Parents = []
+
+        #cElementTree on Python 2 needs the event names as byte strings.
+        for Event, Element in ElementTree.iterparse(WrappedOutput(File), events=(str("start"), str("end"))):
+            if Event == "start":
+                if DeviceDepth == None and Element.tag == "node":
+                    DeviceDepth = len(Parents) + 1
+
+                Parents.append(Element)
+                continue
+
+            Parents.pop()
+
+            if Element.tag == "node" and len(Parents) + 1 == DeviceDepth:
+                #These are devices. Throw away each one once we've looked at it, so the tree doesn't grow.
+                self.GetDeviceInfo(Element)
+                Parents[-1].remove(Element)
+
 #End Main Class.
 if __name__ == "__main__":
     #Import modules.
     import subprocess
+    import os
     import logging
-    from bs4 import BeautifulSoup
+
+    try:
+        import xml.etree.cElementTree as ElementTree
+
+    except ImportError:
+        import xml.etree.ElementTree as ElementTree
 
     #Set up basic logging to stdout.
     logger = logging
@@ -24,8 +24,22 @@ from __future__ import unicode_literals
 #Import modules.
 import appindicator
 import gtk
+import gobject
 import sys
 import threading
+import json
+
+#Import custom-made modules
+import Tools
+
+from Tools.ipc import Channel
+
+#Setup custom-made modules (make global variables accessible inside the packages).
+Tools.tools.threading = threading
+
+Tools.ipc.json = json
+Tools.ipc.threading = threading
+Tools.ipc.Future = Tools.tools.Future
 
 #Define version here.
 Version = "2.0.2"
@@ -42,43 +56,50 @@ class MainProcessIPCThread(threading.Thread):
     def run(self):
         """Main body of the thread, started with self.start()"""
         while True:
-            try:
-                #Wait for a line.
-                Line = sys.stdin.readline().replace("\n", "")
+            #Wait for a message.
+            Message = self.Parent.Channel.ReadMessage()
 
-                #Notify the main process that we received the line, so it can be logged.
-                if Line != "Quit":
-                    print("Received message: "+Line)
-                    sys.stdout.flush()
+            if Message == None:
+                #The main process has exited.
+                break
 
-                #Process the line.
-                #React to it, if it's commanding us to do anything.
-                if "Status:" in Line:
-                    self.Parent.SetStatus(Line)
+            elif Message["Type"] in ("Text", "Unsupported"):
+                #Ignore lines that aren't messages we understand. They can't be acknowledged, as they don't have IDs.
+                continue
 
-                elif Line == "EnableStartItem":
-                    gtk.Widget.set_sensitive(self.Parent.StartItem, True)
+            #Process the message.
+            #React to it, if it's commanding us to do anything.
+            try:
+                #GTK isn't thread-safe, so changes to the menu are made on its main loop.
+                if Message["Type"] == "SetStatus":
+                    self.Parent.SetStatus("Status: "+Message["Status"])
 
-                elif Line == "DisableStartItem":
-                    gtk.Widget.set_sensitive(self.Parent.StartItem, False)
+                elif Message["Type"] == "SetControls":
+                    if "Start" in Message:
+                        gobject.idle_add(gtk.Widget.set_sensitive, self.Parent.StartItem, Message["Start"])
 
-                elif Line == "EnableStopItem":
-                    gtk.Widget.set_sensitive(self.Parent.StopItem, True)
+                    if "Stop" in Message:
+                        gobject.idle_add(gtk.Widget.set_sensitive, self.Parent.StopItem, Message["Stop"])
 
-                elif Line == "DisableStopItem":
-                    gtk.Widget.set_sensitive(self.Parent.StopItem, False)
+                elif Message["Type"] == "Quit":
+                    self.Parent.Channel.Acknowledge(Message)
+                    break
 
-                elif Line == "Quit":
-                    sys.exit()
+                else:
+                    self.Parent.Channel.Acknowledge(Message, Error="Unknown message type: "+Message["Type"])
+                    continue
 
-            except (AttributeError, IndexError, NameError) as Error:
+            except (AttributeError, IndexError, KeyError, NameError) as Error:
                 #Return the error to the main process, so it can be logged.
-                print("Error occurred! Error: "+unicode(Error))
+                self.Parent.Channel.Acknowledge(Message, Error="Error occurred! Error: "+unicode(Error))
+
+            else:
+                self.Parent.Channel.Acknowledge(Message)
 
 #End Main Process IPC Thread.
 #Begin Indicator class.
 class Indicator:
-    """Indicator for Wine Autostart v"""+Version+""". It is started by WineAutostart.py, and communicates through stdout and stdin.""" 
+    """Indicator for Wine Autostart v"""+Version+""". It is started by WineAutostart.py, and communicates through stdout and stdin, using Tools.ipc's protocol.""" 
     def __init__(self):
         """Set up Wine Autostart """+Version+"""'s indicator"""
         #Create the actual indicator.
@@ -86,12 +107,19 @@ class Indicator:
         self.AppIndicator.set_status(appindicator.STATUS_ACTIVE)
         self.AppIndicator.set_attention_icon("wineautostart")
 
+        #The status shown in the menu, the latest one we've been sent, and whether an update is waiting for GTK's main loop.
+        self.Status = None
+        self.PendingStatus = None
+        self.StatusUpdateQueued = False
+
         #Run the setup methods.
         self.CreateMenus()
         self.BindEvents()
 
-        #Start the IPC thread.
+        #Start the IPC thread, and tell the main process we're ready.
+        self.Channel = Channel(sys.stdin, sys.stdout)
         MainProcessIPCThread(self)
+        self.Channel.Send("Hello", AppVersion=Version)
 
         #Enter GTK's main loop, and prepare for threading.
         gtk.gdk.threads_init()
@@ -177,14 +205,30 @@ class Indicator:
         self.AboutItem.connect("activate", self.SendMessage, "ShowAbout")
         self.QuitItem.connect("activate", self.SendMessage, "Quit")
 
-    def SendMessage(self, Event=None, Message=""):
-        """Writes the contents of Message to stdout"""
-        print(Message)
-        sys.stdout.flush()
+    def SendMessage(self, Event=None, Name=""):
+        """Sends the command Name to the main process"""
+        self.Channel.Send("Command", Name=Name)
 
     def SetStatus(self, Status):
-        """Updates the status menu item with the new status"""
-        self.StatusItem.set_label(Status)
+        """Updates the status menu item with the new status on GTK's main loop. Safe to call from other threads, and several updates in a row only cause one redraw."""
+        self.PendingStatus = Status
+
+        if self.StatusUpdateQueued == False:
+            self.StatusUpdateQueued = True
+            gobject.idle_add(self.UpdateStatus)
+
+    def UpdateStatus(self):
+        """Show the latest status, if it's changed. Runs on GTK's main loop."""
+        #Clear this first, so a status that arrives while we're here queues another update.
+        self.StatusUpdateQueued = False
+        Status = self.PendingStatus
+
+        if Status != self.Status:
+            self.Status = Status
+            self.StatusItem.set_label(Status)
+
+        #Don't call this again.
+        return False
 
 #End Indicator class.
 Indicator()
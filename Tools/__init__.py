@@ -15,3 +15,5 @@
 # You should have received a copy of the GNU General Public License
 # along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
 from . import tools
+from . import iso9660
+from . import ipc
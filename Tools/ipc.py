@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# IPC Protocol for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#The version of the protocol. Change this if messages change in a way the other end won't understand.
+PROTOCOL_VERSION = 1
+
+#The version of the control socket's protocol, and the longest request we'll accept.
+CONTROL_VERSION = 1
+MAX_REQUEST_SIZE = 65536
+
+def GetControlSocketPath():
+    """Return where the control socket is: in the user's runtime directory if there is one, otherwise in a private directory in /tmp"""
+    if "XDG_RUNTIME_DIR" in os.environ:
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "wineautostart", "control.sock")
+
+    return "/tmp/wineautostart-"+unicode(os.getuid())+"/control.sock"
+
+#Begin Channel class.
+class Channel():
+    """One end of the connection between Wine Autostart and its indicator. Each message is a JSON object on its own line, with the protocol Version, its Type, and an ID. Every message apart from acknowledgements ("Ack") is acknowledged once it's been handled, so the sender can wait for that instead of sleeping."""
+    def __init__(self, Input, Output):
+        """Set up the channel. Input and Output are the files (eg pipes) to read and write messages on."""
+        self.Input = Input
+        self.Output = Output
+        self.Lock = threading.Lock()
+        self.WriteLock = threading.Lock()
+        self.NextID = 1
+
+        #Futures for messages that haven't been acknowledged yet, keyed by their IDs.
+        self.Pending = {}
+
+    def Send(self, Type, **Fields):
+        """Send a message of the given Type, with the given fields, and return a future that's done when the other end acknowledges it. Its result is None, or an error message if the other end couldn't handle it. Raises IOError (or ValueError) if the other end has gone."""
+        Result = Future()
+
+        with self.Lock:
+            ID = self.NextID
+            self.NextID += 1
+            self.Pending[ID] = Result
+
+        Fields.update(Version=PROTOCOL_VERSION, Type=Type, ID=ID)
+
+        try:
+            self.Write(Fields)
+
+        except:
+            with self.Lock:
+                self.Pending.pop(ID, None)
+
+            raise
+
+        return Result
+
+    def Acknowledge(self, Message, Error=None):
+        """Tell the other end we've handled Message, or that we couldn't, and why (Error)"""
+        self.Write({"Version": PROTOCOL_VERSION, "Type": "Ack", "ID": Message.get("ID"), "Error": Error})
+
+    def Write(self, Message):
+        """Write one message"""
+        Line = (json.dumps(Message)+"\n").encode("ascii")
+
+        with self.WriteLock:
+            self.Output.write(Line)
+            self.Output.flush()
+
+    def ReadMessage(self):
+        """Wait for the next message, and return it as a dictionary, or None if the other end has gone. Acknowledgements are handled here, and not returned. Lines that aren't messages (eg warnings from libraries) are returned as "Text" messages, and messages from a different version of the protocol as "Unsupported" messages, so they can be logged."""
+        while True:
+            Line = self.Input.readline()
+
+            if not Line:
+                self.Close()
+                return None
+
+            Line = Line.decode("utf-8", "replace").strip()
+
+            if Line == "":
+                continue
+
+            try:
+                Message = json.loads(Line)
+
+            except ValueError:
+                Message = None
+
+            if isinstance(Message, dict) == False or "Type" not in Message:
+                return {"Type": "Text", "Text": Line}
+
+            if Message.get("Version") != PROTOCOL_VERSION:
+                return {"Type": "Unsupported", "Text": Line, "Version": Message.get("Version")}
+
+            if Message["Type"] != "Ack":
+                return Message
+
+            with self.Lock:
+                Result = self.Pending.pop(Message.get("ID"), None)
+
+            if Result != None:
+                Result.SetResult(Message.get("Error"))
+
+    def Close(self):
+        """Give up on any messages that haven't been acknowledged, as they never will be"""
+        with self.Lock:
+            Pending = self.Pending
+            self.Pending = {}
+
+        for Result in Pending.values():
+            Result.SetError(IOError("The other end of the channel has gone"))
+
+#End Channel class.
+#Begin Control Server class.
+class ControlServer():
+    """A Unix domain socket that other local programs (eg scripts) can use to control Wine Autostart. Each request is a JSON object on its own line, with a "Command" and an optional "ID", and gets a JSON object back on its own line, with the same ID, "OK", and either a "Result" or an "Error". Every client is served by its own thread, so a slow client doesn't hold up the others, and Handler is called on those threads with each request. It returns the result, or raises ValueError to refuse the request."""
+    def __init__(self, Path, Handler):
+        """Create the socket at Path, readable only by this user, and start accepting clients. Raises socket.error or OSError if that isn't possible (eg Wine Autostart is already running)."""
+        self.Path = Path
+        self.Handler = Handler
+        self.Closed = False
+
+        if not os.path.isdir(os.path.dirname(Path)):
+            os.makedirs(os.path.dirname(Path), 0o700)
+
+        #Don't use a directory someone else made, as they could replace the socket.
+        if os.stat(os.path.dirname(Path)).st_uid != os.getuid():
+            raise OSError("The control socket's directory ("+os.path.dirname(Path)+") belongs to another user")
+
+        #Remove the socket left behind by a previous run, but not one that's still in use.
+        if os.path.exists(Path):
+            Probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+            try:
+                Probe.connect(Path)
+
+            except socket.error:
+                os.remove(Path)
+
+            else:
+                raise socket.error("Another instance is already listening on "+Path)
+
+            finally:
+                Probe.close()
+
+        self.Socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.Socket.bind(Path)
+        os.chmod(Path, 0o600)
+        self.Socket.listen(16)
+
+        self.Thread = threading.Thread(target=self.Run)
+        self.Thread.daemon = True
+        self.Thread.start()
+
+    def Run(self):
+        """Accept clients until the server is closed, starting a thread for each one"""
+        while True:
+            try:
+                Client = self.Socket.accept()[0]
+
+            except socket.error as Error:
+                if self.Closed:
+                    break
+
+                logger.warning("Tools: ControlServer().Run(): Couldn't accept client ("+unicode(Error)+")...")
+                continue
+
+            Thread = threading.Thread(target=self.Serve, args=(Client,))
+            Thread.daemon = True
+            Thread.start()
+
+    def Serve(self, Client):
+        """Answer requests from one client until it disconnects"""
+        Input = Client.makefile("rb")
+        Output = Client.makefile("wb")
+
+        try:
+            while True:
+                Line = Input.readline(MAX_REQUEST_SIZE+1)
+
+                if not Line:
+                    break
+
+                if len(Line) > MAX_REQUEST_SIZE:
+                    #We can't tell where the next request starts, so give up on this client.
+                    Output.write((json.dumps(self.MakeResponse({}, Error="Request too long"))+"\n").encode("ascii"))
+                    break
+
+                if Line.strip() == b"":
+                    continue
+
+                Output.write((json.dumps(self.HandleRequest(Line))+"\n").encode("ascii"))
+                Output.flush()
+
+        except (socket.error, IOError, OSError) as Error:
+            logger.debug("Tools: ControlServer().Serve(): Client disconnected ("+unicode(Error)+")...")
+
+        finally:
+            for File in (Input, Output, Client):
+                try:
+                    File.close()
+
+                except (socket.error, IOError, OSError):
+                    pass
+
+    def HandleRequest(self, Line):
+        """Decode one request, pass it to the handler, and return the response"""
+        try:
+            Request = json.loads(Line.decode("utf-8"))
+
+        except (ValueError, UnicodeDecodeError):
+            return self.MakeResponse({}, Error="Invalid JSON")
+
+        if isinstance(Request, dict) == False or "Command" not in Request:
+            return self.MakeResponse({}, Error="Requests must be objects with a Command")
+
+        try:
+            return self.MakeResponse(Request, Result=self.Handler(Request))
+
+        except ValueError as Error:
+            return self.MakeResponse(Request, Error=unicode(Error))
+
+        except Exception as Error:
+            logger.error("Tools: ControlServer().HandleRequest(): Error handling "+unicode(Request["Command"])+" request: "+unicode(Error)+"...")
+            return self.MakeResponse(Request, Error="Internal error: "+unicode(Error))
+
+    def MakeResponse(self, Request, Result=None, Error=None):
+        """Return the response to Request, with Result if it worked, or Error if it didn't"""
+        Response = {"Version": CONTROL_VERSION, "ID": Request.get("ID"), "OK": Error == None}
+
+        if Error == None:
+            Response["Result"] = Result
+
+        else:
+            Response["Error"] = Error
+
+        return Response
+
+    def Close(self):
+        """Stop accepting clients, and remove the socket"""
+        self.Closed = True
+
+        try:
+            #Shut it down first to wake up the accept() in self.Run().
+            self.Socket.shutdown(socket.SHUT_RDWR)
+
+        except socket.error:
+            pass
+
+        self.Socket.close()
+
+        #Wait for the accepting thread to notice, so it doesn't outlive the server.
+        self.Thread.join()
+
+        try:
+            os.remove(self.Path)
+
+        except OSError:
+            pass
+
+#End Control Server class.
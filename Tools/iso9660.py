@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ISO9660 Reader for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Escape sequences that mark a supplementary volume descriptor as Joliet (UCS-2 level 1, 2 and 3).
+JolietEscapes = (b"%/@", b"%/C", b"%/E")
+
+#Directory record flags.
+FLAG_DIRECTORY = 0x02
+FLAG_ASSOCIATED = 0x04
+FLAG_MULTI_EXTENT = 0x80
+
+#Begin Entry class.
+class Entry():
+    """A file or directory on the disc. Path is relative to the root of the disc."""
+    def __init__(self, Path, IsDirectory, LBA, Size):
+        """Set up the entry"""
+        self.Path = Path
+        self.IsDirectory = IsDirectory
+        self.LBA = LBA
+        self.Size = Size
+
+#End Entry class.
+#Begin Image class.
+class Image():
+    """Reads the directory tree of an ISO9660 filesystem straight from a block device or an image file, without mounting it. Names are read the same way the Linux kernel does: Rock Ridge if present, otherwise Joliet if present, otherwise plain ISO9660 names in lowercase."""
+    def __init__(self, Path):
+        """Open the device or image file and read its volume descriptors. Raises ValueError if it isn't ISO9660, or IOError/OSError if it can't be read."""
+        self.Path = Path
+        self.File = open(Path, "rb")
+        self.Map = None
+        self.BlockSize = 2048
+
+        #Statistics, for diagnostics and benchmarks. Seek distance is the total number of bytes the drive would have to skip (backwards or forwards) between reads.
+        self.Reads = 0
+        self.BytesRead = 0
+        self.SeekDistance = 0
+        self.Position = 0
+
+        #Directories Walk() couldn't read, and whether it stopped early.
+        self.FailedDirectories = []
+        self.Truncated = False
+
+        #Memory-map image files. Block devices are read with large reads instead, as they can't always be mapped.
+        if os.path.isfile(Path) and os.path.getsize(Path) > 0:
+            self.Map = mmap.mmap(self.File.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.ReadDescriptors()
+
+        except:
+            self.Close()
+            raise
+
+    def Read(self, Offset, Length):
+        """Read Length bytes starting at Offset, in one go"""
+        self.Reads += 1
+        self.SeekDistance += abs(Offset - self.Position)
+
+        if self.Map != None:
+            Data = self.Map[Offset:Offset+Length]
+
+        else:
+            self.File.seek(Offset)
+            Data = self.File.read(Length)
+
+        self.BytesRead += len(Data)
+        self.Position = Offset + len(Data)
+        return Data
+
+    def ReadDescriptors(self):
+        """Find the primary (and Joliet, if any) volume descriptors, and decide which directory tree and naming to use"""
+        Primary = None
+        Joliet = None
+
+        #Volume descriptors start at sector 16, and end with a terminator (type 255).
+        for Sector in range(16, 80):
+            Descriptor = self.Read(Sector * 2048, 2048)
+
+            if len(Descriptor) < 2048 or Descriptor[1:6] != b"CD001":
+                break
+
+            Type = bytearray(Descriptor[0:1])[0]
+
+            if Type == 1 and Primary == None:
+                Primary = Descriptor
+
+            elif Type == 2 and Joliet == None and any(Escape in Descriptor[88:120] for Escape in JolietEscapes):
+                Joliet = Descriptor
+
+            elif Type == 255:
+                break
+
+        if Primary == None:
+            raise ValueError(self.Path+" doesn't contain an ISO9660 filesystem")
+
+        self.BlockSize = struct.unpack("<H", Primary[128:130])[0]
+        self.VolumeLabel = Primary[40:72].decode("ascii", "replace").strip()
+
+        #The kernel prefers Rock Ridge names over Joliet names, so do the same, so our paths match the mounted disc.
+        self.RockRidgeSkip = self.FindRockRidge(Primary)
+
+        if self.RockRidgeSkip != None:
+            self.Descriptor = Primary
+            self.Naming = "rockridge"
+
+        elif Joliet != None:
+            self.Descriptor = Joliet
+            self.Naming = "joliet"
+
+        else:
+            self.Descriptor = Primary
+            self.Naming = "iso9660"
+
+        logger.debug("Iso9660: Image().ReadDescriptors(): "+self.Path+" is ISO9660 (label '"+self.VolumeLabel+"', using "+self.Naming+" names)...")
+
+    def ParseRecords(self, Data):
+        """Parse the directory records in Data, and return a list of (name, LBA, size, flags, system use) tuples, skipping the '.' and '..' records"""
+        Records = []
+        Offset = 0
+
+        while Offset < len(Data):
+            Length = bytearray(Data[Offset:Offset+1])[0]
+
+            if Length == 0:
+                #Records don't cross sector boundaries, so skip to the next sector.
+                Offset = (Offset // self.BlockSize + 1) * self.BlockSize
+                continue
+
+            Record = Data[Offset:Offset+Length]
+            Offset += Length
+
+            if len(Record) < 34:
+                break
+
+            LBA, Size = struct.unpack("<I", Record[2:6])[0], struct.unpack("<I", Record[10:14])[0]
+            Flags = bytearray(Record[25:26])[0]
+            NameLength = bytearray(Record[32:33])[0]
+            Name = Record[33:33+NameLength]
+
+            #The system use area (for Rock Ridge) is after the name, which is padded to an even length.
+            SystemUse = Record[33 + NameLength + (1 - NameLength % 2):]
+
+            Records.append((Name, LBA, Size, Flags, SystemUse))
+
+        return Records
+
+    def FindRockRidge(self, Primary):
+        """Return the number of bytes to skip in each system use area if the primary directory tree has Rock Ridge extensions, or None if it doesn't"""
+        RootLBA = struct.unpack("<I", Primary[158:162])[0]
+        Data = self.Read(RootLBA * self.BlockSize, self.BlockSize)
+
+        #The SUSP 'SP' entry is at the start of the system use area of the root's '.' record.
+        Length = bytearray(Data[0:1])[0]
+        SystemUse = Data[34:Length]
+
+        if SystemUse[0:2] == b"SP" and SystemUse[4:6] == b"\xbe\xef":
+            return bytearray(SystemUse[6:7])[0]
+
+        return None
+
+    def RockRidgeName(self, SystemUse):
+        """Return the Rock Ridge alternate name (NM entries) in the given system use area, or None if there isn't one"""
+        Offset = self.RockRidgeSkip
+        Name = None
+
+        while Offset + 4 <= len(SystemUse):
+            Signature = SystemUse[Offset:Offset+2]
+            Length = bytearray(SystemUse[Offset+2:Offset+3])[0]
+
+            if Length < 4:
+                break
+
+            if Signature == b"NM" and Length >= 5:
+                Flags = bytearray(SystemUse[Offset+4:Offset+5])[0]
+
+                #Ignore the '.' and '..' flags, and join names that are split across more than one entry.
+                if Flags & 0x06 == 0:
+                    Name = (Name or b"") + SystemUse[Offset+5:Offset+Length]
+
+            Offset += Length
+
+        if Name == None:
+            return None
+
+        return Name.decode("utf-8", "replace")
+
+    def DecodeName(self, Name, SystemUse):
+        """Decode a name from a directory record, the same way the kernel shows it when the disc is mounted"""
+        if self.Naming == "rockridge":
+            RockRidge = self.RockRidgeName(SystemUse)
+
+            if RockRidge != None:
+                return RockRidge
+
+        if self.Naming == "joliet":
+            Name = Name.decode("utf-16-be", "replace")
+
+        else:
+            Name = Name.decode("latin-1").lower()
+
+        #Remove the version number (eg ';1'), and the trailing '.' on names without an extension.
+        Name = Name.split(";")[0]
+
+        if self.Naming != "joliet" and Name.endswith("."):
+            Name = Name[:-1]
+
+        return Name
+
+    def ReadPathTable(self):
+        """Read the (little-endian) path table, and return a list of (LBA, parent number, name) tuples for every directory on the disc. Directory numbers start at 1 (the root), and parents always come before their children."""
+        Size = struct.unpack("<I", self.Descriptor[132:136])[0]
+        Location = struct.unpack("<I", self.Descriptor[140:144])[0]
+        Data = self.Read(Location * self.BlockSize, Size)
+
+        Table = []
+        Offset = 0
+
+        while Offset + 8 <= len(Data):
+            NameLength = bytearray(Data[Offset:Offset+1])[0]
+
+            if NameLength == 0:
+                break
+
+            LBA = struct.unpack("<I", Data[Offset+2:Offset+6])[0]
+            Parent = struct.unpack("<H", Data[Offset+6:Offset+8])[0]
+            Name = Data[Offset+8:Offset+8+NameLength]
+
+            Table.append((LBA, Parent, Name))
+            Offset += 8 + NameLength + NameLength % 2
+
+        return Table
+
+    def ReadDirectory(self, LBA):
+        """Read the whole extent of the directory starting at LBA, and return its records. The size comes from the directory's own '.' record."""
+        First = self.Read(LBA * self.BlockSize, self.BlockSize)
+        Size = struct.unpack("<I", First[10:14])[0]
+
+        if Size <= self.BlockSize:
+            return self.ParseRecords(First[:Size])
+
+        return self.ParseRecords(First + self.Read((LBA + 1) * self.BlockSize, Size - self.BlockSize))
+
+    def GetReadOrder(self, Table):
+        """Return the indexes of the directories in Table, in the order they should be read: in order of where they are on the disc, so the drive only ever seeks forwards"""
+        return sorted(range(len(Table)), key=lambda Index: Table[Index][0])
+
+    def GetPathTableOrder(self, Table):
+        """Return the indexes of the directories in Table in path table order (breadth-first), for comparison in benchmarks"""
+        return range(len(Table))
+
+    def GetWalkOrder(self, Table):
+        """Return the indexes of the directories in Table in the order os.walk() reads them from the mounted disc (depth-first, in name order), for comparison in benchmarks"""
+        Children = [[] for Item in Table]
+
+        for Index in range(1, len(Table)):
+            Children[Table[Index][1]-1].append(Index)
+
+        Order = []
+        Stack = [0]
+
+        while Stack != []:
+            Index = Stack.pop()
+            Order.append(Index)
+            Stack.extend(reversed(Children[Index]))
+
+        return Order
+
+    def Walk(self, Order=None, Cancelled=None):
+        """Yield a list of Entry objects for each directory on the disc (its files and subdirectories) as it's read. The path table tells us where every directory is up front, so each directory is read with one or two large reads, in the order given by Order (a function that takes the path table, GetReadOrder() by default). A directory's names can come from its parent's records, so its entries are yielded once the directories above it have been, which means parents always come before their children. Directories that can't be read are skipped, and listed in self.FailedDirectories. If Cancelled (a function) returns True, no more directories are read, and self.Truncated is set."""
+        Table = self.ReadPathTable()
+        self.FailedDirectories = []
+        self.Truncated = False
+
+        if Order == None:
+            Order = self.GetReadOrder
+
+        Children = [[] for Item in Table]
+
+        for Index in range(1, len(Table)):
+            Children[Table[Index][1]-1].append(Index)
+
+        #The full paths of directories whose entries we've yielded or are about to, and the records of directories we've read, but can't yield yet because we don't know their paths.
+        Paths = {0: ""}
+        Waiting = {}
+
+        for Index in Order(Table):
+            if Cancelled != None and Cancelled():
+                self.Truncated = True
+                break
+
+            try:
+                Records = self.ReadDirectory(Table[Index][0])
+
+            except (IOError, OSError, struct.error) as Error:
+                logger.warning("Iso9660: Image().Walk(): Couldn't read the directory at sector "+unicode(Table[Index][0])+" ("+unicode(Error)+"). Skipping it...")
+                Records = None
+
+            if Index not in Paths:
+                Waiting[Index] = Records
+                continue
+
+            #Yield this directory, and then any of the directories under it that were waiting for it.
+            Ready = [(Index, Records)]
+
+            while Ready != []:
+                Index, Records = Ready.pop()
+                yield self.GetEntries(Table, Children[Index], Paths, Index, Records)
+
+                for Child in Children[Index]:
+                    if Child in Waiting:
+                        Ready.append((Child, Waiting.pop(Child)))
+
+    def GetEntries(self, Table, Children, Paths, Index, Records):
+        """Return a list of Entry objects for the directory at Index in the path table, from its records (None if it couldn't be read), and add its subdirectories (Children) to Paths"""
+        Path = Paths[Index]
+        Entries = []
+
+        if Records == None:
+            self.FailedDirectories.append(Path)
+            Records = []
+
+        #Names of subdirectories, keyed by their LBA (the path table only has ISO9660 names).
+        DirectoryNames = {}
+        LastFile = None
+
+        for Name, LBA, Size, Flags, SystemUse in Records:
+            #Skip '.' and '..', and associated files (eg Mac resource forks).
+            if Name in (b"\x00", b"\x01") or Flags & FLAG_ASSOCIATED:
+                continue
+
+            if Flags & FLAG_DIRECTORY:
+                DirectoryNames[LBA] = self.DecodeName(Name, SystemUse)
+                continue
+
+            #Files bigger than 4GB are split into several records with the same name.
+            if LastFile != None and LastFile[1] & FLAG_MULTI_EXTENT and LastFile[2] == Name:
+                LastFile[0].Size += Size
+                LastFile[1] = Flags
+                continue
+
+            Entries.append(Entry((Path+"/" if Path != "" else "")+self.DecodeName(Name, SystemUse), False, LBA, Size))
+            LastFile = [Entries[-1], Flags, Name]
+
+        for Child in Children:
+            LBA, Parent, Name = Table[Child]
+
+            if LBA in DirectoryNames:
+                Name = DirectoryNames[LBA]
+
+            else:
+                Name = self.DecodeName(Name, b"")
+
+            Paths[Child] = (Path+"/" if Path != "" else "")+Name
+            Entries.append(Entry(Paths[Child], True, LBA, 0))
+
+        return Entries
+
+    def Close(self):
+        """Close the device or image file"""
+        if self.Map != None:
+            self.Map.close()
+
+        self.File.close()
+
+#End Image class.
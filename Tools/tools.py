@@ -15,103 +15,1807 @@
 # You should have received a copy of the GNU General Public License
 # along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
 
+#Netlink protocol number and multicast group for kernel uevents (see linux/netlink.h).
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+
+#The shared mount table index, created the first time it's needed.
+MountIndex = None
+
+#The shared directory lister, created the first time it's needed.
+Lister = None
+
+#Guards creating the shared objects above, as any thread might need them first. This is a threading.Lock(), set up along with the modules we use.
+SharedLock = None
+
+#PE machine types and subsystems we know about.
+PEMachines = {0x14c: "i386", 0x8664: "amd64", 0x1c0: "arm", 0x1c4: "armnt", 0xaa64: "arm64", 0x200: "ia64"}
+PESubsystems = {1: "native", 2: "gui", 3: "console", 5: "os2", 7: "posix", 9: "wince", 10: "efi", 11: "efi", 12: "efi", 13: "efi", 14: "xbox", 16: "boot"}
+IMAGE_FILE_EXECUTABLE_IMAGE = 0x0002
+IMAGE_FILE_DLL = 0x2000
+
+#Begin Mount Table.
+class MountTable():
+    """An index of mounted block devices built from /proc/self/mountinfo, which is only rebuilt when the kernel says the mount table has changed."""
+    def __init__(self, Path="/proc/self/mountinfo"):
+        """Open the mount table and build the index"""
+        self.File = open(Path, "r")
+        self.Poller = select.poll()
+        self.Poller.register(self.File, select.POLLPRI | select.POLLERR)
+
+        #The index is shared by the worker pool's threads, which all read the same file, so only one thread can rebuild it (or look things up in it) at once.
+        self.Lock = threading.RLock()
+
+        #Device paths (eg /dev/cdrom) resolved to their real names, so lookups don't have to touch the disk.
+        self.DeviceNames = {}
+        self.Index = {}
+        self.FSTypes = {}
+        self.Rebuild()
+
+    def fileno(self):
+        """Return the file descriptor, so this can be passed to select(). Changes are reported as exceptional conditions, and reporting one uses it up, so the caller must call Rebuild() when it sees one."""
+        return self.File.fileno()
+
+    def Changed(self):
+        """Return True if the mount table changed since it was last polled (by us or select()), without blocking. This uses up the notification, so the caller must rebuild the index if it returns True."""
+        return self.Poller.poll(0) != []
+
+    def Refresh(self):
+        """Rebuild the index if the mount table has changed. Return True if it was rebuilt."""
+        with self.Lock:
+            if self.Changed():
+                self.Rebuild()
+                return True
+
+            return False
+
+    def Rebuild(self):
+        """Read the mount table and rebuild the index. Reading it doesn't clear the change notification (only polling does), so this never hides a change from Changed()."""
+        with self.Lock:
+            self.File.seek(0)
+            Data = self.File.read()
+
+        if isinstance(Data, bytes):
+            Data = Data.decode("utf-8", "replace")
+
+        Index = {}
+        FSTypes = {}
+
+        #Lines look like: '36 25 11:0 / /media/user/My\040Disc ro,nosuid shared:1 - iso9660 /dev/sr0 ro,...'
+        for Line in Data.split("\n"):
+            Fields = Line.split()
+
+            try:
+                MountPoint = self.Unescape(Fields[4])
+                FSType = Fields[Fields.index("-", 6) + 1]
+                Source = self.Unescape(Fields[Fields.index("-", 6) + 2])
+
+            except (IndexError, ValueError):
+                continue
+
+            if Source[:5] != "/dev/":
+                continue
+
+            #If something is mounted more than once, keep the first mount point, like lsblk does.
+            Index.setdefault(Source, MountPoint)
+            FSTypes.setdefault(Source, FSType)
+
+        with self.Lock:
+            self.Index = Index
+            self.FSTypes = FSTypes
+
+        logger.debug("Tools: MountTable().Rebuild(): Rebuilt mount table index ("+unicode(len(Index))+" devices mounted)...")
+
+    def Unescape(self, Field):
+        """Undo the octal escapes the kernel uses for spaces, tabs, newlines and backslashes in mountinfo"""
+        if "\\" not in Field:
+            return Field
+
+        return re.sub(r"\\([0-7]{3})", lambda Match: chr(int(Match.group(1), 8)), Field)
+
+    def GetMountPoint(self, Device):
+        """Return the mount point for the given device, or None if it isn't mounted"""
+        with self.Lock:
+            if Device not in self.DeviceNames:
+                self.DeviceNames[Device] = os.path.realpath(Device)
+
+            return self.Index.get(self.DeviceNames[Device], self.Index.get(Device))
+
+    def GetFSType(self, Device):
+        """Return the type of the filesystem mounted from the given device (eg iso9660 or udf), or None if it isn't mounted"""
+        with self.Lock:
+            self.GetMountPoint(Device)
+            return self.FSTypes.get(self.DeviceNames[Device], self.FSTypes.get(Device))
+
+    def Close(self):
+        """Close the mount table"""
+        with self.Lock:
+            self.Poller.unregister(self.File)
+            self.File.close()
+
+#End Mount Table.
+#Begin Device Event Monitor.
+class DeviceEventMonitor():
+    """Listen for kernel uevents (media change, eject, add/remove) on the block devices we're monitoring (or all block devices if Devices is None), so the backend can sleep until something happens instead of polling."""
+    def __init__(self, Devices):
+        """Open the netlink socket, or leave self.Socket as None if we can't, so the caller falls back to polling."""
+        self.SetDevices(Devices)
+        self.Socket = None
+
+        try:
+            self.Socket = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            self.Socket.bind((0, UEVENT_KERNEL_GROUP))
+
+        except (AttributeError, socket.error) as Error:
+            logger.warning("Tools: DeviceEventMonitor().__init__(): Couldn't listen for kernel uevents ("+unicode(Error)+")! Falling back to polling...")
+            self.Socket = None
+
+        else:
+            logger.debug("Tools: DeviceEventMonitor().__init__(): Listening for kernel uevents on "+(', '.join(self.Devices) if self.Devices != None else "all block devices")+"...")
+
+    def SetDevices(self, Devices):
+        """Set the devices to report events for (None for all of them). The kernel only knows devices by their name in /dev (eg sr0), so resolve any symlinks like /dev/cdrom first."""
+        if Devices == None:
+            self.Devices = None
+            return
+
+        self.Devices = {}
+
+        for Device in Devices:
+            self.Devices[os.path.basename(os.path.realpath(Device))] = Device
+
+    def Available(self):
+        """Return True if we're receiving uevents, or False if the caller needs to poll"""
+        return self.Socket != None
+
+    def ReadEvents(self):
+        """Read all pending uevents without blocking, and return a list of (Action, Device) tuples for the devices we're monitoring. If the kernel had to drop some events because we didn't read them quickly enough, ("overflow", None) is in the list, as anything might have happened."""
+        Events = []
+
+        while self.Socket != None:
+            try:
+                Message = self.Socket.recv(8192, socket.MSG_DONTWAIT)
+
+            except socket.error as Error:
+                if Error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    #Nothing left to read.
+                    break
+
+                elif Error.errno == errno.ENOBUFS:
+                    #The socket's buffer filled up. The events after that are still there to read.
+                    logger.warning("Tools: DeviceEventMonitor().ReadEvents(): Some uevents were lost because too many arrived at once...")
+
+                    if ("overflow", None) not in Events:
+                        Events.append(("overflow", None))
+
+                    continue
+
+                elif Error.errno == errno.EINTR:
+                    continue
+
+                #We can't tell what happened to any other events, so stop listening and let the caller poll instead.
+                logger.error("Tools: DeviceEventMonitor().ReadEvents(): Couldn't read kernel uevents ("+unicode(Error)+")! Falling back to polling...")
+                self.Close()
+                Events.append(("overflow", None))
+                break
+
+            #Messages look like 'change@/devices/...\0ACTION=change\0SUBSYSTEM=block\0DEVNAME=sr0\0...'.
+            Fields = Message.split(b"\0")
+            Info = {}
+
+            for Field in Fields[1:]:
+                Key, Sep, Value = Field.partition(b"=")
+
+                if Sep:
+                    Info[Key.decode("utf-8", "replace")] = Value.decode("utf-8", "replace")
+
+            if Info.get("SUBSYSTEM") != "block" or Info.get("DEVNAME") == None:
+                continue
+
+            Name = os.path.basename(Info["DEVNAME"])
+
+            if self.Devices == None:
+                Device = "/dev/"+Name
+
+            elif Name in self.Devices:
+                Device = self.Devices[Name]
+
+            else:
+                continue
+
+            #Work out what happened.
+            if Info.get("DISK_EJECT_REQUEST") == "1":
+                Action = "eject"
+
+            elif Info.get("DISK_MEDIA_CHANGE") == "1":
+                Action = "media-change"
+
+            else:
+                Action = Info.get("ACTION", "change")
+
+            Events.append((Action, Device))
+
+        return Events
+
+    def fileno(self):
+        """Return the socket's file descriptor, so this can be passed to select()"""
+        return self.Socket.fileno()
+
+    def Close(self):
+        """Close the socket"""
+        if self.Socket != None:
+            self.Socket.close()
+            self.Socket = None
+
+#End Device Event Monitor.
+#Begin Future.
+class Future():
+    """The result of a request that's handled by another thread (eg a dialog shown by the GUI thread). The requesting thread blocks in Result() until the other thread calls SetResult()."""
+    def __init__(self):
+        """Set up the future"""
+        self.Done = threading.Event()
+        self.Value = None
+        self.Error = None
+
+    def SetResult(self, Value):
+        """Set the result, and wake up anything waiting for it"""
+        self.Value = Value
+        self.Done.set()
+
+    def SetError(self, Error):
+        """Set an exception to be raised by Result() instead of a result, and wake up anything waiting for it"""
+        self.Error = Error
+        self.Done.set()
+
+    def IsDone(self):
+        """Return True if the result has been set"""
+        return self.Done.is_set()
+
+    def Result(self, Timeout=None):
+        """Wait for the result and return it, or return None if Timeout seconds pass first. Raises the exception given to SetError(), if any."""
+        self.Done.wait(Timeout)
+
+        if self.Error != None:
+            raise self.Error
+
+        return self.Value
+
+#End Future.
+#Begin Cancel Token.
+class CancelToken():
+    """Lets one thread tell another to stop what it's doing (eg scanning a disc that has been ejected), and why"""
+    def __init__(self):
+        """Set up the token, not cancelled"""
+        self.Cancelled = threading.Event()
+        self.Reason = None
+
+    def Cancel(self, Reason):
+        """Cancel whatever is using this token, giving the reason (eg "the disc was ejected"). Only the first reason is kept."""
+        if self.Cancelled.is_set() == False:
+            self.Reason = Reason
+            self.Cancelled.set()
+
+    def IsCancelled(self):
+        """Return True if Cancel() has been called"""
+        return self.Cancelled.is_set()
+
+#End Cancel Token.
+#Begin Device Info Cache.
+class DeviceInfoCache():
+    """Caches information about the system's drives (eg from GetDevInfo), so it can be shown straight away. Only one probe runs at a time, and anything that asks for the information while it's running shares its result. The cache is only thrown away when block devices are added or removed, or when a refresh is asked for."""
+    def __init__(self, Probe):
+        """Set up the cache. Probe is a function that returns the information."""
+        self.Probe = Probe
+        self.Lock = threading.Lock()
+
+        #The future for the last probe (which may still be running), and what to call when it finishes.
+        self.Result = None
+        self.Callbacks = []
+
+        #Whether devices changed while the probe was running.
+        self.Outdated = False
+
+        self.EventMonitor = DeviceEventMonitor(None)
+
+    def CheckForChanges(self):
+        """Throw away the cached information if block devices have been added or removed. Called with self.Lock held."""
+        if self.EventMonitor.Available() == False:
+            return
+
+        for Action, Device in self.EventMonitor.ReadEvents():
+            if Action not in ("add", "remove", "overflow") or self.Result == None:
+                continue
+
+            if Action == "overflow":
+                logger.debug("Tools: DeviceInfoCache().CheckForChanges(): Some uevents were lost, so devices might have been added or removed. Device information is out of date...")
+
+            else:
+                logger.debug("Tools: DeviceInfoCache().CheckForChanges(): "+Device+" was "+("added" if Action == "add" else "removed")+". Device information is out of date...")
+
+            if self.Result.IsDone():
+                self.Result = None
+
+            else:
+                self.Outdated = True
+
+    def Get(self):
+        """Return the cached information, or None if we don't have it (or it's out of date)"""
+        with self.Lock:
+            self.CheckForChanges()
+
+            if self.Result != None and self.Result.IsDone() and self.Result.Error == None:
+                return self.Result.Value
+
+        return None
+
+    def Request(self, Refresh=False, Callback=None):
+        """Return a future for the information, starting a probe in another thread if we don't have it (or Refresh is True) and one isn't running already. If the future isn't done yet, Callback is called with it (in the probe's thread) when it is."""
+        with self.Lock:
+            self.CheckForChanges()
+
+            #Don't keep failed probes.
+            if self.Result != None and self.Result.IsDone() and (Refresh or self.Result.Error != None):
+                self.Result = None
+
+            if self.Result == None:
+                logger.debug("Tools: DeviceInfoCache().Request(): Starting a new probe...")
+                self.Result = Future()
+                self.Outdated = False
+                Thread = threading.Thread(target=self.Run, args=(self.Result,))
+                Thread.daemon = True
+                Thread.start()
+
+            elif self.Result.IsDone() == False:
+                logger.debug("Tools: DeviceInfoCache().Request(): Waiting for the probe that's already running...")
+
+            Result = self.Result
+
+            if Result.IsDone() == False and Callback != None:
+                self.Callbacks.append(Callback)
+
+        return Result
+
+    def Run(self, Result):
+        """Run the probe, and give its result to everything that's waiting for it"""
+        Info = None
+        Failure = None
+
+        try:
+            Info = self.Probe()
+
+        except Exception as Error:
+            logger.error("Tools: DeviceInfoCache().Run(): Couldn't get device information ("+unicode(Error)+")...")
+            Failure = Error
+
+        with self.Lock:
+            if Failure != None:
+                Result.SetError(Failure)
+
+            else:
+                Result.SetResult(Info)
+
+            Callbacks = self.Callbacks
+            self.Callbacks = []
+
+            #Give the waiting callers what we found, but probe again next time.
+            if self.Outdated and self.Result is Result:
+                self.Result = None
+
+        for Callback in Callbacks:
+            Callback(Result)
+
+    def Close(self):
+        """Stop listening for device changes"""
+        self.EventMonitor.Close()
+
+#End Device Info Cache.
+#Begin Worker Pool.
+class WorkerPool():
+    """A fixed number of worker threads that run jobs from a queue, so slow work (eg reading several discs) can happen at the same time without starting a thread for every job"""
+    def __init__(self, Workers=4):
+        """Start the worker threads"""
+        self.Jobs = Queue.Queue()
+        self.Threads = []
+
+        for Number in range(Workers):
+            Thread = threading.Thread(target=self.Work, name="WorkerPool-"+unicode(Number))
+            Thread.daemon = True
+            Thread.start()
+            self.Threads.append(Thread)
+
+    def Submit(self, Function, Args=(), Callback=None):
+        """Run Function(*Args) in a worker thread, and return a Future for its result. If Callback is given, it's called with the Future (in the worker thread) when the job is done."""
+        Result = Future()
+        self.Jobs.put((Function, Args, Callback, Result))
+        return Result
+
+    def Work(self):
+        """Run jobs until Close() is called"""
+        while True:
+            Job = self.Jobs.get()
+
+            if Job == None:
+                break
+
+            Function, Args, Callback, Result = Job
+
+            try:
+                Result.SetResult(Function(*Args))
+
+            except Exception as Error:
+                logger.error("Tools: WorkerPool().Work(): Job "+unicode(Function)+" failed ("+unicode(Error)+")...")
+                Result.SetError(Error)
+
+            if Callback != None:
+                Callback(Result)
+
+    def Close(self):
+        """Stop the worker threads once they've finished the jobs that are already queued"""
+        for Thread in self.Threads:
+            self.Jobs.put(None)
+
+#End Worker Pool.
+#Begin Directory Lister.
+class DirectoryLister():
+    """Reads directories in long-lived background threads, so a read that stalls (eg because the drive is retrying a scratched sector) can be given up on without starting a thread for every directory. A new thread is only started when all the others are busy or stuck, and each one goes back to waiting for work when its read finishes."""
+    def __init__(self):
+        """Set up the lister, without any threads yet"""
+        self.Lock = threading.Lock()
+
+        #The job queues of the threads that are waiting for work.
+        self.Idle = []
+        self.Threads = 0
+
+    def List(self, Path, Limit, Timeout):
+        """Return the entries in the given directory, like Main().ListDirectory(), or None if reading it takes longer than Timeout seconds"""
+        Result = Future()
+
+        with self.Lock:
+            if self.Idle != []:
+                Jobs = self.Idle.pop()
+
+            else:
+                Jobs = Queue.Queue()
+                Thread = threading.Thread(target=self.Work, args=(Jobs,), name="DirectoryLister-"+unicode(self.Threads))
+                Thread.daemon = True
+                Thread.start()
+                self.Threads += 1
+
+        Jobs.put((Path, Limit, Result))
+        Entries = Result.Result(Timeout)
+
+        if Result.IsDone() == False:
+            return None
+
+        return Entries
+
+    def Work(self, Jobs):
+        """List the directories put in Jobs, setting each job's future to the entries, or to the error if the directory can't be read"""
+        while True:
+            Path, Limit, Result = Jobs.get()
+            Entries = None
+            Failure = None
+
+            try:
+                Entries = Main().ListDirectory(Path, Limit)
+
+            except (IOError, OSError) as Error:
+                Failure = Error
+
+            #Say we're waiting for work before giving the result, so the caller doesn't start another thread if it lists the next directory straight away.
+            with self.Lock:
+                self.Idle.append(Jobs)
+
+            if Failure != None:
+                Result.SetError(Failure)
+
+            else:
+                Result.SetResult(Entries)
+
+#End Directory Lister.
+#Begin Prefetcher.
+class Prefetcher():
+    """Runs a generator in a WorkerPool, keeping what it yields until another thread iterates over it. close() stops the generator early, like it does for a generator."""
+    def __init__(self, Pool, Generator, Token=None):
+        """Start running the generator. If Token (a CancelToken) is given, close() cancels it, so a generator that's using it stops what it's doing straight away, rather than after it yields again."""
+        self.Generator = Generator
+        self.Token = Token
+        self.Items = Queue.Queue()
+        self.Cancelled = threading.Event()
+        Pool.Submit(self.Run)
+
+    def Run(self):
+        """Run the generator until it finishes or we're closed. Runs in the worker pool."""
+        try:
+            for Item in self.Generator:
+                if self.Cancelled.is_set():
+                    break
+
+                self.Items.put((True, Item))
+
+        finally:
+            self.Generator.close()
+
+            #Tell __iter__() there's nothing more.
+            self.Items.put((False, None))
+
+    def Next(self, Timeout=None):
+        """Return (True, item) for the next thing the generator yielded, or (False, None) if it has finished. Raises Queue.Empty if nothing arrives within Timeout seconds."""
+        return self.Items.get(timeout=Timeout)
+
+    def __iter__(self):
+        """Yield what the generator yielded, waiting for it if needed"""
+        while True:
+            More, Item = self.Items.get()
+
+            if More == False:
+                return
+
+            yield Item
+
+    def close(self):
+        """Stop the generator after what it's doing now, or straight away if it's using our token"""
+        self.Cancelled.set()
+
+        if self.Token != None:
+            self.Token.Cancel("the scan was stopped")
+
+#End Prefetcher.
+#Begin Installer Ranker.
+class InstallerRanker():
+    """Scores exe files by how likely they are to be the disc's installer (or main program), so the likeliest ones can be shown first. Scores are worked out from each file's path and size, and anything else we already know about it, so ranking doesn't read the disc."""
+    def __init__(self):
+        """Set up the weights and compile the name patterns"""
+        #Names that are almost always the installer or launcher.
+        self.KnownNames = {"SETUP.EXE": 50, "INSTALL.EXE": 50, "INSTALLER.EXE": 45, "AUTORUN.EXE": 30, "LAUNCHER.EXE": 20, "START.EXE": 20}
+
+        #Parts of names that make a file more or less likely to be what the user wants. Redistributables (eg DXSETUP.EXE) match both.
+        self.Likely = re.compile("SETUP|INSTALL|AUTORUN|LAUNCH|START")
+        self.Unlikely = re.compile("UNINS|UNWISE|REDIST|DXSETUP|DOTNET|NETFX|DIRECTX|MSIEXEC|CRASH|REPORT|UPDATE|PATCH|HELPER|CONFIG|REGISTER|README")
+
+        self.LikelyWeight = 20
+        self.UnlikelyWeight = -40
+        self.AutorunWeight = 100
+        self.DepthWeight = -5
+        self.NotExeWeight = -50
+        self.StubSize = 16384
+        self.StubWeight = -15
+        self.SubsystemWeights = {"gui": 10, "console": -10}
+
+    def Rank(self, MountPoint, Candidates, AutorunExe=None, PEInfo={}, Limit=None):
+        """Score a batch of candidates (a list of (path, size) tuples, where the size may be None), and return a list of (score, path) tuples, highest first. Files with the same score stay in the order they were given. AutorunExe is the file named in the disc's autorun information, if any, and PEInfo is a dictionary of {path: dictionary with a "Subsystem" key} for files we know more about."""
+        if AutorunExe != None:
+            AutorunExe = AutorunExe.upper()
+
+        KnownNames = self.KnownNames
+        Likely = self.Likely.search
+        Unlikely = self.Unlikely.search
+        SubsystemWeights = self.SubsystemWeights
+        Prefix = len(MountPoint.rstrip("/")) + 1
+        Ranked = []
+
+        for Path, Size in Candidates:
+            UpperPath = Path.upper()
+            UpperName = UpperPath[UpperPath.rfind("/")+1:]
+
+            #How deep the file is on the disc. Installers are nearly always in the root, or just below it.
+            Score = Path.count("/", Prefix) * self.DepthWeight
+
+            if UpperName in KnownNames:
+                Score += KnownNames[UpperName]
+
+            elif UpperName.endswith(".EXE") == False:
+                #Eg "readme.exe.txt", which Wine can't run.
+                Score += self.NotExeWeight
+
+            if Likely(UpperName):
+                Score += self.LikelyWeight
+
+            if Unlikely(UpperName):
+                Score += self.UnlikelyWeight
+
+            if Size != None and Size < self.StubSize:
+                Score += self.StubWeight
+
+            elif Size != None:
+                #Bigger files are a little more likely to be the real thing, up to 10MB.
+                Score += min(Size >> 20, 10)
+
+            if AutorunExe != None and UpperPath == AutorunExe:
+                Score += self.AutorunWeight
+
+            if Path in PEInfo:
+                Score += SubsystemWeights.get(PEInfo[Path].get("Subsystem"), 0)
+
+            Ranked.append((Score, Path))
+
+        Ranked.sort(key=lambda Item: Item[0], reverse=True)
+
+        if Limit != None:
+            return Ranked[:Limit]
+
+        return Ranked
+
+#End Installer Ranker.
+#Begin Exe Classifier.
+class ExeClassifier():
+    """Reads the headers of exe files to work out whether Wine can actually start them, so files that can't be run (DLLs, DOS programs, corrupt files, or files that just have ".exe" in their names) aren't offered to the user. Results are cached for each file."""
+    def __init__(self, HeaderSize=4096, MaxHeaderSize=65536):
+        """Set up an empty cache. Only the first HeaderSize bytes of each file are mapped, unless the PE header is further in (up to MaxHeaderSize)."""
+        self.HeaderSize = HeaderSize
+        self.MaxHeaderSize = MaxHeaderSize
+
+        #Results, keyed by path. These include the file's size and modification time, so changed files are read again.
+        self.Cache = {}
+
+    def Classify(self, Path):
+        """Return a dictionary describing the given file: "Format" ("pe", "ne", "dos" or None), "Machine", "Subsystem", "DLL", "Valid" (True if it's a well-formed Windows executable), "Launchable" (True if Wine should be able to start it), and "Reason" (why it isn't launchable, if it isn't)."""
+        try:
+            Stat = os.stat(Path)
+
+        except (IOError, OSError) as Error:
+            return {"Format": None, "Machine": None, "Subsystem": None, "DLL": False, "Valid": False, "Launchable": False, "Reason": "couldn't read it ("+unicode(Error)+")"}
+
+        Info = self.Cache.get(Path)
+
+        if Info != None and Info["Size"] == Stat.st_size and Info["MTime"] == Stat.st_mtime:
+            return Info
+
+        Info = {"Format": None, "Machine": None, "Subsystem": None, "DLL": False, "Valid": False, "Launchable": False, "Reason": None, "Size": Stat.st_size, "MTime": Stat.st_mtime}
+
+        try:
+            self.ReadHeaders(Path, Stat.st_size, Info)
+
+        except (IOError, OSError, ValueError, struct.error) as Error:
+            Info["Reason"] = "couldn't read its headers ("+unicode(Error)+")"
+
+        self.Cache[Path] = Info
+        return Info
+
+    def ReadHeaders(self, Path, Size, Info):
+        """Map the start of the file and fill in Info from its DOS, NE or PE headers"""
+        if Size < 64:
+            Info["Reason"] = "too small to be an exe file"
+            return
+
+        with open(Path, "rb") as File:
+            Map = mmap.mmap(File.fileno(), min(Size, self.HeaderSize), access=mmap.ACCESS_READ)
+
+            try:
+                if Map[0:2] != b"MZ":
+                    Info["Reason"] = "not an exe file"
+                    return
+
+                Info["Format"] = "dos"
+                Offset = struct.unpack("<I", Map[0x3c:0x40])[0]
+
+                #The PE header is normally in the first few hundred bytes, but it can be further in.
+                if Offset + 96 > len(Map) and Offset + 96 <= min(Size, self.MaxHeaderSize):
+                    Map.close()
+                    Map = mmap.mmap(File.fileno(), Offset + 96, access=mmap.ACCESS_READ)
+
+                Signature = Map[Offset:Offset+4]
+
+            except:
+                Map.close()
+                raise
+
+            try:
+                if Signature[0:2] == b"NE":
+                    #16-bit Windows programs, which Wine can still run.
+                    Info["Format"] = "ne"
+                    Info["Machine"] = "i286"
+                    Info["Subsystem"] = "gui"
+                    Info["DLL"] = bool(bytearray(Map[Offset+0x0d:Offset+0x0e])[0] & 0x80)
+                    Info["Valid"] = True
+
+                elif Signature == b"PE\x00\x00":
+                    Info["Format"] = "pe"
+                    self.ReadPEHeader(Map, Offset + 4, Info)
+
+            finally:
+                Map.close()
+
+        if Info["Valid"] == False:
+            Info["Reason"] = Info["Reason"] or "a DOS program, or a corrupt Windows program"
+
+        elif Info["DLL"]:
+            Info["Reason"] = "a library, not a program"
+
+        elif Info["Machine"] not in ("i386", "amd64", "i286"):
+            Info["Reason"] = "for an unsupported CPU ("+unicode(Info["Machine"])+")"
+
+        elif Info["Subsystem"] not in ("gui", "console"):
+            Info["Reason"] = "not a Windows program (subsystem "+unicode(Info["Subsystem"])+")"
+
+        else:
+            Info["Launchable"] = True
+
+    def ReadPEHeader(self, Map, Offset, Info):
+        """Fill in Info from the COFF and optional headers at Offset"""
+        if Offset + 90 > len(Map):
+            Info["Reason"] = "truncated PE header"
+            return
+
+        Machine, Sections = struct.unpack("<HH", Map[Offset:Offset+4])
+        OptionalSize, Characteristics = struct.unpack("<HH", Map[Offset+16:Offset+20])
+        Magic = struct.unpack("<H", Map[Offset+20:Offset+22])[0]
+
+        Info["Machine"] = PEMachines.get(Machine, hex(Machine))
+        Info["DLL"] = bool(Characteristics & IMAGE_FILE_DLL)
+
+        #PE32 (0x10b) and PE32+ (0x20b) both have the subsystem at the same place in the optional header.
+        if Magic not in (0x10b, 0x20b) or OptionalSize < 70 or Sections == 0 or Characteristics & IMAGE_FILE_EXECUTABLE_IMAGE == 0:
+            Info["Reason"] = "corrupt PE header"
+            return
+
+        Subsystem = struct.unpack("<H", Map[Offset+20+68:Offset+20+70])[0]
+        Info["Subsystem"] = PESubsystems.get(Subsystem, unicode(Subsystem))
+        Info["Valid"] = True
+
+#End Exe Classifier.
+#Begin Scheduler.
+class Scheduler():
+    """Decide how long the backend sleeps between checks: back off while nothing happens, and check quickly again just after media is inserted or ejected. Any thread can wake it up or cancel it straight away."""
+    def __init__(self, MinInterval=0.5, MaxInterval=60, BackoffFactor=2, History=50):
+        """Set up the scheduler, starting at the shortest interval"""
+        self.MinInterval = MinInterval
+        self.MaxInterval = MaxInterval
+        self.BackoffFactor = BackoffFactor
+        self.Interval = MinInterval
+
+        #The most recent (time, reasons) we woke up for, for diagnostics. Timeouts aren't kept, as WineSession().Wait() wakes up every couple of seconds while software is running.
+        self.WakeReasons = collections.deque(maxlen=History)
+
+        self.Cancelled = threading.Event()
+        self.Lock = threading.Lock()
+        self.PendingReasons = []
+        self.Closed = False
+
+        #Wake() writes to this pipe, so Wait() can select() on it along with the sources it's given. Writing is non-blocking, so Wake() can't get stuck holding the lock if the pipe is full.
+        self.WakeRead, self.WakeWrite = os.pipe()
+        fcntl.fcntl(self.WakeWrite, fcntl.F_SETFL, fcntl.fcntl(self.WakeWrite, fcntl.F_GETFL) | os.O_NONBLOCK)
+
+    def Wake(self, Reason):
+        """Wake up Wait() straight away, giving the reason. Safe to call from any thread."""
+        with self.Lock:
+            if self.Closed:
+                return
+
+            self.PendingReasons.append(Reason)
+
+            try:
+                os.write(self.WakeWrite, b"x")
+
+            except OSError as Error:
+                #If the pipe is full, Wait() will wake up anyway, and pick up this reason too.
+                if Error.errno != errno.EAGAIN:
+                    raise
+
+    def Cancel(self):
+        """Cancel the scheduler, waking Wait() straight away. Wait() won't sleep again afterwards."""
+        self.Cancelled.set()
+        self.Wake("cancelled")
+
+    def IsCancelled(self):
+        """Return True if Cancel() has been called"""
+        return self.Cancelled.is_set()
+
+    def Activity(self):
+        """Something happened (eg media was inserted or ejected), so check quickly for a while"""
+        self.Interval = self.MinInterval
+
+    def Idle(self):
+        """Nothing happened, so wait a bit longer next time"""
+        self.Interval = min(self.Interval * self.BackoffFactor, self.MaxInterval)
+
+    def Wait(self, Readable={}, Exceptional={}, Timeout=None):
+        """Sleep for the current interval (or Timeout seconds, if given), or until we're woken, cancelled, or one of the given sources is ready. The sources are dictionaries of {reason: object with fileno()}. Return the list of reasons we woke up for ("timeout" if none)."""
+        if self.IsCancelled():
+            return ["cancelled"]
+
+        if Timeout == None:
+            Timeout = self.Interval
+
+        ReadList, Writable, ExceptList = select.select([self.WakeRead] + list(Readable.values()), [], list(Exceptional.values()), Timeout)
+
+        Reasons = []
+
+        if self.WakeRead in ReadList:
+            with self.Lock:
+                os.read(self.WakeRead, 512)
+                Reasons.extend(self.PendingReasons)
+                self.PendingReasons = []
+
+        for Reason, Source in Readable.items():
+            if Source in ReadList:
+                Reasons.append(Reason)
+
+        for Reason, Source in Exceptional.items():
+            if Source in ExceptList:
+                Reasons.append(Reason)
+
+        if Reasons == []:
+            return ["timeout"]
+
+        self.WakeReasons.append((time.time(), Reasons))
+        return Reasons
+
+    def GetDiagnostics(self):
+        """Return the current interval and the recent reasons we woke up for"""
+        return {"Interval": self.Interval, "WakeReasons": list(self.WakeReasons), "Cancelled": self.IsCancelled()}
+
+    def Close(self):
+        """Close the wake-up pipe. Wake() and Cancel() do nothing afterwards."""
+        with self.Lock:
+            self.Closed = True
+            os.close(self.WakeRead)
+            os.close(self.WakeWrite)
+
+#End Scheduler.
+#Begin Wine Session.
+class WineSession():
+    """Keep track of software we've launched with Wine: the process we started, its descendants, and any wineserver that was started for it. Wine's output is kept in a bounded buffer."""
+    def __init__(self, ExeFile, OutputLines=200, EarlyExitTime=30):
+        """Launch the given exe file with Wine, and start watching it. Raises OSError if Wine couldn't be started."""
+        self.ExeFile = ExeFile
+        self.EarlyExitTime = EarlyExitTime
+        self.Output = collections.deque(maxlen=OutputLines)
+        self.Exited = threading.Event()
+        self.LaunchTime = time.time()
+        self.EndTime = None
+
+        #pid: start time (in clock ticks since boot, to guard against pid reuse) of every process we're tracking.
+        self.Tracked = {}
+        self.Pidfds = {}
+
+        #WaitForExit() closes the write end of this pipe when the process exits, which makes the read end readable, so Wait() can select() on it. The lock stops it and Close() both closing it.
+        self.ExitRead, self.ExitWrite = os.pipe()
+        self.Lock = threading.Lock()
+
+        logger.info("Tools: WineSession().__init__(): Starting "+ExeFile+" with Wine...")
+
+        #Use /wait so start.exe only exits when the software does, and we can wait for it directly. Wine gets its own copy of /dev/null as stdin, so close ours straight away.
+        try:
+            with open(os.devnull, "r") as DevNull:
+                self.Process = subprocess.Popen(["wine", "start", "/wait", "/Unix", ExeFile], stdin=DevNull, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, close_fds=True)
+
+        except OSError:
+            os.close(self.ExitRead)
+            os.close(self.ExitWrite)
+            raise
+
+        self.Track(self.Process.pid)
+        self.StartTicks = self.Tracked.get(self.Process.pid, 0)
+
+        #Read the output, and notice when the process exits, in the background. These are separate because anything it starts (eg wineserver) might keep the pipe open.
+        for Target in (self.ReadOutput, self.WaitForExit):
+            Thread = threading.Thread(target=Target)
+            Thread.daemon = True
+            Thread.start()
+
+    def ReadOutput(self):
+        """Copy Wine's output into self.Output until the pipe is closed"""
+        for Line in iter(self.Process.stdout.readline, b""):
+            self.Output.append(Line.decode("utf-8", "replace").rstrip("\n"))
+
+        self.Process.stdout.close()
+
+    def WaitForExit(self):
+        """Reap the process we started as soon as it exits"""
+        self.Process.wait()
+        self.EndTime = time.time()
+        self.Exited.set()
+
+        with self.Lock:
+            if self.ExitWrite != None:
+                os.close(self.ExitWrite)
+                self.ExitWrite = None
+
+    def ReadStat(self, PID):
+        """Return (parent pid, command name, start time) for the given pid from /proc, or None if it doesn't exist or is a zombie"""
+        try:
+            with open("/proc/"+unicode(PID)+"/stat", "r") as File:
+                Stat = File.read()
+
+        except (IOError, OSError):
+            return None
+
+        #The command name is in brackets and might contain spaces, so split around it.
+        Comm = Stat[Stat.find("(")+1:Stat.rfind(")")]
+        Fields = Stat[Stat.rfind(")")+2:].split()
+
+        try:
+            if Fields[0] == "Z":
+                return None
+
+            return (int(Fields[1]), Comm, int(Fields[19]))
+
+        except (IndexError, ValueError):
+            return None
+
+    def Track(self, PID):
+        """Start tracking the given pid, using a pidfd to wait on it if the kernel and python support it (we already know when the process we started exits)"""
+        Stat = self.ReadStat(PID)
+
+        if Stat == None or PID in self.Tracked:
+            return
+
+        self.Tracked[PID] = Stat[2]
+
+        if hasattr(os, "pidfd_open") and PID != self.Process.pid:
+            try:
+                self.Pidfds[PID] = os.pidfd_open(PID)
+
+            except OSError:
+                pass
+
+    def IsAlive(self, PID):
+        """Return True if the tracked pid is still running (and hasn't been reused by something else)"""
+        Stat = self.ReadStat(PID)
+        return Stat != None and Stat[2] == self.Tracked[PID]
+
+    def ScanProcesses(self):
+        """Look through /proc for new descendants of the processes we're tracking, and for a wineserver started for our Wine prefix after we launched the software"""
+        Processes = {}
+
+        for Entry in os.listdir("/proc"):
+            if Entry.isdigit():
+                Stat = self.ReadStat(int(Entry))
+
+                if Stat != None:
+                    Processes[int(Entry)] = Stat
+
+        #Keep going until we stop finding new children, as they may be listed before their parents.
+        Found = True
+
+        while Found:
+            Found = False
+
+            for PID, (ParentPID, Comm, StartTicks) in Processes.items():
+                if PID not in self.Tracked and ParentPID in self.Tracked:
+                    self.Track(PID)
+                    Found = True
+
+        #wineserver detaches from whatever started it, so find it by name, start time and prefix instead.
+        for PID, (ParentPID, Comm, StartTicks) in Processes.items():
+            if Comm == "wineserver" and StartTicks >= self.StartTicks and PID not in self.Tracked and self.SamePrefix(PID):
+                logger.debug("Tools: WineSession().ScanProcesses(): Tracking wineserver (pid "+unicode(PID)+")...")
+                self.Track(PID)
+
+    def SamePrefix(self, PID):
+        """Return True if the given process is using the same Wine prefix as us"""
+        try:
+            with open("/proc/"+unicode(PID)+"/environ", "rb") as File:
+                Environ = File.read().split(b"\0")
+
+        except (IOError, OSError):
+            return False
+
+        Prefix = os.environ.get("WINEPREFIX", "")
+
+        for Variable in Environ:
+            if Variable[:11] == b"WINEPREFIX=":
+                return Variable[11:].decode("utf-8", "replace") == Prefix
+
+        return Prefix == ""
+
+    def Prune(self):
+        """Stop tracking processes that have exited"""
+        for PID in list(self.Tracked.keys()):
+            if PID != self.Process.pid and not self.IsAlive(PID):
+                del self.Tracked[PID]
+
+                if PID in self.Pidfds:
+                    os.close(self.Pidfds.pop(PID))
+
+    def Running(self):
+        """Return True if the process we started, or anything we're tracking, is still running"""
+        self.Prune()
+        return not self.Exited.is_set() or any(PID != self.Process.pid for PID in self.Tracked)
+
+    def Crashed(self):
+        """Return True if the process we started exited with an error soon after it was launched (eg if the file couldn't be run)"""
+        return self.Exited.is_set() and self.Process.returncode != 0 and self.EndTime != None and self.EndTime - self.LaunchTime < self.EarlyExitTime
+
+    def Wait(self, Timeout=None, Scheduler=None):
+        """Wait until the session ends, for up to Timeout seconds if given. If a Scheduler is given, wait through it instead, so we stop waiting as soon as it's woken or cancelled. Return True if the session has ended."""
+        Deadline = time.time() + Timeout if Timeout != None else None
+
+        while self.Running():
+            Remaining = Deadline - time.time() if Deadline != None else 5
+
+            if Remaining <= 0:
+                return False
+
+            WasRunning = not self.Exited.is_set()
+
+            if WasRunning:
+                #Wake up the moment the process exits, but look for new children every couple of seconds while it runs.
+                Sources = {"exited": self.ExitRead}
+                Remaining = min(Remaining, 2)
+
+            else:
+                #pidfds become readable when the process exits. Without them, check every second.
+                Sources = dict(("pid "+unicode(PID), Pidfd) for PID, Pidfd in self.Pidfds.items())
+                Remaining = min(Remaining, 5 if Sources != {} else 1)
+
+            if Scheduler != None:
+                Scheduler.Wait(Readable=Sources, Timeout=Remaining)
+
+                if Scheduler.IsCancelled():
+                    return False
+
+            else:
+                select.select(list(Sources.values()), [], [], Remaining)
+
+            if self.Exited.is_set() and self.Crashed():
+                #Don't wait around for anything it started.
+                break
+
+            if WasRunning:
+                self.ScanProcesses()
+
+        self.Close()
+        return True
+
+    def Close(self):
+        """Close the file descriptors we use to wait for the session. Call this if we give up on the session before it ends (it's done for you if it does). The software is left running, and Wait() can't be used afterwards."""
+        for PID in list(self.Pidfds.keys()):
+            os.close(self.Pidfds.pop(PID))
+
+        with self.Lock:
+            for Name in ("ExitRead", "ExitWrite"):
+                if getattr(self, Name) != None:
+                    os.close(getattr(self, Name))
+                    setattr(self, Name, None)
+
+#End Wine Session.
+#Begin Scan Result.
+class ScanResult():
+    """The result of scanning a disc once: the autorun files and exe files found on it, and some statistics about the scan"""
+    def __init__(self, MountPoint):
+        """Set up an empty result"""
+        self.MountPoint = MountPoint
+        self.AutorunFiles = []
+        self.ExeFiles = []
+        self.Sizes = {}
+        self.Directories = 0
+        self.Files = 0
+        self.Errors = []
+
+        #Directories skipped by the scan rules (by pattern or depth), and directories that had more entries than we read.
+        self.Pruned = 0
+        self.DepthLimited = 0
+        self.Capped = 0
+
+        #Directories that took too long to read, and whether (and why) the scan stopped before the end.
+        self.Stalled = []
+        self.Truncated = False
+        self.TruncatedReason = None
+
+        self.StartTime = time.time()
+        self.Duration = None
+        self.Cached = False
+
+    def GetStats(self):
+        """Return a dictionary of statistics about the scan, for logging and diagnostics"""
+        return {"Directories": self.Directories, "Files": self.Files, "AutorunFiles": len(self.AutorunFiles), "ExeFiles": len(self.ExeFiles), "Errors": len(self.Errors), "Pruned": self.Pruned, "DepthLimited": self.DepthLimited, "Capped": self.Capped, "Stalled": len(self.Stalled), "Truncated": self.TruncatedReason, "Duration": self.Duration}
+
+    def Truncate(self, Reason):
+        """Record that the scan stopped before the end, and why"""
+        logger.warning("Tools: ScanResult().Truncate(): Stopped scanning "+self.MountPoint+" before the end, because "+Reason+"...")
+        self.Truncated = True
+        self.TruncatedReason = Reason
+
+    def IsComplete(self):
+        """Return True if every directory on the disc (apart from ones the scan rules skip) was read, so the result can be cached"""
+        return self.Truncated == False and self.Errors == [] and self.Stalled == []
+
+    def Export(self):
+        """Return the result as a dictionary that can be saved in the scan cache. Paths are stored relative to the mount point, as it can change when the disc is inserted again."""
+        return {"AutorunFiles": [os.path.relpath(File, self.MountPoint) for File in self.AutorunFiles], "ExeFiles": [os.path.relpath(File, self.MountPoint) for File in self.ExeFiles], "Sizes": dict((os.path.relpath(File, self.MountPoint), Size) for File, Size in self.Sizes.items()), "Directories": self.Directories, "Files": self.Files, "Pruned": self.Pruned, "DepthLimited": self.DepthLimited, "Capped": self.Capped, "Duration": self.Duration}
+
+    def Import(self, Data):
+        """Fill in the result from a dictionary made by Export()"""
+        self.AutorunFiles = [os.path.join(self.MountPoint, File) for File in Data["AutorunFiles"]]
+        self.ExeFiles = [os.path.join(self.MountPoint, File) for File in Data["ExeFiles"]]
+        self.Sizes = dict((os.path.join(self.MountPoint, File), Size) for File, Size in Data.get("Sizes", {}).items())
+        self.Directories = Data["Directories"]
+        self.Files = Data["Files"]
+        self.Pruned = Data.get("Pruned", 0)
+        self.DepthLimited = Data.get("DepthLimited", 0)
+        self.Capped = Data.get("Capped", 0)
+        self.Duration = Data["Duration"]
+        self.Cached = True
+
+#End Scan Result.
+#Begin Scan Rules.
+class ScanRules():
+    """Rules for the parts of a disc that scans skip: directories matching glob patterns (eg data directories full of videos), directories deeper than a maximum depth, and the entries after the first few in huge directories. The patterns are compiled once, when the rules are made."""
+    def __init__(self, PruneDirs=[], MaxDepth=None, MaxEntriesPerDir=None, TimeLimit=None, StallTimeout=None):
+        """Compile the patterns. Patterns without a '/' match directory names anywhere on the disc, and patterns with one match paths from the root of the disc. Matching ignores case, like Windows does. MaxDepth is how many directories deep to go (0 for just the root). TimeLimit is how many seconds a whole scan may take, and StallTimeout is how long to wait for one directory before skipping it. None means no limit for any of these."""
+        self.PruneDirs = list(PruneDirs)
+        self.MaxDepth = MaxDepth
+        self.MaxEntriesPerDir = MaxEntriesPerDir
+        self.TimeLimit = TimeLimit
+        self.StallTimeout = StallTimeout
+        self.NamePattern = self.Compile([Pattern for Pattern in PruneDirs if "/" not in Pattern])
+        self.PathPattern = self.Compile([Pattern.strip("/") for Pattern in PruneDirs if "/" in Pattern])
+
+    def Compile(self, Patterns):
+        """Compile a list of glob patterns into one regular expression, or return None if there aren't any"""
+        if Patterns == []:
+            return None
+
+        return re.compile("|".join("(?:"+fnmatch.translate(Pattern)+")" for Pattern in Patterns), re.IGNORECASE)
+
+    def CheckDirectory(self, RelativePath, Depth):
+        """Return why the directory at RelativePath (from the root of the disc), Depth directories deep, should be skipped ("pattern" or "depth"), or None if it should be read"""
+        if self.MaxDepth != None and Depth > self.MaxDepth:
+            return "depth"
+
+        if self.NamePattern != None and self.NamePattern.match(RelativePath[RelativePath.rfind("/")+1:]):
+            return "pattern"
+
+        if self.PathPattern != None and self.PathPattern.match(RelativePath):
+            return "pattern"
+
+        return None
+
+    def GetDeadline(self, StartTime):
+        """Return the time a scan started at StartTime must stop by, or None if there's no time limit"""
+        if self.TimeLimit == None:
+            return None
+
+        return StartTime + self.TimeLimit
+
+    def GetSignature(self):
+        """Return a string that identifies these rules, so cached scans made with different rules aren't used. The time limits aren't included, as scans that hit them aren't cached."""
+        return unicode([self.PruneDirs, self.MaxDepth, self.MaxEntriesPerDir])
+
+#End Scan Rules.
+#Begin Path Index.
+class PathIndex():
+    """A case-insensitive index of the files and directories on a disc, filled in from the directory listings we read anyway, so Windows-style paths (eg from autorun files) can be resolved to the real files without a stat() for each one."""
+    def __init__(self, MountPoint):
+        """Set up an empty index"""
+        self.MountPoint = MountPoint
+
+        #Lower case relative paths, mapped to (real relative path, is directory) tuples, and the (lower case) directories we've read.
+        self.Paths = {}
+        self.Listed = set()
+
+    def AddDirectory(self, RelativePath, Entries):
+        """Add the entries of the directory at RelativePath ("" for the root), as returned by Main().ListDirectory()"""
+        for Name, IsDirectory, Inode in Entries:
+            Path = os.path.join(RelativePath, Name)
+
+            #If names only differ in case, use the first one, like Windows would.
+            self.Paths.setdefault(Path.lower(), (Path, IsDirectory))
+
+        self.Listed.add(RelativePath.lower())
+
+    def ReadDirectory(self, RelativePath, StallTimeout=None):
+        """Read the directory at RelativePath into the index, and return True if it could be read"""
+        Directory = os.path.join(self.MountPoint, RelativePath)
+
+        try:
+            Entries = Main().ListDirectory(Directory, Timeout=StallTimeout)
+
+        except (IOError, OSError) as Error:
+            logger.warning("Tools: PathIndex().ReadDirectory(): Couldn't read "+Directory+" ("+unicode(Error)+")...")
+            return False
+
+        if Entries == None:
+            logger.warning("Tools: PathIndex().ReadDirectory(): Reading "+Directory+" took longer than "+unicode(StallTimeout)+" seconds...")
+            return False
+
+        self.AddDirectory(RelativePath, Entries)
+        return True
+
+    def Resolve(self, Path, Directory=None, StallTimeout=None):
+        """Return the real path to the file Path refers to, ignoring case, or None if there isn't one. Path can use '\\' or '/', and is relative to Directory (the root of the disc by default), or to the root if it starts with a separator. Directories that haven't been read yet are read as needed."""
+        Path = Path.replace("\\", "/")
+
+        if Path[:1] == "/" or Directory == None:
+            Relative = Path.lstrip("/")
+
+        else:
+            Relative = os.path.join(os.path.relpath(Directory, self.MountPoint), Path)
+
+        Relative = os.path.normpath(Relative)
+
+        #Don't go outside the disc.
+        if Relative == "." or Relative == ".." or Relative.startswith("../"):
+            return None
+
+        Key = Relative.lower()
+
+        if Key not in self.Paths:
+            #Follow the path one directory at a time, reading the ones we haven't seen yet.
+            RealDirectory = ""
+
+            for Part in Key.split("/")[:-1]:
+                if RealDirectory.lower() not in self.Listed and self.ReadDirectory(RealDirectory, StallTimeout) == False:
+                    return None
+
+                Entry = self.Paths.get(os.path.join(RealDirectory, Part).lower())
+
+                if Entry == None or Entry[1] == False:
+                    return None
+
+                RealDirectory = Entry[0]
+
+            if RealDirectory.lower() not in self.Listed and self.ReadDirectory(RealDirectory, StallTimeout) == False:
+                return None
+
+        Entry = self.Paths.get(Key)
+
+        if Entry == None or Entry[1]:
+            return None
+
+        return os.path.join(self.MountPoint, Entry[0])
+
+#End Path Index.
+#Begin Scan Cache.
+class ScanCache():
+    """A persistent cache of what was found on each disc, keyed by a fingerprint of the media, so discs we've seen before don't need to be scanned again. The least recently used discs are dropped when it gets too big."""
+    def __init__(self, Path, MaxEntries=200, MaxBytes=1048576):
+        """Load the cache from Path, if it exists"""
+        self.Path = Path
+        self.MaxEntries = MaxEntries
+        self.MaxBytes = MaxBytes
+        self.Lock = threading.Lock()
+        self.Entries = {}
+        self.Load()
+
+    def Load(self):
+        """Load the cache file, starting with an empty cache if it doesn't exist or can't be read"""
+        try:
+            with open(self.Path, "r") as File:
+                Data = json.load(File)
+
+            if Data.get("Version") == 1:
+                self.Entries = Data["Entries"]
+
+        except (IOError, OSError, ValueError, KeyError, AttributeError) as Error:
+            logger.debug("Tools: ScanCache().Load(): Not using scan cache at "+self.Path+" ("+unicode(Error)+")...")
+            self.Entries = {}
+
+    def Get(self, Fingerprint):
+        """Return the cached information for the disc with the given fingerprint (a dictionary), or None if we haven't seen it before"""
+        with self.Lock:
+            Entry = self.Entries.get(Fingerprint)
+
+            if Entry != None:
+                Entry["LastUsed"] = time.time()
+
+            return Entry
+
+    def Update(self, Fingerprint, **Info):
+        """Add the given information to the entry for the disc with the given fingerprint"""
+        with self.Lock:
+            Entry = self.Entries.setdefault(Fingerprint, {})
+            Entry.update(Info)
+            Entry["LastUsed"] = time.time()
+
+            #Drop the least recently used discs if there are too many.
+            while len(self.Entries) > self.MaxEntries:
+                self.EvictOldest()
+
+    def Remove(self, Fingerprint):
+        """Forget the disc with the given fingerprint, so it's read again next time it's seen"""
+        with self.Lock:
+            self.Entries.pop(Fingerprint, None)
+
+    def EvictOldest(self):
+        """Remove the least recently used entry. The caller must hold self.Lock."""
+        Oldest = min(self.Entries, key=lambda Key: self.Entries[Key].get("LastUsed", 0))
+        del self.Entries[Oldest]
+
+    def Save(self):
+        """Save the cache to disk in a compact format, replacing the old file in one go so it's never left half-written"""
+        with self.Lock:
+            while True:
+                Data = json.dumps({"Version": 1, "Entries": self.Entries}, separators=(",", ":"))
+
+                if len(Data) <= self.MaxBytes or len(self.Entries) <= 1:
+                    break
+
+                self.EvictOldest()
+
+        try:
+            if not os.path.isdir(os.path.dirname(self.Path)):
+                os.makedirs(os.path.dirname(self.Path))
+
+            with open(self.Path+".tmp", "w") as File:
+                File.write(Data)
+
+            os.rename(self.Path+".tmp", self.Path)
+
+        except (IOError, OSError) as Error:
+            logger.warning("Tools: ScanCache().Save(): Couldn't save scan cache to "+self.Path+" ("+unicode(Error)+")...")
+
+#End Scan Cache.
+#Begin Main Class.
 class Main():
+    def GetMountTable(self):
+        """Return the shared mount table index, creating it or bringing it up to date first if needed"""
+        global MountIndex
+
+        with SharedLock:
+            if MountIndex == None:
+                MountIndex = MountTable()
+                return MountIndex
+
+        MountIndex.Refresh()
+        return MountIndex
+
     def GetDiskMountPoint(self, Device):
         """Find if the given device is mounted or not, and return the mount point, or None if it isn't mounted"""
+        return self.GetMountTable().GetMountPoint(Device)
+
+    def GetMediaFingerprint(self, Device, MountPoint):
+        """Return a string identifying the media in the given device, for the scan cache. This normally only reads the ISO9660 primary volume descriptor (label, size, and creation time), falling back to the size and label of the mounted filesystem."""
+        try:
+            with open(Device, "rb") as Disc:
+                Disc.seek(16 * 2048)
+                Descriptor = Disc.read(2048)
+
+            #Check it's a primary volume descriptor.
+            if Descriptor[0:6] == b"\x01CD001":
+                return "iso9660:"+hashlib.sha1(Descriptor[40:72] + Descriptor[80:88] + Descriptor[813:830]).hexdigest()
+
+        except (IOError, OSError) as Error:
+            logger.debug("Tools: Main().GetMediaFingerprint(): Couldn't read volume descriptor from "+Device+" ("+unicode(Error)+"). Using filesystem information instead...")
+
+        Info = os.statvfs(MountPoint)
+        Details = [os.path.basename(MountPoint), Info.f_blocks, Info.f_frsize, Info.f_files, os.stat(MountPoint).st_mtime]
+        return "statvfs:"+hashlib.sha1(repr(Details).encode("utf-8")).hexdigest()
 
-        #Run a command to get filesystem info.
-        Output = subprocess.check_output(["lsblk", "-r"]).split("\n")
+    def ListDirectory(self, Path, Limit=None, Timeout=None):
+        """Return a list of (name, is directory, inode number) tuples for the given directory, stopping after Limit entries if it's given. With scandir this comes straight from the directory entries, without a stat() for each file. If Timeout is given, return None if reading the directory takes longer than that (eg because the drive is retrying a scratched sector)."""
+        global Lister
 
-        #Read the output and find the info. ('None' will be returned automatically if we don't return anything, for example if the device isn't found in Output)
-        for Line in Output:
+        if Timeout != None:
+            #The read can't be interrupted, so do it in another thread, and leave that thread behind if it stalls.
+            with SharedLock:
+                if Lister == None:
+                    Lister = DirectoryLister()
+
+            return Lister.List(Path, Limit, Timeout)
+
+        if scandir != None:
+            Entries = scandir(Path)
 
             try:
-                Dev = "/dev/"+Line.split()[0]
-                MountPoint = ' '.join(Line.split()[6:]).replace(' ', '\\ ').replace("x20", " ")
+                return [(Entry.name, Entry.is_dir(follow_symlinks=False), Entry.inode()) for Entry in itertools.islice(Entries, Limit)]
+
+            finally:
+                #Close the directory now if we stopped early, rather than whenever the iterator is garbage collected. Older versions of the scandir module can't do this.
+                if hasattr(Entries, "close"):
+                    Entries.close()
+
+        Entries = []
+
+        for Name in os.listdir(Path)[:Limit]:
+            FullPath = os.path.join(Path, Name)
+            Entries.append((Name, os.path.isdir(FullPath) and not os.path.islink(FullPath), os.lstat(FullPath).st_ino))
+
+        return Entries
+
+    def ScanDisc(self, MountPoint, Rules=None, Token=None):
+        """Scan the whole disc once (except what Rules, a ScanRules, says to skip), and return a ScanResult with the autorun files and exe files on it. The scan stops early if Token (a CancelToken) is cancelled."""
+        Result = ScanResult(MountPoint)
 
-            except IndexError:
+        for ExeFiles in self.IterScanDisc(MountPoint, Result, Rules, Token):
+            pass
+
+        return Result
+
+    def IterScanDisc(self, MountPoint, Result, Rules=None, Token=None):
+        """Scan the whole disc once (except what Rules, a ScanRules, says to skip), filling in Result (a ScanResult) as we go, and yield a list of the exe files in each directory (which may be empty) as soon as it's been read. Stop iterating (or close the generator), or cancel Token (a CancelToken), to stop the scan. Directories that can't be read, or stall, are skipped and recorded in Result, and if the scan stops early (eg because it ran out of time) Result is marked as truncated. The root is read first, and then the other directories in order of inode number, which on ISO9660 and UDF discs follows where their directory entries are on the disc, so the drive seeks much less than it does with os.walk()."""
+        logger.debug("Tools: Main().IterScanDisc(): Scanning "+MountPoint+"...")
+
+        if Rules == None:
+            Rules = ScanRules()
+
+        Limit = None
+
+        if Rules.MaxEntriesPerDir != None:
+            #Read one more than the limit, so we know if there were more.
+            Limit = Rules.MaxEntriesPerDir + 1
+
+        Deadline = Rules.GetDeadline(Result.StartTime)
+        Directories = [(0, MountPoint, "", 0)]
+
+        while Directories != []:
+            if Token != None and Token.IsCancelled():
+                Result.Truncate(Token.Reason)
+                break
+
+            if Deadline != None and time.time() > Deadline:
+                Result.Truncate("it took longer than "+unicode(Rules.TimeLimit)+" seconds")
+                break
+
+            Inode, Directory, RelativePath, Depth = heapq.heappop(Directories)
+
+            try:
+                Entries = self.ListDirectory(Directory, Limit, Rules.StallTimeout)
+
+            except (IOError, OSError) as Error:
+                logger.warning("Tools: Main().IterScanDisc(): Couldn't read "+Directory+" ("+unicode(Error)+"). Skipping it...")
+                Result.Errors.append(Directory)
                 continue
 
-            else:
+            if Entries == None:
+                logger.warning("Tools: Main().IterScanDisc(): Reading "+Directory+" took longer than "+unicode(Rules.StallTimeout)+" seconds. Skipping it...")
+                Result.Stalled.append(Directory)
+                continue
+
+            Result.Directories += 1
+            ExeFiles = []
+
+            if Limit != None and len(Entries) == Limit:
+                logger.debug("Tools: Main().IterScanDisc(): Only reading the first "+unicode(Rules.MaxEntriesPerDir)+" entries in "+Directory+"...")
+                Result.Capped += 1
+                Entries.pop()
+
+            for Name, IsDirectory, Inode in Entries:
+                if IsDirectory:
+                    Reason = Rules.CheckDirectory(os.path.join(RelativePath, Name), Depth + 1)
+
+                    if Reason == "pattern":
+                        Result.Pruned += 1
+
+                    elif Reason == "depth":
+                        Result.DepthLimited += 1
+
+                    else:
+                        heapq.heappush(Directories, (Inode, os.path.join(Directory, Name), os.path.join(RelativePath, Name), Depth + 1))
+
+                    continue
+
+                Result.Files += 1
+                UpperName = Name.upper()
+
+                if UpperName == "AUTORUN.INF":
+                    Result.AutorunFiles.append(os.path.join(Directory, Name))
+
+                elif UpperName.endswith(".EXE"):
+                    ExeFiles.append(os.path.join(Directory, Name))
+
+            #Get the sizes of the exe files, for ranking them. We've just read the directory, so this doesn't need to read the disc again.
+            for File in ExeFiles:
                 try:
-                    if Dev == Device and MountPoint[0] == "/":
-                        return MountPoint
-                except: continue
+                    Result.Sizes[File] = os.lstat(File).st_size
+
+                except (IOError, OSError):
+                    Result.Sizes[File] = None
+
+            #Yield even if there aren't any, so the caller can cancel the scan between directories.
+            Result.ExeFiles.extend(ExeFiles)
+            yield ExeFiles
+
+        Result.Duration = time.time() - Result.StartTime
+        logger.debug("Tools: Main().IterScanDisc(): Done! Stats: "+unicode(Result.GetStats())+"...")
+
+    def GetDepth(self, MountPoint, Path):
+        """Return how many directories deep Path is inside MountPoint (0 for a file in the root)"""
+        return os.path.relpath(Path, MountPoint).count(os.sep)
+
+    def ScanImage(self, Path, MountPoint="", Rules=None, Token=None):
+        """Scan an ISO9660 device or image file without it being mounted (see IterScanImage()), and return a ScanResult. Raises ValueError if it isn't ISO9660, or IOError/OSError if it can't be read at all."""
+        Result = ScanResult(MountPoint)
+
+        for ExeFiles in self.IterScanImage(Path, MountPoint, Result, Rules, Token):
+            pass
+
+        return Result
+
+    def IterScanImage(self, Path, MountPoint, Result, Rules=None, Token=None):
+        """Scan an ISO9660 device or image file by reading its directory records directly, without it being mounted, filling in Result (a ScanResult) as we go, and yield a list of the exe files in each directory as soon as it's been read, like IterScanDisc(). Paths in the result are under MountPoint, which should be where the disc is mounted (if it is). Rules (a ScanRules) are applied to the result, as reading the directories this way is cheap anyway, apart from the time limit, which stops the scan early like cancelling Token (a CancelToken) does. Raises ValueError if it isn't ISO9660, or IOError/OSError if it can't be read at all, before yielding anything."""
+        logger.debug("Tools: Main().IterScanImage(): Scanning "+Path+" without using the mounted filesystem...")
+
+        if Rules == None:
+            Rules = ScanRules()
+
+        Deadline = Rules.GetDeadline(Result.StartTime)
+        Disc = iso9660.Image(Path)
+
+        #Directories we're skipping (including everything under them), and how many entries we've seen in each directory.
+        Skipped = set()
+        Counts = collections.defaultdict(int)
+
+        try:
+            for Entries in Disc.Walk(Cancelled=lambda: (Token != None and Token.IsCancelled()) or (Deadline != None and time.time() > Deadline)):
+                ExeFiles = []
+
+                for Item in Entries:
+                    Parent = os.path.dirname(Item.Path)
+
+                    if Parent in Skipped:
+                        if Item.IsDirectory:
+                            Skipped.add(Item.Path)
+
+                        continue
+
+                    Counts[Parent] += 1
+
+                    if Rules.MaxEntriesPerDir != None and Counts[Parent] > Rules.MaxEntriesPerDir:
+                        if Counts[Parent] == Rules.MaxEntriesPerDir + 1:
+                            Result.Capped += 1
+
+                        if Item.IsDirectory:
+                            Skipped.add(Item.Path)
+
+                        continue
+
+                    if Item.IsDirectory:
+                        Reason = Rules.CheckDirectory(Item.Path, Item.Path.count("/") + 1)
+
+                        if Reason == "pattern":
+                            Result.Pruned += 1
+                            Skipped.add(Item.Path)
+
+                        elif Reason == "depth":
+                            Result.DepthLimited += 1
+                            Skipped.add(Item.Path)
+
+                        else:
+                            Result.Directories += 1
+
+                        continue
+
+                    Result.Files += 1
+                    UpperName = os.path.basename(Item.Path).upper()
+
+                    if UpperName == "AUTORUN.INF":
+                        Result.AutorunFiles.append(os.path.join(MountPoint, Item.Path))
+
+                    elif UpperName.endswith(".EXE"):
+                        ExeFiles.append(os.path.join(MountPoint, Item.Path))
+                        Result.Sizes[ExeFiles[-1]] = Item.Size
+
+                #Yield even if there aren't any, so the caller can cancel the scan between directories.
+                Result.ExeFiles.extend(ExeFiles)
+                yield ExeFiles
+
+        finally:
+            Disc.Close()
+
+        Result.Errors.extend(os.path.join(MountPoint, Directory) for Directory in Disc.FailedDirectories)
+
+        if Disc.Truncated and Token != None and Token.IsCancelled():
+            Result.Truncate(Token.Reason)
+
+        elif Disc.Truncated:
+            Result.Truncate("it took longer than "+unicode(Rules.TimeLimit)+" seconds")
+
+        #Count the root directory too, like ScanDisc() does.
+        Result.Directories += 1
+        Result.Duration = time.time() - Result.StartTime
+        logger.debug("Tools: Main().IterScanImage(): Done! Read "+unicode(Disc.BytesRead)+" bytes in "+unicode(Disc.Reads)+" reads. Stats: "+unicode(Result.GetStats())+"...")
+
+    def FindAutorunFile(self, MountPoint, Scan=None, MaxDepth=0, Token=None, StallTimeout=None, Index=None):
+        """Return the path to the shallowest autorun file on the disc, or None if there isn't one. Windows only uses autorun files in the root, so by default only the root is checked, but non-standard discs can be searched up to MaxDepth directories deep. Uses Scan (a ScanResult) if given, to avoid reading the disc again. The search stops if Token (a CancelToken) is cancelled, and skips directories that take longer than StallTimeout seconds to read. The directories that are read are added to Index (a PathIndex) if it's given."""
+        logger.debug("Tools: Main().FindAutorunFile(): Finding and returning any autorun file found in "+MountPoint+" (up to "+unicode(MaxDepth)+" directories deep)...")
+
+        if Scan != None:
+            #The scan isn't breadth-first, so find the shallowest one ourselves.
+            AutorunFiles = [(self.GetDepth(MountPoint, File), File) for File in Scan.AutorunFiles]
+            AutorunFiles = [Item for Item in AutorunFiles if Item[0] <= MaxDepth]
 
-    def FindAutorunFile(self, MountPoint): #*** test ***
-        """Use the find command to look for autorun files, and return the result."""
-        logger.debug("Tools: Main().FindAutorunFile(): Finding and returning any autorun file found in "+MountPoint+"...")
+            if AutorunFiles == []:
+                return None
 
-        #Just in case there's more than one autorun file (incredibly unlikely), return the first if there is one.
-        FilesGenerator = os.walk(MountPoint.replace("\\", ""))
+            AutorunFile = min(AutorunFiles)[1]
+            logger.info("Tools: Main().FindAutorunFile(): Found autorun file at: "+AutorunFile+"...")
+            return AutorunFile
 
-        AutorunFile = None
+        #Search breadth-first, so we check the root first and stop at the first autorun file we find.
+        Directories = collections.deque([(MountPoint, "", 0)])
 
-        for BaseDir, SubDir, Files in FilesGenerator:
-            for File in Files:
-                if File.upper() == "AUTORUN.INF":
-                    AutorunFile = os.path.join(BaseDir, File)
+        while Directories:
+            if Token != None and Token.IsCancelled():
+                logger.warning("Tools: Main().FindAutorunFile(): Stopped looking for autorun files, because "+Token.Reason+"...")
+                return None
+
+            Directory, RelativePath, Depth = Directories.popleft()
+
+            try:
+                Entries = self.ListDirectory(Directory, Timeout=StallTimeout)
+
+            except (IOError, OSError) as Error:
+                logger.warning("Tools: Main().FindAutorunFile(): Couldn't read "+Directory+" ("+unicode(Error)+"). Skipping it...")
+                continue
+
+            if Entries == None:
+                logger.warning("Tools: Main().FindAutorunFile(): Reading "+Directory+" took longer than "+unicode(StallTimeout)+" seconds. Skipping it...")
+                continue
+
+            if Index != None:
+                Index.AddDirectory(RelativePath, Entries)
+
+            for Name, IsDirectory, Inode in Entries:
+                if not IsDirectory and Name.upper() == "AUTORUN.INF":
+                    AutorunFile = os.path.join(Directory, Name)
                     logger.info("Tools: Main().FindAutorunFile(): Found autorun file at: "+AutorunFile+"...")
-                    break
+                    return AutorunFile
 
-        #Return the file or None if not found.
-        return AutorunFile
+            if Depth < MaxDepth:
+                Directories.extend((os.path.join(Directory, Name), os.path.join(RelativePath, Name), Depth + 1) for Name, IsDirectory, Inode in Entries if IsDirectory)
 
-    def ParseAutorunFile(self, AutorunFile):
-        """Read the autorun file, and return the path to an exe file listed inside, if there is one"""
-        logger.debug("Tools: Main().ParseAutorunFile(): Finding and returning exe file info found in "+AutorunFile+" (if any)...")
-        ExeFile = None
+        return None
 
-        #Open the file.
-        File = open(AutorunFile, "r")
+    def DecodeAutorunFile(self, Data):
+        """Return the text of an autorun file, and the encoding it was in. Uses the byte order mark if there is one, and otherwise guesses between UTF-16, UTF-8 and the Windows ANSI code page."""
+        if Data[:3] == b"\xef\xbb\xbf":
+            return Data[3:].decode("utf-8", "replace"), "utf-8"
 
-        #Read each line, looking for '.exe' and one (or both) of 'open=' and 'shellexecute='.
-        for Line in File.readlines():
-            if "open=" in Line or "shellexecute=" in Line:
-                if ".exe" in Line:
-                    #Save the formatted info in a temporary variable, and break out of the loop.
-                    #First, just get whatever comes after '=' on this line.
-                    Temp = Line.split("=")[-1]
+        elif Data[:2] == b"\xff\xfe":
+            return Data[2:].decode("utf-16-le", "replace"), "utf-16-le"
 
-                    #Next remove any spaces that appear after the end of the filename, which mess things up.
-                    Temp = Temp.split(".exe")[0]+".exe"
+        elif Data[:2] == b"\xfe\xff":
+            return Data[2:].decode("utf-16-be", "replace"), "utf-16-be"
 
-                    #Finally, swap '\' for '/', escape whitespace with '\', and remove the '\n' from the end of the line.
-                    ExeFile = Temp.replace('\\', '/').replace("\\", "").replace('\n', '')
-                    break
+        #UTF-16 without a byte order mark has a NUL in every other byte of ASCII text.
+        Start = Data[:64]
+
+        if Start[1::2].count(b"\x00") > len(Start) // 4:
+            return Data.decode("utf-16-le", "replace"), "utf-16-le"
+
+        elif Start[0::2].count(b"\x00") > len(Start) // 4:
+            return Data.decode("utf-16-be", "replace"), "utf-16-be"
+
+        try:
+            return Data.decode("utf-8"), "utf-8"
+
+        except UnicodeDecodeError as Error:
+            #A bounded read can cut the last character in half.
+            if Error.start >= len(Data) - 3:
+                try:
+                    return Data[:Error.start].decode("utf-8"), "utf-8"
+
+                except UnicodeDecodeError:
+                    pass
+
+        return Data.decode("cp1252", "replace"), "cp1252"
+
+    def SplitAutorunCommand(self, Command):
+        """Split a command from an autorun file into the program (with '/' as the separator) and its arguments (or None)"""
+        Command = Command.strip()
+
+        if Command[:1] == '"':
+            Program, Quote, Args = Command[1:].partition('"')
+
+        else:
+            #Unquoted paths can have spaces in them, so split after the extension if there is one.
+            Match = re.match(r"(.*?\.(?:exe|com|bat|cmd))(?:\s+|$)(.*)", Command, re.IGNORECASE)
+
+            if Match != None:
+                Program, Args = Match.groups()
+
+            else:
+                Program, Space, Args = Command.partition(" ")
+
+        Program = Program.strip().replace("\\", "/")
+        Args = Args.strip()
+
+        if Program == "":
+            Program = None
+
+        if Args == "":
+            Args = None
+
+        return Program, Args
 
-                elif ".EXE" in Line: #*** Test this ***
-                    #Save the formatted info in a temporary variable, and break out of the loop.
-                    #First, just get whatever comes after '=' on this line.
-                    Temp = Line.split("=")[-1]
+    def ReadAutorunFile(self, AutorunFile, MaxSize=65536):
+        """Read the autorun file in one pass, and return a dictionary of what it says: the Section and Action ("open", "shellexecute" or "shell") the program came from, the Exe file and its Args, the Icon, the Label, and the file's Encoding. Anything it doesn't say is None. Only the first MaxSize bytes are read, as real autorun files are tiny."""
+        logger.debug("Tools: Main().ReadAutorunFile(): Reading "+AutorunFile+"...")
 
-                    #Next remove any spaces that appear after the end of the filename, which mess things up.
-                    Temp = Temp.split(".EXE")[0]+".EXE"
+        with open(AutorunFile, "rb") as File:
+            Data = File.read(MaxSize)
 
-                    #Finally, swap '\' for '/', escape whitespace with '\', and remove the '\n' from the end of the line.
-                    ExeFile = Temp.replace('\\', '/').replace("\\", "").replace('\n', '')
+        Text, Encoding = self.DecodeAutorunFile(Data)
+
+        #Don't use a line that was cut off.
+        if len(Data) == MaxSize:
+            Text = Text[:Text.rfind("\n")+1]
+
+        #Keys (in lower case) in each section. If a key appears more than once, the first one wins, like on Windows.
+        Sections = {}
+        Keys = None
+
+        for Line in Text.splitlines():
+            Line = Line.strip()
+
+            if Line == "" or Line[0] == ";":
+                continue
+
+            elif Line[0] == "[":
+                Keys = Sections.setdefault(Line[1:].split("]")[0].strip().lower(), {})
+
+            elif Keys != None and "=" in Line:
+                Key, Value = Line.split("=", 1)
+                Key = Key.strip().lower()
+
+                if Key not in Keys:
+                    Keys[Key] = Value.strip()
+
+        Info = {"Section": None, "Action": None, "Exe": None, "Args": None, "Icon": None, "Label": None, "Encoding": Encoding}
+
+        #Keys in the section for 32-bit x86 override the ones in [autorun], like they do on Windows.
+        for Section in ("autorun.x86", "autorun"):
+            Keys = Sections.get(Section, {})
+
+            if Info["Icon"] == None and Keys.get("icon", "") != "":
+                #Icons can be followed by the index of the icon to use in the file.
+                Info["Icon"] = Keys["icon"].split(",")[0].strip().strip('"').replace("\\", "/")
+
+            if Info["Label"] == None and Keys.get("label", "") != "":
+                Info["Label"] = Keys["label"].strip('"')
+
+            if Info["Action"] != None:
+                continue
+
+            Action = None
+
+            for Key in ("open", "shellexecute"):
+                if Keys.get(Key, "") != "":
+                    Action = Key
+                    Command = Keys[Key]
                     break
 
-        #Close the file.
-        File.close()
+            else:
+                #"shell=<verb>" makes "shell\<verb>\command=" the default action.
+                Verb = Keys.get("shell", "").lower()
+
+                if Verb != "" and Keys.get("shell\\"+Verb+"\\command", "") != "":
+                    Action = "shell"
+                    Command = Keys["shell\\"+Verb+"\\command"]
+
+            if Action != None:
+                Info["Exe"], Info["Args"] = self.SplitAutorunCommand(Command)
+
+                if Info["Exe"] != None:
+                    Info["Section"] = Section
+                    Info["Action"] = Action
+
+        return Info
+
+    def ParseAutorunFile(self, AutorunFile):
+        """Read the autorun file, and return the path to the exe file it runs, if there is one"""
+        logger.debug("Tools: Main().ParseAutorunFile(): Finding and returning exe file info found in "+AutorunFile+" (if any)...")
+        Info = self.ReadAutorunFile(AutorunFile)
+        ExeFile = Info["Exe"]
+
+        if ExeFile != None:
+            logger.debug("Tools: Main().ParseAutorunFile(): Found "+Info["Action"]+"="+ExeFile+" in ["+Info["Section"]+"] (arguments: "+unicode(Info["Args"])+", label: "+unicode(Info["Label"])+", encoding: "+Info["Encoding"]+")...")
+
+            #Windows adds ".exe" to programs without an extension.
+            if "." not in ExeFile.split("/")[-1]:
+                ExeFile += ".exe"
+
+            #We can only run exe files (shellexecute can open documents too).
+            if ExeFile.lower().endswith(".exe") == False:
+                logger.info("Tools: Main().ParseAutorunFile(): The autorun file runs "+ExeFile+", which isn't an exe file. Ignoring it...")
+                ExeFile = None
 
         #Return the info.
         logger.debug("Tools: Main().ParseAutorunFile(): Done!")
         return ExeFile
 
-    def ScanForExeFiles(self, MountPoint): #*** Test ***
-        """Use 'find' to look for exe files in the given mountpoint"""
+    def ScanForExeFiles(self, MountPoint, Scan=None):
+        """Return a list of the exe files in the given mountpoint. Uses Scan (a ScanResult) if given, to avoid scanning the disc again."""
         logger.debug("Tools: Main().ScanForExeFiles(): Finding and returning and exe files found in "+MountPoint+"...")
 
-        #Get a list of files.
-        ExeFilesGenerator = os.walk(MountPoint.replace("\\", ""))
-        ExeFiles = []
-
-        for BaseDir, SubDir, Files in ExeFilesGenerator:
-            for File in Files:
-                if ".EXE" in File.upper():
-                    ExeFiles.append(os.path.join(BaseDir, File))
+        if Scan == None:
+            Scan = self.ScanDisc(MountPoint)
 
         #Return the list.
         logger.debug("Tools: Main().ScanForExeFiles(): Done!")
-        return ExeFiles
+        return Scan.ExeFiles[:]
+
+#End Main Class.
@@ -22,10 +22,7 @@ from __future__ import unicode_literals
 
 #Import modules
 from distutils.version import LooseVersion
-from bs4 import BeautifulSoup
 
-import wx
-import wx.animate
 import sys
 import threading
 import time
@@ -34,111 +31,1362 @@ import shutil
 import subprocess
 import logging
 import getopt
+import socket
+import select
+import re
+import collections
+import hashlib
+import json
+import mmap
+import struct
+import bisect
+import heapq
+import fnmatch
+import itertools
+import signal
+import errno
+import fcntl
+
+try:
+    import xml.etree.cElementTree as ElementTree
+
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+
+try:
+    import Queue
+
+except ImportError:
+    import queue as Queue
+
+try:
+    from os import scandir
+
+except ImportError:
+    #Use the backport on Python 2 if it's installed, otherwise Tools falls back to os.listdir().
+    try:
+        from scandir import scandir
+
+    except ImportError:
+        scandir = None
+
+#Import custom-made modules
+import GetDevInfo
+import Tools
+
+from GetDevInfo.getdevinfo import Main as DevInfoTools
+from Tools.tools import Main as BackendTools
+from Tools.tools import DeviceEventMonitor
+from Tools.tools import Scheduler
+from Tools.tools import Future
+from Tools.tools import CancelToken
+from Tools.tools import DeviceInfoCache
+from Tools.tools import WorkerPool
+from Tools.tools import Prefetcher
+from Tools.tools import InstallerRanker
+from Tools.tools import ExeClassifier
+from Tools.tools import ScanCache
+from Tools.tools import ScanResult
+from Tools.tools import ScanRules
+from Tools.tools import PathIndex
+from Tools.tools import WineSession
+from Tools.ipc import Channel
+from Tools.ipc import ControlServer
+from Tools.ipc import GetControlSocketPath
+
+#Define the version number, release date, and release type as global variables.
+Version = "2.0.2"
+ReleaseDate = "11/11/2016"
+ReleaseType = "Stable"
+
+def usage():
+    print("\nUsage: WineAutostart.py [OPTION]\n")
+    print("       -h, --help:                   Show this help message")
+    print("       -q, --quiet:                  Show only warning, error and critical error messages in the log file. Very unhelpful for debugging, and not recommended.")
+    print("       -v, --verbose:                Enable logging of info messages, as well as warnings, errors and critical errors.")
+    print("                                     Not the best for debugging, but acceptable if there is little disk space.")
+    print("       -d, --debug:                  Log lots of boring debug messages, as well as information, warnings, errors and critical errors. Usually used for diagnostic purposes.")
+    print("                                     The default, as it's very helpful if problems are encountered, and the user needs help")
+    print("       --daemon:                     Run without the GUI or the indicator (and without needing wxPython), for unattended machines. Questions are answered")
+    print("                                     using the DaemonAutorun and DaemonAutoscan settings, and it's controlled through the control socket.\n")
+    print("Wine Autostart "+Version+" is released under the GNU GPL Version 3")
+    print("Copyright (C) Hamish McIntyre-Bhatty 2013-2016")
+
+#Check cmdline options
+try:
+    opts, args = getopt.getopt(sys.argv[1:], "hqvd", ["help", "quiet", "verbose", "debug", "daemon"])
+
+except getopt.GetoptError as err:
+    #Invalid option. Show the help message and then exit.
+    #Show the error.
+    print(unicode(err))
+    usage()
+    sys.exit(2)
+
+#Make Wine Autostart's temporary directory, clearing it if it is already present.
+if os.path.isdir("/tmp/wineautostart"):
+    shutil.rmtree("/tmp/wineautostart")
+
+os.mkdir("/tmp/wineautostart")
+
+#Set up logging.
+logger = logging.getLogger('Wine Autostart')
+logging.basicConfig(filename='/tmp/wineautostart/wineautostart.log', format='%(asctime)s - %(name)s - %(levelname)s: %(message)s', datefmt='%d/%m/%Y %I:%M:%S %p')
+logger.setLevel(logging.DEBUG)
+
+#Determine the option(s) given, and change the level of logging based on cmdline options.
+DaemonMode = False
+
+for o, a in opts:
+    if o in ["-q", "--quiet"]:
+        print("Setting logging level to warning mode..")
+        logger.setLevel(logging.WARNING)
+    elif o in ["-v", "--verbose"]:
+        print("Setting logging level to verbose mode..")
+        logger.setLevel(logging.INFO)
+    elif o in ["-d", "--debug"]:
+        print("Setting logging level to debug mode..")
+        logger.setLevel(logging.DEBUG)
+    elif o == "--daemon":
+        DaemonMode = True
+    elif o in ["-h", "--help"]:
+        usage()
+        sys.exit()
+    else:
+        assert False, "unhandled option"
+
+#Setup custom-made modules (make global variables accessible inside the packages).
+GetDevInfo.getdevinfo.subprocess = subprocess
+GetDevInfo.getdevinfo.os = os
+GetDevInfo.getdevinfo.logger = logger
+GetDevInfo.getdevinfo.ElementTree = ElementTree
+
+Tools.tools.subprocess = subprocess
+Tools.tools.logger = logger
+Tools.tools.os = os
+Tools.tools.time = time
+Tools.tools.socket = socket
+Tools.tools.select = select
+Tools.tools.re = re
+Tools.tools.threading = threading
+Tools.tools.collections = collections
+Tools.tools.scandir = scandir
+Tools.tools.hashlib = hashlib
+Tools.tools.json = json
+Tools.tools.Queue = Queue
+Tools.tools.mmap = mmap
+Tools.tools.struct = struct
+Tools.tools.heapq = heapq
+Tools.tools.fnmatch = fnmatch
+Tools.tools.itertools = itertools
+Tools.tools.iso9660 = Tools.iso9660
+Tools.tools.errno = errno
+Tools.tools.fcntl = fcntl
+Tools.tools.SharedLock = threading.Lock()
+
+Tools.iso9660.os = os
+Tools.iso9660.mmap = mmap
+Tools.iso9660.struct = struct
+Tools.iso9660.logger = logger
+
+Tools.ipc.json = json
+Tools.ipc.threading = threading
+Tools.ipc.Future = Future
+Tools.ipc.os = os
+Tools.ipc.socket = socket
+Tools.ipc.logger = logger
+
+#Begin Load Config function.
+def LoadConfig():
+    """Read the config file into the global settings variables, using defaults for any settings that aren't there. Return a tuple: whether the config file was found, and whether any defaults had to be used."""
+    #Define all global vars.
+    global StartOnBoot
+    global StartupUpdateCheck
+    global UseWineAutoscan
+    global PromptBeforeScanning
+    global DevicesToMonitor
+    global AutorunSearchDepth
+    global ScanPruneDirs
+    global ScanMaxDepth
+    global ScanMaxEntriesPerDir
+    global ScanTimeLimit
+    global ScanStallTimeout
+    global DaemonAutorun
+    global DaemonAutoscan
+    ConfigPresent = True
+
+    #Set them all to initial values.
+    DevicesToMonitor = []
+    UseWineAutoscan = None
+    StartOnBoot = None
+    PromptBeforeScanning = None
+    StartupUpdateCheck = None
+    AutoConfig = False
+
+    #Advanced settings, which aren't in the settings window. Use defaults silently if they aren't set.
+    AutorunSearchDepth = 0
+    ScanPruneDirs = []
+    ScanMaxDepth = None
+    ScanMaxEntriesPerDir = None
+    ScanTimeLimit = 300
+    ScanStallTimeout = 20
+
+    #What the daemon (--daemon) does instead of asking the user: run exe files named in autorun information, and scan discs without any, running the likeliest installer.
+    DaemonAutorun = True
+    DaemonAutoscan = True
+
+    #Check the file exists. If it doesn't we'll use default values.
+    if os.path.isfile(os.environ["HOME"]+"/.wineautostart.cfg"):
+
+        #Open it.
+        logger.info("LoadConfig(): Found config file at "+os.environ["HOME"]+"/.wineautostart.cfg. Opening it...")
+        ConfigFile = open(os.environ["HOME"]+"/.wineautostart.cfg", "r")
+
+        #Loop through, reading all required settings.
+        logger.info("LoadConfig(): Reading configuration from file...")
+
+        for line in ConfigFile:
+
+            #Determine what the daemon does with exe files named in autorun information (advanced setting).
+            if "DaemonAutorun" in line and '#' not in line:
+                try:
+                    DaemonAutorun = bool(int(line.split()[2]))
+                    logger.debug("LoadConfig(): Found configuration for DaemonAutorun ("+unicode(DaemonAutorun)+")...")
+
+                except (IndexError, ValueError):
+                    logger.warning("LoadConfig(): Invalid configuration for DaemonAutorun! Using default value of 1...")
+
+            #Determine whether the daemon scans discs without autorun information, and runs the likeliest installer (advanced setting).
+            elif "DaemonAutoscan" in line and '#' not in line:
+                try:
+                    DaemonAutoscan = bool(int(line.split()[2]))
+                    logger.debug("LoadConfig(): Found configuration for DaemonAutoscan ("+unicode(DaemonAutoscan)+")...")
+
+                except (IndexError, ValueError):
+                    logger.warning("LoadConfig(): Invalid configuration for DaemonAutoscan! Using default value of 1...")
+
+            #Determine whether we're starting on boot.
+            elif "StartOnBoot" in line and '#' not in line:
+                #Read the value. Also, convert the result into a boolean value, so it can be used easily.
+                StartOnBoot = bool(int(line.split()[2]))
+                logger.debug("LoadConfig(): Found configuration for StartOnBoot ("+unicode(StartOnBoot)+")...")
+
+                #Apply the setting if needed.
+                if StartOnBoot:
+                    if not os.path.isdir(os.environ["HOME"]+"/.config/autostart"):
+                        os.makedirs(os.environ["HOME"]+"/.config/autostart")
+
+                    if not os.path.isfile(os.environ["HOME"]+"/.config/autostart/wineautostart.desktop"):
+                        logger.debug("LoadConfig(): Applying settings for StartOnBoot...")
+                        subprocess.Popen("cp /usr/share/wineautostart/other/wineautostart.desktop "+os.environ["HOME"]+"/.config/autostart/wineautostart.desktop", shell=True).wait()
+
+                else:
+                    if os.path.isfile(os.environ["HOME"]+"/.config/autostart/wineautostart.desktop"):
+                        logger.debug("LoadConfig(): Applying settings for StartOnBoot...")
+                        subprocess.Popen("rm "+os.environ["HOME"]+"/.config/autostart/wineautostart.desktop", shell=True).wait()
+
+            #Determine whether we're checking for updates on startup.
+            elif "StartupUpdateCheck" in line and '#' not in line:
+                #Read the value. Also, convert the result into a boolean value, so it can be used easily.
+                StartupUpdateCheck = bool(int(line.split()[2]))
+                logger.debug("LoadConfig(): Found configuration for StartupUpdateCheck ("+unicode(StartupUpdateCheck)+")...")
+
+            #Determine whether we're using Wine Autoscan.
+            elif "UseWineAutoscan" in line and '#' not in line:
+                #Read the value. Also, convert the result into a boolean value, so it can be used easily.
+                UseWineAutoscan = bool(int(line.split()[2]))
+                logger.debug("LoadConfig(): Found configuration for UseWineAutoscan ("+unicode(UseWineAutoscan)+")...")
+
+            #Determine whether we're to prompt before looking for software on a disk.
+            elif "PromptBeforeScanning" in line and '#' not in line:
+                #Read the value. Also, convert the result into a boolean value, so it can be used easily.
+                PromptBeforeScanning = bool(int(line.split()[2]))
+                logger.debug("LoadConfig(): Found configuration for PromptBeforeScanning ("+unicode(PromptBeforeScanning)+")...")
+
+            #Determine which devices to monitor.
+            elif "DevicesToMonitor" in line and '#' not in line:
+                #Read the value(s).
+                DevicesToMonitor = line.split()[2:]
+
+                if DevicesToMonitor in [['None'], []]:
+                    DevicesToMonitor = []
+
+                else:
+                    logger.debug("LoadConfig(): Found configuration for DevicesToMonitor ("+unicode(DevicesToMonitor)+")...")
+
+            #Determine how deep to look for autorun files (advanced setting, 0 means only the root of the disk, like Windows).
+            elif "AutorunSearchDepth" in line and '#' not in line:
+                try:
+                    AutorunSearchDepth = max(int(line.split()[2]), 0)
+                    logger.debug("LoadConfig(): Found configuration for AutorunSearchDepth ("+unicode(AutorunSearchDepth)+")...")
+
+                except (IndexError, ValueError):
+                    logger.warning("LoadConfig(): Invalid configuration for AutorunSearchDepth! Using default value of 0...")
+
+            #Determine which directories Wine Autoscan skips (advanced setting, a space-separated list of glob patterns, eg "ScanPruneDirs = movies videos data/*").
+            elif "ScanPruneDirs" in line and '#' not in line:
+                ScanPruneDirs = line.partition("=")[2].split()
+                logger.debug("LoadConfig(): Found configuration for ScanPruneDirs ("+unicode(ScanPruneDirs)+")...")
+
+            #Determine how deep Wine Autoscan looks (advanced setting, 0 means only the root of the disk).
+            elif "ScanMaxDepth" in line and '#' not in line:
+                try:
+                    ScanMaxDepth = max(int(line.split()[2]), 0)
+                    logger.debug("LoadConfig(): Found configuration for ScanMaxDepth ("+unicode(ScanMaxDepth)+")...")
+
+                except (IndexError, ValueError):
+                    logger.warning("LoadConfig(): Invalid configuration for ScanMaxDepth! Not limiting the depth...")
+
+            #Determine how many entries Wine Autoscan reads in each directory (advanced setting).
+            elif "ScanMaxEntriesPerDir" in line and '#' not in line:
+                try:
+                    ScanMaxEntriesPerDir = max(int(line.split()[2]), 1)
+                    logger.debug("LoadConfig(): Found configuration for ScanMaxEntriesPerDir ("+unicode(ScanMaxEntriesPerDir)+")...")
+
+                except (IndexError, ValueError):
+                    logger.warning("LoadConfig(): Invalid configuration for ScanMaxEntriesPerDir! Not limiting the number of entries...")
+
+            #Determine how long (in seconds) a scan may take before we give up and use what we've found so far (advanced setting).
+            elif "ScanTimeLimit" in line and '#' not in line:
+                try:
+                    ScanTimeLimit = max(float(line.split()[2]), 1)
+                    logger.debug("LoadConfig(): Found configuration for ScanTimeLimit ("+unicode(ScanTimeLimit)+")...")
+
+                except (IndexError, ValueError):
+                    logger.warning("LoadConfig(): Invalid configuration for ScanTimeLimit! Using default value of 300...")
+
+            #Determine how long (in seconds) to wait for one directory to be read before skipping it (advanced setting).
+            elif "ScanStallTimeout" in line and '#' not in line:
+                try:
+                    ScanStallTimeout = max(float(line.split()[2]), 1)
+                    logger.debug("LoadConfig(): Found configuration for ScanStallTimeout ("+unicode(ScanStallTimeout)+")...")
+
+                except (IndexError, ValueError):
+                    logger.warning("LoadConfig(): Invalid configuration for ScanStallTimeout! Using default value of 20...")
+
+        
+        #Close the config file.
+        ConfigFile.close()
+
+    else:
+        logger.warning("LoadConfig(): Couldn't find the config file! This is probably the first run. Using default config...")
+        ConfigPresent = False
+
+    #Check if we found all settings.
+    if StartOnBoot == None:
+        logger.warning("LoadConfig(): Using default value of True for StartOnBoot...")
+        StartOnBoot = True
+        AutoConfig = True
+
+    if StartupUpdateCheck == None:
+        logger.warning("LoadConfig(): Using default value of True for StartupUpdateCheck...")
+        StartupUpdateCheck = False
+        AutoConfig = True
+
+    if UseWineAutoscan == None:
+        logger.warning("LoadConfig(): Using default value of True for UseWineAutoscan...")
+        UseWineAutoscan = True
+        AutoConfig = True
+
+    if PromptBeforeScanning == None:
+        logger.warning("LoadConfig(): Using default value of True for PromptBeforeScanning...")
+        PromptBeforeScanning = True
+        AutoConfig = True
+
+    if DevicesToMonitor == []:
+        logger.warning("LoadConfig(): Using default value of '/dev/sr0' for DevicesToMonitor...")
+        DevicesToMonitor = ['/dev/sr0']
+        AutoConfig = True
+
+    return ConfigPresent, AutoConfig
+
+#End Load Config function.
+#Begin Frontend class.
+class Frontend():
+    """The parts of Wine Autostart's frontends (MainClass, or Daemon without a GUI) that are the same for both. The backend thread asks its frontend (its ParentWindow) to show messages and answer questions by calling the ShowThread* methods through CallAfter(), which each frontend defines to call a function on its own main thread."""
+    def HandleControlRequest(self, Request):
+        """Handle a request from the control socket, and return the result. Raises ValueError if the request can't be done. Called on the control socket's threads, so starting and stopping the backend is done on the main thread."""
+        Command = Request["Command"]
+        Backend = self.Backend
+
+        if Command == "Status":
+            return {"Version": Version, "RunningBackend": RunningBackend, "RunningSoftware": RunningSoftware, "Status": self.Status, "Devices": DevicesToMonitor, "Scheduler": Backend.Scheduler.GetDiagnostics() if Backend != None else None}
+
+        elif Command == "Start":
+            self.RunOnMainThread(self.StartBackend)
+            return {"RunningBackend": RunningBackend}
+
+        elif Command == "Stop":
+            #Don't let StopBackend() show its dialog, as nobody might be there to see it.
+            if RunningSoftware:
+                raise ValueError("Can't stop the backend while running software")
+
+            self.RunOnMainThread(self.StopBackend)
+            return {"RunningBackend": RunningBackend}
+
+        elif Command == "Rescan":
+            Device = Request.get("Device")
+
+            if Device not in DevicesToMonitor:
+                raise ValueError("Not monitoring device: "+unicode(Device))
+
+            elif RunningBackend == False or Backend == None:
+                raise ValueError("The backend isn't running")
+
+            Backend.RequestRescan(Device)
+            return {"Device": Device}
+
+        elif Command == "ListIgnored":
+            if Backend == None:
+                return []
+
+            DevicesToIgnore = Backend.DevicesToIgnore[:]
+            return [{"Device": DevicesToIgnore[Index], "MountPoint": DevicesToIgnore[Index+1]} for Index in range(0, len(DevicesToIgnore) - 1, 2)]
+
+        elif Command == "Stats":
+            return list(self.RecentScans)
+
+        raise ValueError("Unknown command: "+unicode(Command))
+
+    def RunOnMainThread(self, Function, Timeout=10):
+        """Call Function on the main thread, and wait for it to finish. Raises ValueError if it takes longer than Timeout."""
+        Result = Future()
+        self.CallAfter(self.CallForThread, Function, Result)
+        Result.Result(Timeout=Timeout)
+
+        if Result.IsDone() == False:
+            raise ValueError("Timed out waiting for the main thread")
+
+    def CallForThread(self, Function, Result):
+        """Call Function for another thread, and give it the result (or the exception) through the future, Result"""
+        try:
+            Result.SetResult(Function())
+
+        except Exception as Error:
+            Result.SetError(Error)
+
+#End Frontend class.
+#Start Backend thread.
+class BackendThread(threading.Thread):
+    def __init__(self, ParentWindow):
+        """Initialize and start the thread. ParentWindow is the frontend (MainClass or Daemon) that shows our messages and answers our questions."""
+        self.ParentWindow = ParentWindow
+        threading.Thread.__init__(self)
+        self.DevicesToIgnore = []
+        self.RunningSoftwareDevice = None
+        self.RunningSoftwareMountPoint = None
+        self.Session = None
+        self.Status = None
+
+        #Listen for kernel events on the monitored devices, and for changes to the mount table, so we don't have to poll every second.
+        self.EventMonitor = DeviceEventMonitor(DevicesToMonitor)
+        self.MountTable = BackendTools().GetMountTable()
+
+        #Decides how long to wait between checks, and lets MainClass stop us straight away.
+        self.Scheduler = Scheduler()
+
+        #What we found on discs we've seen before.
+        self.ScanCache = ScanCache(os.environ["HOME"]+"/.config/wineautostart/scancache.json")
+
+        #The parts of discs Wine Autoscan skips.
+        self.ScanRules = ScanRules(ScanPruneDirs, ScanMaxDepth, ScanMaxEntriesPerDir, ScanTimeLimit, ScanStallTimeout)
+
+        #Cancel tokens for the discs we're reading, keyed by drive, so we can stop reading a disc as soon as it's ejected.
+        self.ScanTokens = {}
+
+        #Decides which exe files Wine Autoscan shows first, and which ones Wine can't start at all.
+        self.Ranker = InstallerRanker()
+        self.Classifier = ExeClassifier()
+
+        #Look for media in all of our drives at the same time, with a worker for each drive to scan, and one more for looking up mount points.
+        self.Pool = WorkerPool(Workers=min(len(DevicesToMonitor) + 1, 8))
+
+        #Drives that have been handed to the pool, and (drive, future) pairs for the ones it's finished with, in the order they finished.
+        self.PendingDevices = []
+        self.ReadyDiscs = Queue.Queue()
+
+        #Drives the control socket has asked us to look at again.
+        self.RescanRequests = Queue.Queue()
+
+        #Replace the old backend thread (if any) before starting, as run() stops as soon as we aren't the frontend's backend thread.
+        self.ParentWindow.Backend = self
+        self.start()
+
+    def ShowMsgDlg(self,Message,Kind="info"):
+        """Handle showing thread message dialogs, and wait until the user closes the dialog."""
+        #Use this with: self.ShowMsgDlg(Kind=<kind>, Message=<message>)
+        Result = Future()
+        self.ParentWindow.CallAfter(self.ParentWindow.ShowThreadMsgdlg, kind=Kind, msg=Message, Result=Result)
+        Result.Result()
+
+    def ShowYesNoDlg(self,Message,Title="Wine Autostart - Question",Question=None):
+        """Handle showing thread yes/no dialogs. Return True if the user clicked yes, and False if they clicked no. Question says which question it is, so frontends without dialogs can answer it."""
+        #Use this with: self.ShowYesNoDlg(Message=<message>, Title = <title>, Question=<question>)
+        Result = Future()
+        self.ParentWindow.CallAfter(self.ParentWindow.ShowThreadYesNodlg, msg=Message, title=Title, Result=Result, Question=Question)
+        return Result.Result()
+
+    def FindAutorunExe(self, MountPoint, Token=None):
+        """Try to find an autorun file, and return the exe file it specifies, or None if there isn't a usable one."""
+        Index = PathIndex(MountPoint)
+        AutorunFile = BackendTools().FindAutorunFile(MountPoint, MaxDepth=AutorunSearchDepth, Token=Token, StallTimeout=self.ScanRules.StallTimeout, Index=Index)
+
+        #Check if we found one.
+        if AutorunFile == None:
+            logger.info("BackendThread().FindAutorunExe(): No autorun information found...")
+            return None
+
+        #Now parse the autorun file to try and find an executable.
+        logger.info("BackendThread().FindAutorunExe(): Found autorun file at: "+AutorunFile+". Parsing it...")
+        AutorunExeFile = BackendTools().ParseAutorunFile(AutorunFile)
+
+        #Check if we found one.
+        if AutorunExeFile == None:
+            logger.info("BackendThread().FindAutorunExe(): No exe file specified in autorun info...")
+            return None
+
+        #Paths in autorun files are relative to the directory the autorun file is in, and (like on Windows) their case doesn't have to match the disc's.
+        ExeFile = Index.Resolve(AutorunExeFile, os.path.dirname(AutorunFile), self.ScanRules.StallTimeout)
+
+        if ExeFile == None:
+            #Bad autorun information, because it points at a file that doesn't exist.
+            logger.warning("BackendThread().FindAutorunExe(): Bad autorun information! It points to an executable file ("+AutorunExeFile+") that doesn't exist!")
+            return None
+
+        Info = self.Classifier.Classify(ExeFile)
+
+        if Info["Launchable"] == False:
+            #Don't make the user wait for Wine to fail to start it.
+            logger.warning("BackendThread().FindAutorunExe(): Bad autorun information! It points to a file Wine can't run ("+ExeFile+" is "+Info["Reason"]+")!")
+            return None
+
+        return ExeFile
+
+    def ReadAutorunInfo(self, MountPoint, Fingerprint, Token=None):
+        """Find the exe file specified in the disc's autorun information (using the scan cache if we've seen the disc before), and return it, or None if there isn't one."""
+        Cached = self.ScanCache.Get(Fingerprint)
+
+        if Cached != None and Cached.get("AutorunSearchDepth") == AutorunSearchDepth:
+            logger.info("BackendThread().ReadAutorunInfo(): Using cached autorun information for this disc...")
+            ExeFile = Cached["AutorunExe"]
+
+            if ExeFile != None:
+                ExeFile = os.path.join(MountPoint, ExeFile)
+
+        else:
+            ExeFile = self.FindAutorunExe(MountPoint, Token)
+
+            if Token != None and Token.IsCancelled():
+                #Don't remember that there's no autorun information if we didn't finish looking.
+                pass
+
+            elif ExeFile == None:
+                self.ScanCache.Update(Fingerprint, AutorunExe=None, AutorunSearchDepth=AutorunSearchDepth)
+
+            else:
+                self.ScanCache.Update(Fingerprint, AutorunExe=os.path.relpath(ExeFile, MountPoint), AutorunSearchDepth=AutorunSearchDepth)
+
+        if ExeFile == None:
+            logger.info("BackendThread().ReadAutorunInfo(): No helpful autorun information...")
+
+        return ExeFile
+
+    def AskToRunAutorunExe(self, ExeFile):
+        """Ask the user if he/she wants to run the exe file specified in the disc's autorun information. Return True if so."""
+        logger.info("BackendThread().AskToRunAutorunExe(): Found helpful autorun information! Asking the user if he/she wants to run the specified file ("+ExeFile+")...")
+        Result = self.ShowYesNoDlg(Message="Wine Autostart has found the following Windows software on the CD/DVD you inserted: "+ExeFile+". Do you want to run it?\n\nNote: If you click no, you will be prompted to use Wine Autoscan instead.", Question="RunAutorunExe")
+
+        #Do what the user says.
+        if Result == False:
+            #Try to use Wine Autoscan instead.
+            logger.info("BackendThread().AskToRunAutorunExe(): Not running the software as the user requested. Using Wine Autoscan...")
+            return False
+
+        logger.info("BackendThread().AskToRunAutorunExe(): Running the software as the user requested...")
+        return True
+
+    def IterScan(self, Disc):
+        """Yield lists of (exe file, size) tuples for the disc as they're found, from the scan cache if we've seen it before, or by scanning the disc. Files Wine can't start are left out. The ScanResult is kept in Disc["ScanResult"], and is only cached if the scan was complete."""
+        Device = Disc["Device"]
+        MountPoint = Disc["MountPoint"]
+        Fingerprint = Disc["Fingerprint"]
+        Cached = self.ScanCache.Get(Fingerprint)
+
+        if Cached != None and "Scan" in Cached and Cached.get("ScanRules") == self.ScanRules.GetSignature():
+            logger.info("BackendThread().IterScan(): Using cached scan results for this disc...")
+            Scan = ScanResult(MountPoint)
+            Scan.Import(Cached["Scan"])
+            Disc["ScanResult"] = Scan
+            self.RecordScan(Disc, Scan, Cached=True)
+            yield self.FilterLaunchable(Scan, Scan.ExeFiles)
+            return
+
+        #Read ISO9660 discs' directories straight from the device if we can, as it's much faster than going through the mounted filesystem one directory at a time.
+        if self.MountTable.GetFSType(Device) == "iso9660":
+            Scan = ScanResult(MountPoint)
+            Disc["ScanResult"] = Scan
+            Started = False
+
+            try:
+                for ExeFiles in BackendTools().IterScanImage(Device, MountPoint, Scan, self.ScanRules, Disc["Token"]):
+                    Started = True
+                    yield self.FilterLaunchable(Scan, ExeFiles)
+
+            except (IOError, OSError, ValueError, struct.error) as Error:
+                #Errors after the disc has been opened are handled by the scan, so this won't happen once we've yielded anything.
+                if Started:
+                    raise
+
+                logger.info("BackendThread().IterScan(): Couldn't read "+Device+" directly ("+unicode(Error)+"). Scanning the mounted filesystem instead...")
+                Scan = None
+
+            finally:
+                #Record the scan even if it was stopped early (eg the user chose some software before it finished).
+                if Scan != None:
+                    self.RecordScan(Disc, Scan)
+
+            if Scan != None:
+                #Don't cache incomplete results.
+                if Scan.IsComplete():
+                    self.ScanCache.Update(Fingerprint, Scan=Scan.Export(), ScanRules=self.ScanRules.GetSignature())
+
+                return
+
+        Scan = ScanResult(MountPoint)
+        Disc["ScanResult"] = Scan
+
+        try:
+            for ExeFiles in BackendTools().IterScanDisc(MountPoint, Scan, self.ScanRules, Disc["Token"]):
+                yield self.FilterLaunchable(Scan, ExeFiles)
+
+        finally:
+            #Record the scan even if it was stopped early (eg the user chose some software before it finished).
+            self.RecordScan(Disc, Scan)
+
+        #Don't cache incomplete results.
+        if Scan.IsComplete():
+            self.ScanCache.Update(Fingerprint, Scan=Scan.Export(), ScanRules=self.ScanRules.GetSignature())
+
+    def RecordScan(self, Disc, Scan, Cached=False):
+        """Keep statistics about a scan, so the control socket can report them. Safe to call from the worker pool."""
+        self.ParentWindow.RecentScans.append({"Device": Disc["Device"], "MountPoint": Disc["MountPoint"], "Time": time.time(), "Cached": Cached, "Complete": Scan.IsComplete(), "Stats": Scan.GetStats()})
+
+    def FilterLaunchable(self, Scan, ExeFiles):
+        """Return a list of (exe file, size) tuples for the given exe files that Wine should be able to start. This reads the start of each file, so it's done as part of the scan, in the worker pool."""
+        Launchable = []
+
+        for File in ExeFiles:
+            Info = self.Classifier.Classify(File)
+
+            if Info["Launchable"]:
+                Launchable.append((File, Scan.Sizes.get(File)))
+
+            else:
+                logger.debug("BackendThread().FilterLaunchable(): Leaving out "+File+", as it's "+Info["Reason"]+"...")
+
+        return Launchable
+
+    def WineAutoscan(self, Disc):
+        """Show the user the exe files on the disc as they're found (likeliest installers first), and return the one they choose to self.FindAndRunSoftware. Disc["Scan"] is a Prefetcher of lists of (exe file, size) tuples, and is closed (cancelling the rest of the scan) as soon as the user chooses."""
+        MountPoint = Disc["MountPoint"]
+        Scan = Disc["Scan"]
+        logger.info("BackendThread().WineAutoscan(): Scanning for exe files in "+MountPoint+"...")
+        Result = None
+        Found = 0
+
+        try:
+            while True:
+                #Stop scanning if the user has already made a choice, or if we're being stopped.
+                if (Result != None and Result.IsDone()) or self.Scheduler.IsCancelled():
+                    logger.info("BackendThread().WineAutoscan(): Cancelling the rest of the scan...")
+                    break
+
+                try:
+                    More, ExeFiles = Scan.Next(Timeout=0.5)
+
+                except Queue.Empty:
+                    #Nothing new yet. Make sure we notice if the disc is ejected while we wait.
+                    self.HandleDeviceEvents()
+                    continue
+
+                if More == False:
+                    if Result != None:
+                        logger.debug("BackendThread().WineAutoscan(): Finished scanning. Found "+unicode(Found)+" exe files...")
+                        self.ParentWindow.CallAfter(self.ParentWindow.FinishThreadChoices, Result, self.GetScanMessage(Disc, Found))
+
+                    break
+
+                if ExeFiles == []:
+                    continue
+
+                Ranked = self.Ranker.Rank(MountPoint, ExeFiles, AutorunExe=Disc["AutorunExe"], PEInfo=self.Classifier.Cache)
+
+                #Only show the dialog once we've found something to put in it.
+                if Result == None:
+                    logger.info("BackendThread().WineAutoscan(): Found at least one exe file! Asking the user which one to run...")
+                    Result = Future()
+                    self.ParentWindow.CallAfter(self.ParentWindow.ShowThreadChooserdlg, msg="Please select which file you'd like to run. The files most likely to be installers are shown at the top. You can choose one before Wine Autostart has finished looking.\n\nNote: If you don't run anything, the disk will be ignored until the media is ejected.", title="Wine Autostart - Select a File", Result=Result)
+
+                self.ParentWindow.CallAfter(self.ParentWindow.AddThreadChoices, Result, Ranked)
+                Found += len(ExeFiles)
+
+        finally:
+            Scan.close()
+
+        if Result == None:
+            if Disc["ScanResult"] != None and Disc["ScanResult"].Truncated:
+                logger.info("BackendThread().WineAutoscan(): Didn't find any exe files before the scan was stopped, because "+Disc["ScanResult"].TruncatedReason+"...")
+
+            else:
+                logger.info("BackendThread().WineAutoscan(): Didn't find any exe files...")
+
+            return None
+
+        Choice = Result.Result()
+
+        if Choice == None:
+            logger.info("BackendThread().WineAutoscan(): User declined running any suggested software. Ignoring the disk...")
+
+        else:
+            logger.info("BackendThread().WineAutoscan(): User selected "+Choice+". Running software...")
+
+        return Choice
+
+    def GetScanMessage(self, Disc, Found):
+        """Return a message saying why the disc's scan stopped early, or None if it finished"""
+        Scan = Disc["ScanResult"]
+
+        if Scan == None or Scan.Truncated == False:
+            return None
+
+        return "Stopped looking for software ("+unicode(Found)+" found), because "+Scan.TruncatedReason+"."
+
+    def SetStatus(self, Status):
+        """Tell MainClass the status, if it's changed since we last did"""
+        if Status != self.Status:
+            self.Status = Status
+            self.ParentWindow.CallAfter(self.ParentWindow.SetStatus, Status)
+
+    def run(self):
+        """Main body of the thread, started with self.start()"""
+        global RunningSoftware
+        RunningSoftware = False
+
+        #Stop if we've been cancelled, or replaced by a newer backend thread.
+        while self.Scheduler.IsCancelled() == False and self.ParentWindow.Backend is self:
+            #If we're running software, wait for it (and anything it started) to finish before doing anything else.
+            if self.Session != None:
+                #Stopping the backend cancels the scheduler, which stops this waiting straight away.
+                if self.Session.Wait(Scheduler=self.Scheduler) == False:
+                    continue
+
+                self.SoftwareFinished()
+
+            self.HandleRescanRequests()
+            self.SetStatus("Checking for disk...")
+            RunningSoftware = self.FindAndRunSoftware()
+
+            if RunningSoftware:
+                #Notify the user, as WINE can take a while to start.
+                subprocess.call("notify-send 'Wine Autostart' 'Wine Autostart is preparing to run software, please wait for up to 30 seconds...' -i /usr/share/pixmaps/wineautostart.png", shell=True)
+                self.SetStatus("Running software...")
+
+            else:
+                #Wait for something to happen before checking again.
+                self.WaitForMedia()
+
+        #Stop watching any software we ran. It keeps running, as the user is probably still using it.
+        if self.Session != None:
+            logger.debug("BackendThread().run(): No longer waiting for "+self.Session.ExeFile+" to finish...")
+            self.Session.Close()
+            self.Session = None
+
+        #Stop the worker pool, and any scans that are still running in it.
+        for Token in self.ScanTokens.values():
+            Token.Cancel("Wine Autostart is stopping")
+
+        self.Pool.Close()
+
+        while self.ReadyDiscs.empty() == False:
+            Device, Result = self.ReadyDiscs.get()
+
+            if Result.Error == None and Result.Value["Scan"] != None:
+                Result.Value["Scan"].close()
+
+        self.EventMonitor.Close()
+        logger.debug("BackendThread().run(): Backend stopped. Scheduler state: "+unicode(self.Scheduler.GetDiagnostics()))
+        self.Scheduler.Close()
+
+        #Change the status message, if the program isn't shutting down.
+        if Exiting == False:
+            self.SetStatus("Stopped.")
+
+    def RunSoftware(self, ExeFile, Device, MountPoint):
+        """Start the given exe file with Wine, and keep track of it so the disk can be ignored when the software has closed. Return True if it was started."""
+        try:
+            self.Session = WineSession(ExeFile)
+
+        except OSError as Error:
+            logger.error("BackendThread().RunSoftware(): Couldn't start Wine ("+unicode(Error)+")! Warning user...")
+            self.ShowMsgDlg(Kind="error", Message="Wine Autostart couldn't start Wine to run "+ExeFile+"! Please make sure Wine is installed.")
+            return False
+
+        self.RunningSoftwareDevice = Device
+        self.RunningSoftwareMountPoint = MountPoint
+        return True
+
+    def SoftwareFinished(self):
+        """Clean up after the software we ran has finished, warning the user if it crashed straight away"""
+        global RunningSoftware
+        RunningSoftware = False
+
+        Session = self.Session
+        self.Session = None
+
+        logger.debug("BackendThread().SoftwareFinished(): Output from Wine:\n"+'\n'.join(Session.Output))
+
+        if Session.Crashed():
+            logger.error("BackendThread().SoftwareFinished(): "+Session.ExeFile+" exited straight away with exit code "+unicode(Session.Process.returncode)+"! Warning user...")
+            self.ShowMsgDlg(Kind="error", Message="The software you ran ("+Session.ExeFile+") closed straight away with an error! It might not work with Wine. Wine's last messages were:\n\n"+'\n'.join(list(Session.Output)[-10:]))
+
+        else:
+            logger.info("BackendThread().SoftwareFinished(): "+Session.ExeFile+" has finished...")
+
+        #Ignore the disk that houses the software that was just being run until it is ejected.
+        self.DevicesToIgnore.append(self.RunningSoftwareDevice)
+        self.DevicesToIgnore.append(self.RunningSoftwareMountPoint)
+
+    def WaitForMedia(self):
+        """Wait until media might have been inserted, changed, mounted or ejected in one of our drives"""
+        #Sleep until the kernel tells us something happened. Media is normally mounted a few seconds after it's inserted, which shows up as a change to the mount table.
+        while True:
+            #The event monitor stops listening if it can't read events, so check each time.
+            Readable = {}
+
+            if self.EventMonitor.Available():
+                Readable["uevent"] = self.EventMonitor
+
+            Reasons = self.Scheduler.Wait(Readable=Readable, Exceptional={"mounts-changed": self.MountTable})
+
+            if "mounts-changed" in Reasons:
+                #select() has already used up the kernel's notification, so Refresh() wouldn't see it. Rebuild the index unconditionally.
+                self.MountTable.Rebuild()
+
+            if "uevent" in Reasons:
+                Events = self.HandleDeviceEvents()
+
+                if Events != []:
+                    logger.debug("BackendThread().WaitForMedia(): Got device events: "+unicode(Events)+"...")
+
+                elif Reasons == ["uevent"]:
+                    #This was for a device we aren't monitoring, so keep waiting.
+                    continue
+
+            break
+
+        #Check quickly for a while after something happens, as media is mounted a little while after it's inserted. Otherwise, back off.
+        if Reasons == ["timeout"]:
+            self.Scheduler.Idle()
+
+        else:
+            logger.debug("BackendThread().WaitForMedia(): Woken up ("+', '.join(Reasons)+"). Checking for media...")
+            self.Scheduler.Activity()
+
+    def RequestRescan(self, Device):
+        """Ask the backend to stop ignoring Device, and to read the disc in it again rather than using the scan cache. Safe to call from any thread."""
+        self.RescanRequests.put(Device)
+        self.Scheduler.Wake("rescan")
+
+    def HandleRescanRequests(self):
+        """Stop ignoring, and forget what we know about, the discs in drives the control socket has asked us to look at again"""
+        while True:
+            try:
+                Device = self.RescanRequests.get_nowait()
+
+            except Queue.Empty:
+                break
+
+            logger.info("BackendThread().HandleRescanRequests(): Looking at "+Device+" again, as requested through the control socket...")
+
+            if Device in self.DevicesToIgnore:
+                Index = self.DevicesToIgnore.index(Device)
+                del self.DevicesToIgnore[Index:Index+2]
+
+            MountPoint = BackendTools().GetDiskMountPoint(Device)
+
+            if MountPoint != None:
+                self.ScanCache.Remove(BackendTools().GetMediaFingerprint(Device, MountPoint))
+
+    def HandleDeviceEvents(self):
+        """Read any pending device events, and stop reading discs that have been ejected or changed. Return the events."""
+        if self.EventMonitor.Available() == False:
+            return []
+
+        Events = self.EventMonitor.ReadEvents()
+
+        for Action, Device in Events:
+            if Action in ("eject", "media-change", "remove") and Device in self.ScanTokens:
+                logger.info("BackendThread().HandleDeviceEvents(): Media in "+Device+" was ejected or changed. Stopping reading it...")
+                self.ScanTokens.pop(Device).Cancel("the disc was ejected")
+
+            elif Action == "overflow":
+                #An eject might have been one of the events that were lost, so stop reading any disc that isn't mounted any more.
+                for Device in list(self.ScanTokens.keys()):
+                    if BackendTools().GetDiskMountPoint(Device) == None:
+                        logger.info("BackendThread().HandleDeviceEvents(): Media in "+Device+" isn't mounted any more. Stopping reading it...")
+                        self.ScanTokens.pop(Device).Cancel("the disc was ejected")
+
+        return Events
+
+    def IsIgnored(self, Device, MountPoint):
+        """Return True if we're ignoring the disc mounted at MountPoint in Device. Safe to call from the worker pool."""
+        DevicesToIgnore = self.DevicesToIgnore[:]
+        return Device in DevicesToIgnore and DevicesToIgnore[DevicesToIgnore.index(Device)+1] == MountPoint
+
+    def PrepareDisc(self, Device):
+        """Look for mounted media in Device, and unless we're ignoring it (or need to ask the user first), read its autorun information and start scanning it. Runs in the worker pool, and returns a dictionary describing the disc."""
+        Disc = {"Device": Device, "MountPoint": BackendTools().GetDiskMountPoint(Device), "Fingerprint": None, "AutorunExe": None, "Scan": None, "ScanResult": None, "Token": CancelToken()}
+        Disc["Ignored"] = self.IsIgnored(Device, Disc["MountPoint"])
+
+        if Disc["MountPoint"] != None and Disc["Ignored"] == False:
+            #Keep the token, so we can stop reading the disc if it's ejected.
+            self.ScanTokens[Device] = Disc["Token"]
+
+            if PromptBeforeScanning == False:
+                self.ReadDisc(Disc)
+
+        return Disc
+
+    def ReadDisc(self, Disc):
+        """Read the autorun information on the disc, and if there isn't any, start scanning it in the worker pool so the results are ready if Wine Autoscan is used"""
+        Disc["Fingerprint"] = BackendTools().GetMediaFingerprint(Disc["Device"], Disc["MountPoint"])
+        Disc["AutorunExe"] = self.ReadAutorunInfo(Disc["MountPoint"], Disc["Fingerprint"], Disc["Token"])
+
+        if Disc["AutorunExe"] == None and UseWineAutoscan and self.Scheduler.IsCancelled() == False and Disc["Token"].IsCancelled() == False:
+            Disc["Scan"] = Prefetcher(self.Pool, self.IterScan(Disc), Disc["Token"])
+
+    def DiscReady(self, Device, Result):
+        """Queue a drive the worker pool has finished with, and wake the backend up if there's media in it to deal with. Runs in the worker pool."""
+        self.ReadyDiscs.put((Device, Result))
+
+        if Result.Error == None and Result.Value["MountPoint"] != None and Result.Value["Ignored"] == False:
+            self.Scheduler.Wake("disc-ready")
+
+    def FindAndRunSoftware(self):
+        """Hand each drive we're monitoring to the worker pool to look for media, and then try to find and run Windows software on the discs it found, in the order they were ready. Return True if software was started."""
+        for Dev in DevicesToMonitor:
+            if Dev not in self.PendingDevices:
+                self.PendingDevices.append(Dev)
+                self.Pool.Submit(self.PrepareDisc, (Dev,), Callback=lambda Result, Dev=Dev: self.DiscReady(Dev, Result))
+
+        while True:
+            #Stop straight away if the backend is being stopped.
+            if self.Scheduler.IsCancelled():
+                return False
+
+            try:
+                Dev, Result = self.ReadyDiscs.get_nowait()
+
+            except Queue.Empty:
+                #No media found in any of our devices that we aren't ignoring (yet).
+                return False
+
+            self.PendingDevices.remove(Dev)
+
+            try:
+                Disc = Result.Result()
+
+            except Exception:
+                #This has already been logged by the worker pool, so try again next time.
+                continue
+
+            try:
+                if self.HandleDisc(Disc):
+                    return True
+
+            finally:
+                #Stop scanning the disc if we don't need the results any more.
+                if Disc["Scan"] != None:
+                    Disc["Scan"].close()
+
+    def HandleDisc(self, Disc):
+        """Try to find and run Windows software on a disc the worker pool has prepared. Return True if software was started."""
+        Device = Disc["Device"]
+        MountPoint = Disc["MountPoint"]
+
+        if Device in self.DevicesToIgnore:
+            #Check if we still need to ignore this drive, or whether the media has changed (or been ejected).
+            IgnoredMountPoint = self.DevicesToIgnore[self.DevicesToIgnore.index(Device)+1]
+
+            if MountPoint != IgnoredMountPoint:
+                #Remove it from the list of devices to ignore.
+                logger.debug("BackendThread().HandleDisc(): Stopped ignoring "+Device+", as media has changed or is no longer present...")
+                self.DevicesToIgnore.pop(self.DevicesToIgnore.index(Device))
+                self.DevicesToIgnore.pop(self.DevicesToIgnore.index(IgnoredMountPoint))
+
+            else:
+                return False
+
+        if MountPoint == None:
+            return False
+
+        #The media might have been ejected while the disc was waiting for the user to deal with another one.
+        if Disc["Token"].IsCancelled() or BackendTools().GetDiskMountPoint(Device) != MountPoint:
+            logger.info("BackendThread().HandleDisc(): Media in "+Device+" was ejected or changed before we got to it. Skipping it...")
+            return False
+
+        #Found media!
+        logger.info("BackendThread().HandleDisc(): Found media in "+Device+"! Media is mounted at: "+MountPoint+"...")
+
+        #If set this way, ask the user if he/she wants Wine Autostart to look for software on this disk. Otherwise continue without confirmation.
+        if PromptBeforeScanning:
+            logger.info("BackendThread().HandleDisc(): Asking the user if we're going to look for software in "+Device+"...")
+            Result = self.ShowYesNoDlg(Message="Wine Autostart has detected a disk in the drive "+Device+". Do you want Wine Autostart to look for Windows software on it?\n\nNote: If you click no, the drive will also be ignored by Wine Autostart until the media is ejected.", Question="ScanDisc")
+
+            #Do what the user says.
+            if Result == False:
+                #Ignore the drive.
+                logger.info("BackendThread().HandleDisc(): Ignoring the drive as the user requested...")
+                self.DevicesToIgnore.append(Device)
+                self.DevicesToIgnore.append(MountPoint)
+                return False
+
+            #Look for software. This only reads the root directory (unless set otherwise), so the whole disc is only scanned if we need Wine Autoscan.
+            logger.info("BackendThread().HandleDisc(): Looking for software as the user requested...")
+            self.ReadDisc(Disc)
+
+        elif Disc["Fingerprint"] == None:
+            #We were ignoring the disc when it was prepared, but aren't any more (eg a rescan was requested), so it hasn't been read yet.
+            self.ReadDisc(Disc)
+
+        self.ScanCache.Save()
+        ExeFile = Disc["AutorunExe"]
+
+        #Check if an exe file was found.
+        if ExeFile != None and self.AskToRunAutorunExe(ExeFile) and self.RunSoftware(ExeFile, Device, MountPoint):
+            return True
+
+        #Check if Wine Autoscan is enabled.
+        if UseWineAutoscan == False:
+            logger.info("BackendThread().HandleDisc(): Wine Autoscan is disabled. Ignoring disk and notifying user...")
+            self.ShowMsgDlg(Message="No helpful autorun information was found on "+Device+", and Wine Autoscan is disabled in the settings window, so this drive will now be ignored until the media is ejected.")
+
+        else:
+            logger.info("BackendThread().HandleDisc(): Asking the user if we're going to use Wine Autoscan...")
+            Result = self.ShowYesNoDlg(Message="Wine Autostart couldn't find any software on "+Device+" from autorun information. Do you want Wine Autostart to scan for Windows software instead?\n\nNote: If you click no, the drive will also be ignored by Wine Autostart until the media is ejected.", Question="UseWineAutoscan")
+
+            if Result:
+                #Try to scan for exe files, using the scan that's already running if there is one.
+                logger.info("BackendThread().HandleDisc(): We are using Wine Autoscan. Continuing...")
+
+                if Disc["Scan"] == None:
+                    Disc["Scan"] = Prefetcher(self.Pool, self.IterScan(Disc), Disc["Token"])
+
+                ExeFile = self.WineAutoscan(Disc)
+                self.ScanCache.Save()
+
+                #Check if an exe file was found.
+                if ExeFile != None and self.RunSoftware(ExeFile, Device, MountPoint):
+                    return True
+
+        #If we get here, software isn't being run, so ignore the disk and return False.
+        logger.info("BackendThread().HandleDisc(): We didn't find any software to run. Ignoring the device until media changes...")
+        self.ShowMsgDlg(Message="Wine Autostart coudn't find any windows software to run on "+Device+", so this drive will now be ignored until the media is ejected.")
+        self.DevicesToIgnore.append(Device)
+        self.DevicesToIgnore.append(MountPoint)
+
+        return False
+
+#End Backend thread.
+#Begin Daemon class.
+class Daemon(Frontend):
+    """Runs the backend without wxPython or the indicator (--daemon), for unattended machines. Questions are answered with the DaemonAutorun and DaemonAutoscan settings instead of dialogs, messages are logged, and it's controlled through the control socket."""
+    def __init__(self):
+        """Read the configuration, and start the control socket and the backend"""
+        print("Wine Autostart Version "+Version+" Starting in daemon mode...")
+        logger.info("Wine Autostart Version "+Version+" Starting in daemon mode...")
+        logger.info("Release date: "+ReleaseDate)
+        logger.info("Running on Python version: "+unicode(sys.version_info)+"...")
+
+        global Exiting
+        Exiting = False
+
+        global RunningBackend
+        RunningBackend = False
+
+        global RunningSoftware
+        RunningSoftware = False
+
+        self.Backend = None
+        self.Status = None
+        self.Signalled = False
+
+        #Statistics about the most recent scans, for the control socket.
+        self.RecentScans = collections.deque(maxlen=20)
+
+        #The (score, exe file) tuples offered so far by the backend for each Wine Autoscan, keyed by their result futures.
+        self.Choosers = {}
+
+        #Functions other threads want to call on the main thread, as (function, args, kwargs) tuples. Once we're exiting, calls are refused instead of queued.
+        self.Calls = Queue.Queue()
+        self.CallsLock = threading.Lock()
+        self.RefuseCalls = False
+
+        #CallAfter() and signals write to this pipe, so Run() can sleep in select() until there's something to do.
+        self.WakeRead, self.WakeWrite = os.pipe()
+
+        for Pipe in (self.WakeRead, self.WakeWrite):
+            fcntl.fcntl(Pipe, fcntl.F_SETFL, fcntl.fcntl(Pipe, fcntl.F_GETFL) | os.O_NONBLOCK)
+
+        #Read the configuration file.
+        logger.info("Daemon().__init__(): Reading configuration...")
+        LoadConfig()
+
+        #Exit cleanly when we're asked to, eg by the init system. Python only runs signal handlers between instructions, so have the signal wake up select() in Run() as well.
+        signal.signal(signal.SIGTERM, self.OnSignal)
+        signal.signal(signal.SIGINT, self.OnSignal)
+        signal.set_wakeup_fd(self.WakeWrite)
+
+        #Start the control socket, which is the only way to control us.
+        logger.info("Daemon().__init__(): Starting control socket...")
+
+        try:
+            self.ControlServer = ControlServer(GetControlSocketPath(), self.HandleControlRequest)
+
+        except (socket.error, OSError) as Error:
+            logger.warning("Daemon().__init__(): Couldn't start control socket ("+unicode(Error)+"). Continuing without it...")
+            self.ControlServer = None
+
+        #Start the backend thread.
+        self.StartBackend()
+
+        logger.info("Daemon().__init__(): Ready.")
+
+    def Run(self):
+        """Call the functions other threads have asked us to, until we're asked to exit. Sleeps until CallAfter() or a signal wakes us up."""
+        while True:
+            while True:
+                try:
+                    Function, Args, Kwargs = self.Calls.get_nowait()
+
+                except Queue.Empty:
+                    break
+
+                Function(*Args, **Kwargs)
+
+            if self.Signalled:
+                self.OnExit()
+                break
+
+            try:
+                select.select([self.WakeRead], [], [])
+
+            except (select.error, OSError, IOError) as Error:
+                #Python 2 doesn't retry when a signal interrupts select(), but the signal has written to the pipe, so just go round again.
+                if Error.args[0] != errno.EINTR:
+                    raise
+
+            #Empty the pipe before looking at the queue, so a call queued after this wakes us up again.
+            try:
+                while os.read(self.WakeRead, 512) != b"":
+                    pass
+
+            except OSError as Error:
+                if Error.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    raise
+
+    def CallAfter(self, Function, *Args, **Kwargs):
+        """Call Function on the main thread, without waiting for it. Safe to call from any thread. Once we're exiting, it isn't called, and any futures it was given are set to None, so nothing waits for them forever."""
+        with self.CallsLock:
+            if self.RefuseCalls == False:
+                self.Calls.put((Function, Args, Kwargs))
+                self.Wake()
+                return
+
+        self.CancelCall(Function, Args, Kwargs)
+
+    def Wake(self):
+        """Wake up Run()"""
+        try:
+            os.write(self.WakeWrite, b"x")
+
+        except OSError as Error:
+            #If the pipe is full, Run() is going to wake up anyway.
+            if Error.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+
+    def CancelCall(self, Function, Args, Kwargs):
+        """Set the futures given to a call we aren't going to make to None, so whatever is waiting for them (eg the backend waiting for an answer) carries on"""
+        for Arg in list(Args) + list(Kwargs.values()):
+            if isinstance(Arg, Future) and Arg.IsDone() == False:
+                Arg.SetResult(None)
+
+    def OnSignal(self, Signal, Frame):
+        """Exit when we're sent SIGTERM or SIGINT. This just sets a flag, as the signal could arrive while Run() is using self.Calls. The signal has also written to the wake-up pipe, so Run() notices."""
+        self.Signalled = True
+
+    def StartBackend(self):
+        """Start the backend"""
+        global RunningBackend
+        if RunningBackend == False:
+            #Give the old backend thread (if any) a moment to finish, so two don't run at once.
+            if self.Backend != None and self.Backend.is_alive():
+                logger.debug("Daemon().StartBackend(): Waiting for the old backend thread to exit...")
+                self.Backend.join(1)
+
+            logger.debug("Daemon().StartBackend(): Starting backend...")
+            RunningBackend = True
+            self.Backend = BackendThread(self)
+
+        else:
+            logger.warning("Daemon().StartBackend(): Backend is already running! Doing nothing...")
 
-#Import custom-made modules
-import GetDevInfo
-import Tools
+    def StopBackend(self):
+        """Stop the backend. Software it's running keeps running."""
+        if RunningSoftware:
+            logger.warning("Daemon().StopBackend(): Stopping the backend while software is running. Leaving the software running...")
 
-from GetDevInfo.getdevinfo import Main as DevInfoTools
-from Tools.tools import Main as BackendTools
+        logger.debug("Daemon().StopBackend(): Stopping backend...")
+        global RunningBackend
+        RunningBackend = False
 
-#Define the version number, release date, and release type as global variables.
-Version = "2.0.2"
-ReleaseDate = "11/11/2016"
-ReleaseType = "Stable"
+        #Cancel the backend thread's scheduler, so it stops straight away even if it's waiting.
+        if self.Backend != None:
+            self.Backend.Scheduler.Cancel()
 
-def usage():
-    print("\nUsage: WineAutostart.py [OPTION]\n")
-    print("       -h, --help:                   Show this help message")
-    print("       -q, --quiet:                  Show only warning, error and critical error messages in the log file. Very unhelpful for debugging, and not recommended.")
-    print("       -v, --verbose:                Enable logging of info messages, as well as warnings, errors and critical errors.")
-    print("                                     Not the best for debugging, but acceptable if there is little disk space.")
-    print("       -d, --debug:                  Log lots of boring debug messages, as well as information, warnings, errors and critical errors. Usually used for diagnostic purposes.")
-    print("                                     The default, as it's very helpful if problems are encountered, and the user needs help\n")
-    print("Wine Autostart "+Version+" is released under the GNU GPL Version 3")
-    print("Copyright (C) Hamish McIntyre-Bhatty 2013-2016")
+        #Don't run anything Wine Autoscan is still looking for.
+        for Result in list(self.Choosers.keys()):
+            del self.Choosers[Result]
+            Result.SetResult(None)
 
-#Check cmdline options
-try:
-    opts, args = getopt.getopt(sys.argv[1:], "hqvd", ["help", "quiet", "verbose", "debug"])
+    def OnExit(self):
+        """Stop the backend and the control socket, and exit"""
+        logger.info("Daemon().OnExit(): Exiting...")
 
-except getopt.GetoptError as err:
-    #Invalid option. Show the help message and then exit.
-    #Show the error.
-    print(unicode(err))
-    usage()
-    sys.exit(2)
+        global Exiting
+        Exiting = True
+        self.StopBackend()
 
-#Make Wine Autostart's temporary directory, clearing it if it is already present.
-if os.path.isdir("/tmp/wineautostart"):
-    shutil.rmtree("/tmp/wineautostart")
+        #Nothing is going to run the calls that are still queued (or queued from now on), so don't leave the backend or the control socket waiting for them.
+        with self.CallsLock:
+            self.RefuseCalls = True
 
-os.mkdir("/tmp/wineautostart")
+        while True:
+            try:
+                Function, Args, Kwargs = self.Calls.get_nowait()
 
-#Set up logging.
-logger = logging.getLogger('Wine Autostart')
-logging.basicConfig(filename='/tmp/wineautostart/wineautostart.log', format='%(asctime)s - %(name)s - %(levelname)s: %(message)s', datefmt='%d/%m/%Y %I:%M:%S %p')
-logger.setLevel(logging.DEBUG)
+            except Queue.Empty:
+                break
 
-#Determine the option(s) given, and change the level of logging based on cmdline options.
-for o, a in opts:
-    if o in ["-q", "--quiet"]:
-        print("Setting logging level to warning mode..")
-        logger.setLevel(logging.WARNING)
-    elif o in ["-v", "--verbose"]:
-        print("Setting logging level to verbose mode..")
-        logger.setLevel(logging.INFO)
-    elif o in ["-d", "--debug"]:
-        print("Setting logging level to debug mode..")
-        logger.setLevel(logging.DEBUG)
-    elif o in ["-h", "--help"]:
-        usage()
-        sys.exit()
-    else:
-        assert False, "unhandled option"
+            logger.debug("Daemon().OnExit(): Not calling "+unicode(Function.__name__)+", as we're exiting...")
+            self.CancelCall(Function, Args, Kwargs)
 
-#Setup custom-made modules (make global variables accessible inside the packages).
-DiskInfo = {}
+        if self.Backend != None:
+            self.Backend.join(10)
 
-GetDevInfo.getdevinfo.subprocess = subprocess
-GetDevInfo.getdevinfo.logger = logger
-GetDevInfo.getdevinfo.BeautifulSoup = BeautifulSoup
-GetDevInfo.getdevinfo.DiskInfo = DiskInfo
+        if self.ControlServer != None:
+            self.ControlServer.Close()
 
-Tools.tools.subprocess = subprocess
-Tools.tools.logger = logger
-Tools.tools.os = os
+    def SetStatus(self, Status):
+        """Log the status, as there's no indicator to show it"""
+        if Status != self.Status:
+            self.Status = Status
+            logger.info("Daemon().SetStatus(): Status: "+Status)
 
-#Begin Device Information Handler thread.
-class GetDeviceInformation(threading.Thread):
-    def __init__(self, ParentWindow):
-        """Initialize and start the thread."""
-        self.ParentWindow = ParentWindow
-        threading.Thread.__init__(self)
-        self.start()
+    def ShowThreadMsgdlg(self,msg,Result,kind="info"):
+        """Log a message the backend would have shown the user, and set the Result future"""
+        if kind == "info":
+            logger.info("Daemon().ShowThreadMsgdlg(): "+msg)
 
-    def run(self):
-        """Get Device Information and return it as a list with embedded lists"""
-        #Use a module I've written to collect data about connected devices, and return it.
-        wx.CallAfter(self.ParentWindow.ReceiveDeviceInfo, DevInfoTools().GetInfo())
+        elif kind == "warning":
+            logger.warning("Daemon().ShowThreadMsgdlg(): "+msg)
+
+        else:
+            logger.error("Daemon().ShowThreadMsgdlg(): "+msg)
+
+        Result.SetResult(None)
+
+    def ShowThreadYesNodlg(self,msg,Result,title="Wine Autostart - Question",Question=None):
+        """Answer a question the backend would have asked the user, using the settings, and set the Result future to the answer. Questions we don't know about are answered no."""
+        Answer = {"ScanDisc": True, "RunAutorunExe": DaemonAutorun, "UseWineAutoscan": DaemonAutoscan}.get(Question, False)
+        logger.info("Daemon().ShowThreadYesNodlg(): Answering "+unicode(Question)+" question with "+unicode(Answer)+"...")
+        Result.SetResult(Answer)
+
+    def ShowThreadChooserdlg(self,msg,Result,title="Wine Autostart - Select a File"):
+        """Start collecting the exe files Wine Autoscan finds, so the likeliest installer can be run when it's finished. The Result future is set by FinishThreadChoices()."""
+        self.Choosers[Result] = []
+
+    def AddThreadChoices(self,Result,Ranked):
+        """Add ranked choices (a list of (score, file) tuples) for the given future, if it's still waiting for them"""
+        if Result in self.Choosers:
+            self.Choosers[Result].extend(Ranked)
+
+    def FinishThreadChoices(self,Result,Message=None):
+        """Set the Result future to the likeliest installer Wine Autoscan found (the first of those with the highest score), logging Message if there is one"""
+        if Result not in self.Choosers:
+            return
+
+        Ranked = self.Choosers.pop(Result)
+
+        if Message != None:
+            logger.info("Daemon().FinishThreadChoices(): "+Message)
+
+        if Ranked == []:
+            Result.SetResult(None)
+            return
+
+        Score, ExeFile = max(Ranked, key=lambda Choice: Choice[0])
+        logger.info("Daemon().FinishThreadChoices(): Choosing "+ExeFile+" (score "+unicode(Score)+") out of "+unicode(len(Ranked))+" exe files...")
+        Result.SetResult(ExeFile)
+
+#End Daemon class.
+#Run without a GUI if we've been asked to, before importing wxPython, so it isn't needed at all.
+if DaemonMode:
+    #Log to stderr as well, so the init system can keep the log.
+    Handler = logging.StreamHandler()
+    Handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s: %(message)s'))
+    logger.addHandler(Handler)
+
+    Daemon().Run()
+    sys.exit()
+
+#Import wxPython.
+import wx
+import wx.animate
 
-#End Device Information Handler thread.
 #Begin App Indicator IPC Thread.
 class AppIndicatorIPCThread(threading.Thread):
-    """Thread to receive messages from the App Indicator, so we don't block the GUI thread"""
-    def __init__(self, ParentWindow, Indicator):
+    """Thread to receive messages from the App Indicator, so we don't block the GUI thread. Acknowledgements are handled here too, so waiting for one doesn't need the GUI thread."""
+    def __init__(self, ParentWindow, Channel):
         """Initialize and start the thread."""
         self.ParentWindow = ParentWindow
-        self.Indicator = Indicator
+        self.Channel = Channel
         threading.Thread.__init__(self)
+        self.daemon = True
         self.start()
 
     def run(self):
         """Main body of the thread, started with self.start()"""
-        while self.Indicator.poll() is None:
+        while True:
             try:
-                Line = self.Indicator.stdout.readline().replace("\n", "")
-                wx.CallAfter(self.ParentWindow.ProcessMessage, Line)
+                Message = self.Channel.ReadMessage()
+
+                if Message == None:
+                    #The indicator has exited.
+                    break
+
+                #Let the indicator know we've got the message straight away, as commands might open dialogs that take a while.
+                if Message["Type"] in ("Command", "Hello"):
+                    self.Channel.Acknowledge(Message)
+
+                elif Message["Type"] not in ("Text", "Unsupported"):
+                    self.Channel.Acknowledge(Message, Error="Unknown message type: "+Message["Type"])
+
+                wx.CallAfter(self.ParentWindow.ProcessMessage, Message)
+
+            except (IOError, ValueError):
+                #The indicator has exited.
+                break
 
             except wx.PyDeadObjectError:
                 #MainClass is dead. Break out of the loop and exit the thread.
@@ -153,7 +1401,7 @@ class WineAutostart(wx.App):
 
 #End Starter class.
 #Begin Main class.
-class MainClass(wx.Frame):
+class MainClass(wx.Frame, Frontend):
     def __init__(self):
         """Initialize the hidden frame."""
         wx.Frame.__init__(self, parent=None, style=wx.FRAME_NO_TASKBAR)
@@ -170,9 +1418,23 @@ class MainClass(wx.Frame):
         global RunningBackend
         RunningBackend = False
 
+        self.Backend = None
+
+        #Software chooser dialogs that are open for the backend, keyed by their result futures.
+        self.Choosers = {}
+
+        #The last status sent to the indicator, the latest one we've been given, and the timer that sends it.
+        self.Status = None
+        self.PendingStatus = None
+        self.StatusTimer = None
+
+        #Statistics about the most recent scans, for the control socket.
+        self.RecentScans = collections.deque(maxlen=20)
+
         #Create the taskbar icon.
         logger.info("MainClass().__init__(): Creating Indicator...")
         self.Indicator = subprocess.Popen(['/usr/share/wineautostart/IndicatorWineAutostart.py'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.PIPE) 
+        self.IndicatorChannel = Channel(self.Indicator.stdout, self.Indicator.stdin)
 
         #Create the program's icon.
         global AppIcon
@@ -186,9 +1448,24 @@ class MainClass(wx.Frame):
         logger.info("MainClass().__init__(): Binding events...")
         self.BindEvents()
 
+        #Get information about the drives now, so it's ready when the settings window is opened.
+        logger.info("MainClass().__init__(): Getting device information...")
+        self.DeviceInfo = DeviceInfoCache(DevInfoTools().GetInfo)
+        self.DeviceInfo.Request()
+
         #Start the IPC thread.
         logger.info("MainClass().__init__(): Starting Indicator Management Thread...")
-        AppIndicatorIPCThread(self, self.Indicator)
+        AppIndicatorIPCThread(self, self.IndicatorChannel)
+
+        #Start the control socket, so scripts can control us too.
+        logger.info("MainClass().__init__(): Starting control socket...")
+
+        try:
+            self.ControlServer = ControlServer(GetControlSocketPath(), self.HandleControlRequest)
+
+        except (socket.error, OSError) as Error:
+            logger.warning("MainClass().__init__(): Couldn't start control socket ("+unicode(Error)+"). Continuing without it...")
+            self.ControlServer = None
 
         #Start the backend thread.
         self.StartBackend()
@@ -197,119 +1474,12 @@ class MainClass(wx.Frame):
 
     def ReadConfig(self, StartBackend=False, UpdateCheckNow=True):
         """Parse the config file."""
-        #Define all global vars.
-        global StartOnBoot
-        global StartupUpdateCheck
-        global UseWineAutoscan
-        global PromptBeforeScanning
-        global DevicesToMonitor
-        ConfigPresent = True
+        ConfigPresent, AutoConfig = LoadConfig()
 
-        #Set them all to initial values.
-        DevicesToMonitor = []
-        UseWineAutoscan = None
-        StartOnBoot = None
-        PromptBeforeScanning = None
-        StartupUpdateCheck = None
-        AutoConfig = False
-
-        #Check the file exists. If it doesn't we'll use default values.
-        if os.path.isfile(os.environ["HOME"]+"/.wineautostart.cfg"):
-
-            #Open it.
-            logger.info("MainClass().ReadConfig(): Found config file at "+os.environ["HOME"]+"/.wineautostart.cfg. Opening it...")
-            ConfigFile = open(os.environ["HOME"]+"/.wineautostart.cfg", "r")
-
-            #Loop through, reading all required settings.
-            logger.info("MainClass().ReadConfig(): Reading configuration from file...")
-
-            for line in ConfigFile:
-
-                #Determine whether we're starting on boot.
-                if "StartOnBoot" in line and '#' not in line:
-                    #Read the value. Also, convert the result into a boolean value, so it can be used easily.
-                    StartOnBoot = bool(int(line.split()[2]))
-                    logger.debug("MainClass().ReadConfig(): Found configuration for StartOnBoot ("+unicode(StartOnBoot)+")...")
-
-                    #Apply the setting if needed.
-                    if StartOnBoot:
-                        if not os.path.isdir(os.environ["HOME"]+"/.config/autostart"):
-                            os.makedirs(os.environ["HOME"]+"/.config/autostart")
-
-                        if not os.path.isfile(os.environ["HOME"]+"/.config/autostart/wineautostart.desktop"):
-                            logger.debug("MainClass().ReadConfig(): Applying settings for StartOnBoot...")
-                            subprocess.Popen("cp /usr/share/wineautostart/other/wineautostart.desktop "+os.environ["HOME"]+"/.config/autostart/wineautostart.desktop", shell=True).wait()
-
-                    else:
-                        if os.path.isfile(os.environ["HOME"]+"/.config/autostart/wineautostart.desktop"):
-                            logger.debug("MainClass().ReadConfig(): Applying settings for StartOnBoot...")
-                            subprocess.Popen("rm "+os.environ["HOME"]+"/.config/autostart/wineautostart.desktop", shell=True).wait()
-
-                #Determine whether we're checking for updates on startup.
-                elif "StartupUpdateCheck" in line and '#' not in line:
-                    #Read the value. Also, convert the result into a boolean value, so it can be used easily.
-                    StartupUpdateCheck = bool(int(line.split()[2]))
-                    logger.debug("MainClass().ReadConfig(): Found configuration for StartupUpdateCheck ("+unicode(StartupUpdateCheck)+")...")
-
-                #Determine whether we're using Wine Autoscan.
-                elif "UseWineAutoscan" in line and '#' not in line:
-                    #Read the value. Also, convert the result into a boolean value, so it can be used easily.
-                    UseWineAutoscan = bool(int(line.split()[2]))
-                    logger.debug("MainClass().ReadConfig(): Found configuration for UseWineAutoscan ("+unicode(UseWineAutoscan)+")...")
-
-                #Determine whether we're to prompt before looking for software on a disk.
-                elif "PromptBeforeScanning" in line and '#' not in line:
-                    #Read the value. Also, convert the result into a boolean value, so it can be used easily.
-                    PromptBeforeScanning = bool(int(line.split()[2]))
-                    logger.debug("MainClass().ReadConfig(): Found configuration for PromptBeforeScanning ("+unicode(PromptBeforeScanning)+")...")
-
-                #Determine which devices to monitor.
-                elif "DevicesToMonitor" in line and '#' not in line:
-                    #Read the value(s).
-                    DevicesToMonitor = line.split()[2:]
-
-                    if DevicesToMonitor in [['None'], []]:
-                        DevicesToMonitor = []
-
-                    else:
-                        logger.debug("MainClass().ReadConfig(): Found configuration for DevicesToMonitor ("+unicode(DevicesToMonitor)+")...")
-
-            
-            #Close the config file.
-            ConfigFile.close()
-
-        else:
+        if ConfigPresent == False:
             #Ask the user to configure.
-            logger.warning("MainClass().ReadConfig(): Couldn't find the config file! This is probably the first run. Using default config...")
             self.SetStatus("Please Configure...")
             wx.MessageDialog(None, "Please configure Wine Autostart using the indicator menus, as this is the first run. For the moment, Wine Autostart will use some default settings.", "Wine Autostart - First Run", wx.OK | wx.ICON_EXCLAMATION | wx.STAY_ON_TOP, pos=wx.DefaultPosition).ShowModal()
-            ConfigPresent = False
-
-        #Check if we found all settings.
-        if StartOnBoot == None:
-            logger.warning("MainClass().ReadConfig(): Using default value of True for StartOnBoot...")
-            StartOnBoot = True
-            AutoConfig = True
-
-        if StartupUpdateCheck == None:
-            logger.warning("MainClass().ReadConfig(): Using default value of True for StartupUpdateCheck...")
-            StartupUpdateCheck = False
-            AutoConfig = True
-
-        if UseWineAutoscan == None:
-            logger.warning("MainClass().ReadConfig(): Using default value of True for UseWineAutoscan...")
-            UseWineAutoscan = True
-            AutoConfig = True
-
-        if PromptBeforeScanning == None:
-            logger.warning("MainClass().ReadConfig(): Using default value of True for PromptBeforeScanning...")
-            PromptBeforeScanning = True
-            AutoConfig = True
-
-        if DevicesToMonitor == []:
-            logger.warning("MainClass().ReadConfig(): Using default value of '/dev/sr0' for DevicesToMonitor...")
-            DevicesToMonitor = ['/dev/sr0']
-            AutoConfig = True
 
         if AutoConfig == True and ConfigPresent == True:
             #Let the user know.
@@ -333,11 +1503,27 @@ class MainClass(wx.Frame):
         #Close event.
         self.Bind(wx.EVT_CLOSE, self.OnExit)
 
-    def ProcessMessage(self, Line):
-        """Process a message (in the form of a line) from the Indicator, and do certain things based on what it is. Also, log it."""
-        #Silence the echo for status messages.
-        if "Status:" not in Line:
-            logger.debug("MainClass().ProcessMessage(): Message from indicator process (self.Indicator): "+Line)
+    def ProcessMessage(self, Message):
+        """Process a message (a dictionary) from the Indicator, and do certain things based on what it is. Also, log it."""
+        if Message["Type"] == "Text":
+            #Output that isn't a message, eg warnings from GTK.
+            logger.debug("MainClass().ProcessMessage(): Output from indicator process (self.Indicator): "+Message["Text"])
+            return
+
+        elif Message["Type"] == "Unsupported":
+            logger.warning("MainClass().ProcessMessage(): Indicator process (self.Indicator) sent a message we don't understand (protocol version "+unicode(Message["Version"])+"): "+Message["Text"])
+            return
+
+        elif Message["Type"] == "Hello":
+            logger.debug("MainClass().ProcessMessage(): Indicator process (self.Indicator) version "+unicode(Message.get("AppVersion"))+" started...")
+            return
+
+        elif Message["Type"] != "Command":
+            logger.warning("MainClass().ProcessMessage(): Unknown message type from indicator process (self.Indicator): "+Message["Type"]+"...")
+            return
+
+        Line = Message.get("Name")
+        logger.debug("MainClass().ProcessMessage(): Command from indicator process (self.Indicator): "+unicode(Line))
 
         #React to it, if it's commanding us to do anything.
         if Line == "ShowSettings":
@@ -361,17 +1547,39 @@ class MainClass(wx.Frame):
         elif Line == "Quit":
             self.OnExit()
 
-    def SendMessage(self, Event=None, Message="", Quiet=False):
-        """Send a message to the indicator (self.Indicator). Also, log it if Quiet == False."""
+    def CallAfter(self, Function, *Args, **Kwargs):
+        """Call Function on the GUI thread, without waiting for it. Safe to call from any thread."""
+        wx.CallAfter(Function, *Args, **Kwargs)
+
+    def SendMessage(self, Type, Quiet=False, **Fields):
+        """Send a message of the given type to the indicator (self.Indicator), and return a future that's done when the indicator has handled it, or None if the indicator has gone. Also, log it if Quiet == False."""
         if Quiet == False:
-            logger.debug("MainClass().SendMessage(): Sending message to indicator process: "+Message+"...")
+            logger.debug("MainClass().SendMessage(): Sending message to indicator process: "+Type+" "+unicode(Fields)+"...")
 
-        self.Indicator.stdin.write(Message+"\n")
+        try:
+            return self.IndicatorChannel.Send(Type, **Fields)
+
+        except (IOError, OSError, ValueError) as Error:
+            logger.error("MainClass().SendMessage(): Couldn't send message to indicator process ("+unicode(Error)+")...")
+            return None
 
     def SetStatus(self, Status):
-        """Update the status menu item in the indicator to reflect changes in the status."""
-        logger.debug("MainClass().SetStatus(): Setting status to '"+Status+"'...")
-        self.SendMessage(Message="Status: "+Status, Quiet=True)
+        """Update the status menu item in the indicator to reflect changes in the status. Bursts of changes are merged into one update, which is sent a frame later."""
+        self.PendingStatus = Status
+
+        if self.StatusTimer == None:
+            self.StatusTimer = wx.CallLater(16, self.SendStatus)
+
+    def SendStatus(self):
+        """Send the latest status to the indicator, if it's actually changed"""
+        self.StatusTimer = None
+
+        if self.PendingStatus == self.Status:
+            return
+
+        logger.debug("MainClass().SendStatus(): Setting status to '"+self.PendingStatus+"'...")
+        self.Status = self.PendingStatus
+        self.SendMessage("SetStatus", Quiet=True, Status=self.Status)
 
     def CheckForUpdates(self):
         """Check whether we're running the latest version of Wine Autostart."""
@@ -478,14 +1686,17 @@ class MainClass(wx.Frame):
         """Start the backend"""
         global RunningBackend
         if RunningBackend == False:
+            #Give the old backend thread (if any) a moment to finish, so two don't run at once.
+            if self.Backend != None and self.Backend.is_alive():
+                logger.debug("MainClass().StartBackend(): Waiting for the old backend thread to exit...")
+                self.Backend.join(1)
+
             logger.debug("MainClass().StartBackend(): Starting backend...")
             RunningBackend = True
-            BackendThread(self)
+            self.Backend = BackendThread(self)
 
             #Disable the start item, and enable the stop item.
-            self.SendMessage(Message="DisableStartItem")
-            time.sleep(1)
-            self.SendMessage(Message="EnableStopItem")
+            self.SendMessage("SetControls", Start=False, Stop=True)
 
         else:
             logger.warning("MainClass().StartBackend(): Backend is already running! Doing nothing...")
@@ -501,10 +1712,12 @@ class MainClass(wx.Frame):
             global RunningBackend
             RunningBackend = False
 
+            #Cancel the backend thread's scheduler, so it stops straight away even if it's waiting.
+            if self.Backend != None:
+                self.Backend.Scheduler.Cancel()
+
             #Disable the stop item, and enable the start item.
-            self.SendMessage(Message="DisableStopItem")
-            time.sleep(1)
-            self.SendMessage(Message="EnableStartItem")
+            self.SendMessage("SetControls", Start=True, Stop=False)
 
     def OnAbout(self):
         """Show the about dialog"""
@@ -522,10 +1735,8 @@ class MainClass(wx.Frame):
         #Show the About Box
         wx.AboutBox(aboutbox)
 
-    def ShowThreadMsgdlg(self,msg,kind="info"):
-        """Show a Message dialog for a background thread. Use this with: wx.CallAfter(self.ParentWindow.ShowThreadMsgdlg, kind=<kind>, msg=<message>)"""
-        global dlgClosed
-
+    def ShowThreadMsgdlg(self,msg,Result,kind="info"):
+        """Show a Message dialog for a background thread, and set the Result future when it's closed. Use this with: wx.CallAfter(self.ParentWindow.ShowThreadMsgdlg, kind=<kind>, msg=<message>, Result=<future>)"""
         if kind == "info":
             title = "Wine Autostart - Information"
             style = wx.OK | wx.ICON_INFORMATION
@@ -536,33 +1747,43 @@ class MainClass(wx.Frame):
             title = "Wine Autostart - Error"
             style = wx.OK | wx.ICON_ERROR
 
-        dlg = wx.MessageDialog(None, msg, title, style | wx.STAY_ON_TOP, pos=wx.DefaultPosition).ShowModal()
-        dlgClosed = True
+        wx.MessageDialog(None, msg, title, style | wx.STAY_ON_TOP, pos=wx.DefaultPosition).ShowModal()
+        Result.SetResult(None)
 
-    def ShowThreadYesNodlg(self,msg,title="Wine Autostart - Question"):
-        """Show a Yes/No dialog for a background thread. Use this with: wx.CallAfter(self.ParentWindow.ShowThreadYesNodlg, msg=<message>, title=<title>)"""
-        global dlgResult
+    def ShowThreadYesNodlg(self,msg,Result,title="Wine Autostart - Question",Question=None):
+        """Show a Yes/No dialog for a background thread, and set the Result future to True (yes) or False (no). Question says which question it is, for frontends that answer it themselves (see Daemon). Use this with: wx.CallAfter(self.ParentWindow.ShowThreadYesNodlg, msg=<message>, title=<title>, Result=<future>)"""
         dlg = wx.MessageDialog(None, msg, title, wx.YES_NO | wx.ICON_QUESTION | wx.STAY_ON_TOP, pos=wx.DefaultPosition)
+        Answer = (dlg.ShowModal() == wx.ID_YES)
 
-        if dlg.ShowModal() == wx.ID_YES:
-            dlgResult = "Yes"
-        else:
-            dlgResult = "No"
-
-        logger.debug("MainClass().ShowThreadYesNodlg(): Result of BackendThread yesno dlg was: "+dlgResult)
-
-    def ShowThreadChoicedlg(self,msg,choices,title="Wine Autostart - Select an Option"):
-        """Show a Single Choice dialog for a background thread. Use this with: wx.CallAfter(self.ParentWindow.ShowThreadChoicedlg, msg=<message>, title=<title>, choices=<data>)"""
-        global dlgResult
+        logger.debug("MainClass().ShowThreadYesNodlg(): Result of BackendThread yesno dlg was: "+unicode(Answer))
+        Result.SetResult(Answer)
 
-        dlg = wx.SingleChoiceDialog(None, msg, title, choices, pos=wx.DefaultPosition)
+    def ShowThreadChooserdlg(self,msg,Result,title="Wine Autostart - Select a File"):
+        """Show a software chooser dialog for a background thread, which can be filled in while it's open with AddThreadChoices(), and set the Result future to the selected file, or None if the user didn't want to run anything. Use this with: wx.CallAfter(self.ParentWindow.ShowThreadChooserdlg, msg=<message>, title=<title>, Result=<future>)"""
+        dlg = ChooserDialog(msg, title)
+        self.Choosers[Result] = dlg
 
         if dlg.ShowModal() == wx.ID_OK:
-            dlgResult = dlg.GetStringSelection()
+            Choice = dlg.GetChoice()
         else:
-            dlgResult = "Clicked no..."
+            Choice = None
 
-        logger.debug("MainClass().ShowThreadChoicedlg(): Result of InitThread choice dlg was: "+dlgResult)
+        del self.Choosers[Result]
+        dlg.Timer.Stop()
+        dlg.Destroy()
+
+        logger.debug("MainClass().ShowThreadChooserdlg(): Result of BackendThread chooser dlg was: "+unicode(Choice))
+        Result.SetResult(Choice)
+
+    def AddThreadChoices(self,Result,Ranked):
+        """Add ranked choices to the software chooser dialog for the given future, if it's still open"""
+        if Result in self.Choosers:
+            self.Choosers[Result].AddChoices(Ranked)
+
+    def FinishThreadChoices(self,Result,Message=None):
+        """Tell the software chooser dialog for the given future that there won't be any more choices, if it's still open, showing Message if there is one"""
+        if Result in self.Choosers:
+            self.Choosers[Result].Finish(Message)
 
     def OnExit(self,Event=None):
         """Exit the program"""
@@ -613,11 +1834,22 @@ class MainClass(wx.Frame):
             else:
                 wx.MessageDialog(None, 'Okay, Wine Autostart will now exit without saving the log file.', 'Wine Autostart - Information', wx.OK | wx.ICON_INFORMATION | wx.STAY_ON_TOP, pos=wx.DefaultPosition).ShowModal()
 
-            #Destroy the indicator.
-            self.SendMessage(Message="Quit")
-            time.sleep(1)
+            #Destroy the indicator, once it's had a chance to quit by itself.
+            Result = self.SendMessage("Quit")
+
+            if Result != None:
+                try:
+                    Result.Result(Timeout=1)
+
+                except IOError:
+                    #It's already gone.
+                    pass
+
             self.Indicator.terminate()
 
+            if self.ControlServer != None:
+                self.ControlServer.Close()
+
             #Empty and remove the temporary directory.
             if os.path.isdir("/tmp/wineautostart"):
                 shutil.rmtree("/tmp/wineautostart")
@@ -698,6 +1930,7 @@ class SettingsWindow(wx.Frame):
         self.SetClientSize(wx.Size(510,380))
         self.ParentWindow = ParentWindow
         self.CurrentDeviceSelections = DevicesToMonitor[:]
+        self.DiskInfo = {}
         wx.Frame.SetIcon(self, AppIcon)
 
         #Create text.
@@ -856,8 +2089,8 @@ class SettingsWindow(wx.Frame):
 
         #DevicesToMonitor:
         if Event == None:
-            #Don't block the initialization of the panel when calling the method.
-            wx.CallLater(500, self.GetDeviceInfo)
+            #This shows the cached device information straight away if we have it, and otherwise gets it in another thread.
+            self.GetDeviceInfo()
         else:
             self.CurrentDeviceSelections = DevicesToMonitor[:]
             self.UpdateCheckBoxes()
@@ -893,17 +2126,26 @@ class SettingsWindow(wx.Frame):
                 self.CurrentDeviceSelections.pop(Index)
 
     def GetDeviceInfo(self, Event=None):
-        """Call the thread to get device info, disable the update button, and start the throbber"""
-        logger.info("SettingsWindow().UpdateDeviceInfo(): Getting new device information...")
-        self.RefreshButton.Disable()
-        GetDeviceInformation(self)
-        self.Throbber.Play()
-
-    def ReceiveDeviceInfo(self, Info):
-        """Get new device info and to call the function that updates the checkboxes"""
-        logger.info("MainWindow().ReceiveDeviceInfo(): Received new device information...")
-        global DiskInfo
-        DiskInfo = Info
+        """Get device info (probing the drives again if the refresh button was clicked), and update the checkboxes. If we have to wait for it, disable the update button and start the throbber."""
+        logger.info("SettingsWindow().GetDeviceInfo(): Getting device information...")
+        Result = self.ParentWindow.DeviceInfo.Request(Refresh=(Event != None), Callback=lambda Result: wx.CallAfter(self.ReceiveDeviceInfo, Result))
+
+        if Result.IsDone():
+            self.ReceiveDeviceInfo(Result)
+
+        else:
+            self.RefreshButton.Disable()
+            self.Throbber.Play()
+
+    def ReceiveDeviceInfo(self, Result):
+        """Get new device info from the given future and to call the function that updates the checkboxes"""
+        logger.info("SettingsWindow().ReceiveDeviceInfo(): Received new device information...")
+
+        try:
+            self.DiskInfo = Result.Result()
+
+        except Exception as Error:
+            logger.error("SettingsWindow().ReceiveDeviceInfo(): Couldn't get device information ("+unicode(Error)+")! Keeping the old information...")
 
         #Update the checkboxes in self.DeviceSizer.
         self.UpdateCheckBoxes()
@@ -919,9 +2161,9 @@ class SettingsWindow(wx.Frame):
         self.CheckBoxIDList = []
 
         #Now add new ones.
-        for Device in DiskInfo:
+        for Device in self.DiskInfo:
             #Create a checkbox object, and add it to the sizer, save its ID, and bind an event for it.
-            CheckBox = wx.CheckBox(self.Panel, -1, Device+", "+DiskInfo[Device]["Vendor"]+" "+DiskInfo[Device]["Product"]+", "+DiskInfo[Device]["Description"])
+            CheckBox = wx.CheckBox(self.Panel, -1, Device+", "+self.DiskInfo[Device]["Vendor"]+" "+self.DiskInfo[Device]["Product"]+", "+self.DiskInfo[Device]["Description"])
             self.DeviceSizer.Add(CheckBox, 0, wx.ALIGN_CENTER_HORIZONTAL|wx.ALIGN_TOP)
             self.CheckBoxIDList.append(CheckBox.GetId())
             self.Bind(wx.EVT_CHECKBOX, self.OnCheckBox, CheckBox)
@@ -1209,280 +2451,104 @@ class SettingsWindow(wx.Frame):
             wx.CallAfter(self.ParentWindow.ReadConfig, StartBackend=True, UpdateCheckNow=False)
 
 #End Settings Window.
-#Start Backend thread.
-class BackendThread(threading.Thread):
-    def __init__(self, ParentWindow):
-        """Initialize and start the thread."""
-        self.ParentWindow = ParentWindow
-        threading.Thread.__init__(self)
-        self.DevicesToIgnore = []
-        self.RunningSoftwareDevice = None
-        self.RunningSoftwareMountPoint = None
-        self.start()
-
-    def ShowMsgDlg(self,Message,Kind="info"):
-        """Handle showing thread message dialogs, reducing code duplication and compilications and errors."""
-        #Use this with: self.ShowMsgDlg(Kind=<kind>, Message=<message>)
-        #Reset dlgClosed, avoiding errors.
-        global dlgClosed
-        dlgClosed = None
-
-        wx.CallAfter(self.ParentWindow.ShowThreadMsgdlg, kind=Kind, msg=Message)
-
-        #Trap the thread until the user responds.
-        while dlgClosed == None:
-            time.sleep(0.5)
-
-    def ShowYesNoDlg(self,Message,Title="Wine Autostart - Question"):
-        """Handle showing thread yes/no dialogs, reducing code duplication and compilications and errors."""
-        #Use this with: self.ShowYesNoDlg(Message=<message>, Title = <title>)
-        #Reset dlgResult, avoiding errors.
-        global dlgResult
-        dlgResult = None
-
-        wx.CallAfter(self.ParentWindow.ShowThreadYesNodlg, msg=Message, title=Title)
-
-        #Trap the thread until the user responds.
-        while dlgResult == None:
-            time.sleep(0.5)
-
-        #Return dlgResult directly potentially avoiding problems.
-        return dlgResult
-
-    def ShowChoiceDlg(self,Message,Title,Choices):
-        """Handle showing thread choice dialogs, reducing code duplication and compilications and errors."""
-        #Use this with: self.ShowChoiceDlg(Message=<message>, Title=<title>, Choices=<choices>)
-        while True:
-            #Reset dlgResult, avoiding errors.
-            global dlgResult
-            dlgResult = None
-
-            wx.CallAfter(self.ParentWindow.ShowThreadChoicedlg, msg=Message, title=Title, choices=Choices)
-
-            #Trap the thread until the user responds.
-            while dlgResult == None:
-                time.sleep(0.5)
-
-            #Stop the user from avoiding entering anything.
-            if dlgResult in ["", "Clicked no..."]:
-                self.ShowMsgDlg(Kind="warning", Message="Please select an appropriate option.")
-            else:
-                #Return dlgResult directly potentially avoiding problems.
-                return dlgResult
-
-    def ReadAutorunInfo(self, MountPoint):
-        """Try to find an autorun file, and run the specified exe file."""
-        AutorunFile = BackendTools().FindAutorunFile(MountPoint)
-
-        #Check if we found one.
-        if AutorunFile != None:
-            #Now parse the autorun file to try and find an executable.
-            logger.info("BackendThread().ReadAutorunInfo(): Found autorun file at: "+AutorunFile+". Parsing it...")
-            AutorunExeFile = BackendTools().ParseAutorunFile(AutorunFile)
-
-            #Check if we found one.
-            if AutorunExeFile == None:
-                #We haven't, so try Wine Autoscan instead.
-                logger.info("BackendThread().ReadAutorunInfo(): No exe file specified in autorun info. Using Wine Autoscan...")
-
-            elif os.path.isfile(MountPoint.replace("\\", "")+"/"+AutorunExeFile.replace("\\", "")):
-                #We have! Ask the user if he/she wants to run this file.
-                logger.info("BackendThread().ReadAutorunInfo(): Found helpful autorun information! Asking the user if he/she wants to run the specified file ("+MountPoint+"/"+AutorunExeFile+")...")
-                Result = self.ShowYesNoDlg(Message="Wine Autostart has found the following Windows software on the CD/DVD you inserted: "+MountPoint+"/"+AutorunExeFile+". Do you want to run it?\n\nNote: If you click no, you will be prompted to use Wine Autoscan instead.")
-
-                #Do what the user says.
-                if Result == "No":
-                    #Try to use Wine Autoscan instead.
-                    logger.info("BackendThread().ReadAutorunInfo(): Not running the software as the user requested. Using Wine Autoscan...")
-
-                else:
-                    #Run the software.
-                    logger.info("BackendThread().ReadAutorunInfo(): Running the software as the user requested...")
-
-                    #Return the file so FindAndRunSoftware knows to run the file.
-                    return MountPoint.replace("\\", "")+"/"+AutorunExeFile.replace("\\", "")
-
-            else:
-                #Bad autorun information, because it points at a file that doesn't exist, so try Wine Autoscan instead.
-                logger.warning("BackendThread().ReadAutorunInfo(): Bad autorun information! It points to an executable file ("+MountPoint+"/"+AutorunExeFile+") that doesn't exist!")
-
-        else:
-            logger.info("BackendThread().ReadAutorunInfo(): No autorun information found. Using Wine Autoscan...")
-
-    def WineAutoscan(self, MountPoint):
-        """Try to scan for exe files, and return a user-chosen one to self.FindAndRunSoftware"""
-        logger.info("BackendThread().WineAutoscan(): Scanning for exe files in "+MountPoint+"...")
-        DeclinedInstallers = False
-        ExeFiles = BackendTools().ScanForExeFiles(MountPoint)
-
-        #See if there are any installers.
-        Installers = []
-
-        for File in ExeFiles:
-            if "SETUP.EXE" in File.upper() or "INSTALL.EXE" in File.upper():
-                Installers.append(File)
-
-        if Installers != []:
-            #Ask the user which installer to run.
-            logger.info("BackendThread().WineAutoscan(): Found at least one installer! Asking the user which one to run...")
-            Result = self.ShowChoiceDlg(Message="Please select which installer you'd like to run, or select 'None'.\n\nNote: If you select 'None', you will be asked if you want to run any other software on the disk.", Title="Wine Autostart - Select an Installer", Choices=["None"] + Installers)
-
-            if Result != "None":
-                logger.info("BackendThread().WineAutoscan(): User selected "+Result+". Running software...")
-                return Result
-            else:
-                logger.info("BackendThread().WineAutoscan(): User declined the installers. Asking to run any other files instead...")
-                DeclinedInstallers = True
-
-        if Installers == [] or DeclinedInstallers:
-            #See if there are any other exe files.
-            if ExeFiles != []:
-                #Ask the user which file to run.
-                logger.info("BackendThread().WineAutoscan(): Found at least one exe file! Asking the user which one to run...")
-                Result = self.ShowChoiceDlg(Message="Please select which exe file you'd like to run, or select 'None'\n\nNote: If you select 'None' the disk will be ignored until the media is ejected.", Title="Wine Autostart - Select a File", Choices=["None"] + ExeFiles)
-
-                if Result != "None":
-                    logger.info("BackendThread().WineAutoscan(): User selected "+Result+". Running software...")
-                    return Result
-                else:
-                    logger.info("BackendThread().WineAutoscan(): User declined running any suggested software. Ignoring the disk...")
-
-    def run(self):
-        """Main body of the thread, started with self.start()"""
-        global RunningSoftware
-        RunningSoftware = False
-
-        while RunningBackend:
-            #Use a try statement to see if wineserver is running.
-            try:
-                subprocess.check_output(["pgrep", "wineserver"])
-
-            except subprocess.CalledProcessError:
-                #If it isn't, start the main part of the loop.
-                #Check if we just finished running software.
-                if RunningSoftware:
-                    #If so, ignore the disk that houses the software that was just being run until it is ejected.
-                    self.DevicesToIgnore.append(self.RunningSoftwareDevice)
-                    self.DevicesToIgnore.append(self.RunningSoftwareMountPoint)
-
-                wx.CallAfter(self.ParentWindow.SetStatus, "Checking for disk...")
-                RunningSoftware = self.FindAndRunSoftware()
-
-                #If WINE is starting, wait 30 seconds before checking again because the startup procedure is slow.
-                if RunningSoftware:
-                    #Notify the user.
-                    subprocess.call("notify-send 'Wine Autostart' 'Wine Autostart is preparing to run software, please wait for up to 30 seconds...' -i /usr/share/pixmaps/wineautostart.png", shell=True)
-                    wx.CallAfter(self.ParentWindow.SetStatus, "Running software...")
-
-                    #Wineserver starts in much  less than 10 seconds, so give it plenty of time, but also allow upating the status quickly in case the app crashed, and we start looking for disks again.
-                    time.sleep(10)
-
-                else:
-                    #Check again.
-                    time.sleep(1)
+#Begin Software Chooser Dialog.
+class ChooserDialog(wx.Dialog):
+    def __init__(self, Message, Title):
+        """Initialize ChooserDialog"""
+        wx.Dialog.__init__(self, parent=None, title=Title, size=(500,350), style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER | wx.STAY_ON_TOP)
+        self.SetIcon(AppIcon)
+
+        #The (negated) score of each file in the list, so new files can be inserted in order.
+        self.Scores = []
+        self.Found = 0
+
+        self.CreateWidgets(Message)
+        self.SetupSizers()
+        self.BindEvents()
 
-            #If wineserver is running, wait for it (and any software) to finish before doing anything else. 
-            else:
-                wx.CallAfter(self.ParentWindow.SetStatus, "Running software...")
-                time.sleep(10)
+    def CreateWidgets(self, Message):
+        """Create all widgets for ChooserDialog"""
+        self.MessageText = wx.StaticText(self, -1, Message)
+        self.ListBox = wx.ListBox(self, -1, choices=[], style=wx.LB_SINGLE)
+        self.StatusText = wx.StaticText(self, -1, "Still looking for software...")
+        self.Throbber = wx.Gauge(self, -1, 100, size=(100,10))
+        self.NoneButton = wx.Button(self, wx.ID_CANCEL, "Don't Run Anything")
+        self.RunButton = wx.Button(self, wx.ID_OK, "Run")
 
-        #Change the status message, if the program isn't shutting down.
-        if Exiting == False:
-            wx.CallAfter(self.ParentWindow.SetStatus, "Stopped.")
+        self.RunButton.Disable()
+        self.Throbber.Pulse()
 
-    def FindAndRunSoftware(self):
-        """Try to find and run Windows software"""
-        #Check for disks in each drive we're monitoring and not currently ignoring.
-        for Dev in DevicesToMonitor:
-            #Look for mounted media in each drive.
-            MountPoint = BackendTools().GetDiskMountPoint(Dev)
+        #Pulse the gauge while we're still scanning.
+        self.Timer = wx.Timer(self)
+        self.Timer.Start(100)
 
-            if Dev in self.DevicesToIgnore:
-                #Check if we still need to ignore this drive, or whether the media has changed (or been ejected).
-                IgnoredMountPoint = self.DevicesToIgnore[self.DevicesToIgnore.index(Dev)+1]
+    def SetupSizers(self):
+        """Set up sizers for ChooserDialog"""
+        StatusSizer = wx.BoxSizer(wx.HORIZONTAL)
+        StatusSizer.Add(self.StatusText, 1, wx.RIGHT|wx.ALIGN_CENTER_VERTICAL, 10)
+        StatusSizer.Add(self.Throbber, 0, wx.ALIGN_CENTER_VERTICAL)
 
-                if MountPoint != IgnoredMountPoint:
-                    #Remove it from the list of devices to ignore.
-                    logger.debug("BackendThread().FindAndRunSoftware(): Stopped ignoring "+Dev+", as media has changed or is no longer present...")
-                    self.DevicesToIgnore.pop(self.DevicesToIgnore.index(Dev))
-                    self.DevicesToIgnore.pop(self.DevicesToIgnore.index(IgnoredMountPoint))
-                    MountPoint = None
+        ButtonSizer = wx.BoxSizer(wx.HORIZONTAL)
+        ButtonSizer.Add(self.NoneButton, 0, wx.RIGHT, 10)
+        ButtonSizer.Add(self.RunButton, 0)
 
-                else:
-                    #Avoid an UnboundLocalError.
-                    MountPoint = None
-                
-            if MountPoint != None:
-                #Found media!
-                logger.info("BackendThread().FindAndRunSoftware(): Found media in "+Dev+"! Media is mounted at: "+MountPoint+"...")
-                Device = Dev
+        MainSizer = wx.BoxSizer(wx.VERTICAL)
+        MainSizer.Add(self.MessageText, 0, wx.ALL|wx.EXPAND, 10)
+        MainSizer.Add(self.ListBox, 1, wx.LEFT|wx.RIGHT|wx.EXPAND, 10)
+        MainSizer.Add(StatusSizer, 0, wx.ALL|wx.EXPAND, 10)
+        MainSizer.Add(ButtonSizer, 0, wx.BOTTOM|wx.ALIGN_RIGHT|wx.RIGHT, 10)
 
-                #If set this way, ask the user if he/she wants Wine Autostart to look for software on this disk. Otherwise continue without confirmation.
-                if PromptBeforeScanning:
-                    logger.info("BackendThread().FindAndRunSoftware(): Asking the user if we're going to look for software in "+Device+"...")
-                    Result = self.ShowYesNoDlg(Message="Wine Autostart has detected a disk in the drive "+Device+". Do you want Wine Autostart to look for Windows software on it?\n\nNote: If you click no, the drive will also be ignored by Wine Autostart until the media is ejected.")
+        self.SetSizer(MainSizer)
+        MainSizer.SetMinSize(wx.Size(500,350))
+        MainSizer.SetSizeHints(self)
 
-                else:
-                    Result = "Yes"
+    def BindEvents(self):
+        """Bind events for ChooserDialog"""
+        self.Bind(wx.EVT_LISTBOX, self.OnSelect, self.ListBox)
+        self.Bind(wx.EVT_LISTBOX_DCLICK, self.OnRun, self.ListBox)
+        self.Bind(wx.EVT_BUTTON, self.OnRun, self.RunButton)
+        self.Bind(wx.EVT_TIMER, self.OnTimer, self.Timer)
 
-                #Do what the user says.
-                if Result == "No":
-                    #Ignore the drive.
-                    logger.info("BackendThread().FindAndRunSoftware(): Ignoring the drive as the user requested...")
-                    self.DevicesToIgnore.append(Device)
-                    self.DevicesToIgnore.append(MountPoint)
-                    MountPoint = None
+    def AddChoices(self, Ranked):
+        """Add some more files to the list (a list of (score, file) tuples), keeping the list in order of score, highest first. Files with the same score as ones already in the list go after them."""
+        for Score, File in Ranked:
+            Position = bisect.bisect_right(self.Scores, -Score)
+            self.Scores.insert(Position, -Score)
+            self.ListBox.Insert(File, Position)
 
-                else:
-                    break
+        self.Found += len(Ranked)
+        self.StatusText.SetLabel("Still looking for software... ("+unicode(self.Found)+" found so far)")
 
-        #Check if we found any media, and return False if we didn't, stopping the function.
-        if MountPoint == None:
-            logger.info("BackendThread().FindAndRunSoftware(): No media found in any of our devices to monitor that we aren't ignoring. Waiting for media...")
-            return False
+    def Finish(self, Message=None):
+        """Stop showing that we're still looking for software, and show Message (or say we've finished) instead"""
+        self.Timer.Stop()
+        self.Throbber.SetValue(100)
 
-        #Look for software.
-        logger.info("BackendThread().FindAndRunSoftware(): Looking for software as the user requested...")
-        ExeFile = self.ReadAutorunInfo(MountPoint)
+        if Message == None:
+            Message = "Finished looking for software ("+unicode(self.Found)+" found)."
 
-        #Check if an exe file was found.
-        if ExeFile != None:
-            #Run it, and allow the disk to be ignored when the software has closed.
-            subprocess.Popen("wine start /Unix '"+ExeFile+"'", shell=True)
-            self.RunningSoftwareDevice = Device
-            self.RunningSoftwareMountPoint = MountPoint
-            return True
+        self.StatusText.SetLabel(Message)
 
-        #Check if Wine Autoscan is enabled.
-        if UseWineAutoscan == False:
-            logger.info("BackendThread().FindAndRunSoftware(): Wine Autoscan is disabled. Ignoring disk and notifying user...")
-            self.ShowMsgDlg(Message="No helpful autorun information was found on "+Device+", and Wine Autoscan is disabled in the settings window, so this drive will now be ignored until the media is ejected.")
+    def GetChoice(self):
+        """Return the file the user selected, or None"""
+        if self.ListBox.GetSelection() == wx.NOT_FOUND:
+            return None
 
-        else:
-            logger.info("BackendThread().FindAndRunSoftware(): Asking the user if we're going to use Wine Autoscan...")
-            Result = self.ShowYesNoDlg(Message="Wine Autostart couldn't find any software on "+Device+" from autorun information. Do you want Wine Autostart to scan for Windows software instead?\n\nNote: If you click no, the drive will also be ignored by Wine Autostart until the media is ejected.")
+        return self.ListBox.GetStringSelection()
 
-            if Result == "Yes":
-                #Try to scan for exe files.
-                logger.info("BackendThread().FindAndRunSoftware(): We are using Wine Autoscan. Continuing...")
-                ExeFile = self.WineAutoscan(MountPoint)
+    def OnSelect(self, Event=None):
+        """Only let the user click Run when something is selected"""
+        self.RunButton.Enable(self.ListBox.GetSelection() != wx.NOT_FOUND)
 
-                #Check if an exe file was found.
-                if ExeFile != None:
-                    #Run it, and allow the disk to be ignored when the software has closed.
-                    subprocess.Popen("wine start /Unix '"+ExeFile+"'", shell=True)
-                    self.RunningSoftwareDevice = Device
-                    self.RunningSoftwareMountPoint = MountPoint
-                    return True
+    def OnTimer(self, Event=None):
+        """Pulse the gauge"""
+        self.Throbber.Pulse()
 
-        #If we get here, software isn't being run, so ignore the disk and return False.
-        logger.info("BackendThread().FindAndRunSoftware(): We didn't find any software to run. Ignoring the device until media changes...")
-        self.ShowMsgDlg(Message="Wine Autostart coudn't find any windows software to run on "+Device+", so this drive will now be ignored until the media is ejected.")
-        self.DevicesToIgnore.append(Device)
-        self.DevicesToIgnore.append(MountPoint)
+    def OnRun(self, Event=None):
+        """Close the dialog if the user has selected something to run"""
+        if self.ListBox.GetSelection() != wx.NOT_FOUND:
+            self.EndModal(wx.ID_OK)
 
-        return False
-                    
-#End Backend thread.
+#End Software Chooser Dialog.
 app = WineAutostart(False)
 app.MainLoop()
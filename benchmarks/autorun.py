@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Autorun Parser Benchmark for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Measure how long the autorun.inf parser takes for each file in the test corpus. Usage: benchmarks/autorun.py [rounds]
+
+#Import modules.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import support
+from Tools.tools import Main as BackendTools
+
+def Benchmark(Rounds):
+    """Parse every file in the corpus Rounds times, and print the mean time for each one"""
+    Files = sorted(Name for Name in os.listdir(support.GetDataPath("autorun")) if Name.endswith(".inf"))
+    Total = 0
+
+    for Name in Files:
+        Path = support.GetDataPath("autorun", Name)
+        Start = time.time()
+
+        for Round in range(Rounds):
+            BackendTools().ParseAutorunFile(Path)
+
+        Time = (time.time() - Start) / Rounds
+        Total += Time
+        print("%-32s %8.1f us" % (Name, Time * 1e6))
+
+    print("%-32s %8.1f us" % ("Mean", Total / len(Files) * 1e6))
+
+if __name__ == "__main__":
+    Benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Control Socket Load Test for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Send Status requests to a control socket from lots of clients at once, and measure how long they take to be answered. Usage: benchmarks/controlsocket.py [socket] [clients] [requests]
+#Use "-" instead of a socket (or leave it out) to load test a control server on its own, that only answers Status requests.
+
+#Import modules.
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import support
+from Tools.ipc import ControlServer
+
+def HandleStatus(Request):
+    """Answer Status requests"""
+    if Request["Command"] != "Status":
+        raise ValueError("Unknown command: "+Request["Command"])
+
+    return {"RunningBackend": True}
+
+def LoadTest(Path, Clients, Count):
+    """Send Count requests from each of Clients clients at once, print how long they took, and return how many were answered wrongly"""
+    Times = []
+    Errors = []
+
+    def Client(Number):
+        """Send Count requests on one connection, one at a time, checking each response"""
+        Connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        Connection.connect(Path)
+        Input = Connection.makefile("rb")
+
+        for Request in range(Count):
+            Start = time.time()
+            Connection.sendall((json.dumps({"Command": "Status", "ID": Request})+"\n").encode("ascii"))
+            Response = json.loads(Input.readline().decode("utf-8"))
+            Times.append(time.time() - Start)
+
+            if Response.get("ID") != Request or Response.get("OK") != True:
+                Errors.append(Response)
+
+        Input.close()
+        Connection.close()
+
+    Threads = [threading.Thread(target=Client, args=(Number,)) for Number in range(Clients)]
+    Start = time.time()
+
+    for Thread in Threads:
+        Thread.start()
+
+    for Thread in Threads:
+        Thread.join()
+
+    Total = time.time() - Start
+    Times.sort()
+    print("Clients: %d  Requests: %d  Errors: %d  Throughput: %.0f/s  Median: %.1f us  99th percentile: %.1f us  Max: %.1f us" % (Clients, len(Times), len(Errors), len(Times) / Total, Times[len(Times) // 2] * 1e6, Times[int(len(Times) * 0.99)] * 1e6, Times[-1] * 1e6))
+    return len(Errors)
+
+if __name__ == "__main__":
+    Path = sys.argv[1] if len(sys.argv) > 1 else "-"
+    Clients = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    Count = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    if Path != "-":
+        sys.exit(1 if LoadTest(Path, Clients, Count) else 0)
+
+    TempDir = tempfile.mkdtemp()
+    Server = ControlServer(os.path.join(TempDir, "control.sock"), HandleStatus)
+
+    try:
+        Errors = LoadTest(Server.Path, Clients, Count)
+
+    finally:
+        Server.Close()
+        shutil.rmtree(TempDir)
+
+    sys.exit(1 if Errors else 0)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Indicator Message Benchmark for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Measure how long it takes for a message to the indicator to be acknowledged, through a pair of pipes and a thread standing in for the indicator. Usage: benchmarks/ipc.py [messages]
+
+#Import modules.
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import support
+from Tools.ipc import Channel
+
+def Benchmark(Count):
+    """Send Count messages one at a time, waiting for each to be acknowledged, and print how long that took"""
+    ToIndicator, FromMain = os.pipe()
+    ToMain, FromIndicator = os.pipe()
+    Main = Channel(os.fdopen(ToMain, "rb"), os.fdopen(FromMain, "wb"))
+    Indicator = Channel(os.fdopen(ToIndicator, "rb"), os.fdopen(FromIndicator, "wb"))
+
+    def Echo():
+        """Acknowledge every message, like the indicator does"""
+        while True:
+            Message = Indicator.ReadMessage()
+
+            if Message == None:
+                break
+
+            Indicator.Acknowledge(Message)
+
+            if Message["Type"] == "Quit":
+                break
+
+    def ReadAcks():
+        """Handle acknowledgements, like Wine Autostart's IPC thread does"""
+        while Main.ReadMessage() != None:
+            pass
+
+    threading.Thread(target=Echo).start()
+    Reader = threading.Thread(target=ReadAcks)
+    Reader.daemon = True
+    Reader.start()
+
+    Times = []
+
+    for Number in range(Count):
+        Start = time.time()
+        Main.Send("SetStatus", Status="Checking for disk...").Result()
+        Times.append(time.time() - Start)
+
+    Main.Send("Quit").Result(1)
+    Times.sort()
+    print("Messages: %d  Mean: %.1f us  Median: %.1f us  99th percentile: %.1f us  Max: %.1f us" % (Count, sum(Times) / Count * 1e6, Times[Count // 2] * 1e6, Times[int(Count * 0.99)] * 1e6, Times[-1] * 1e6))
+
+if __name__ == "__main__":
+    Benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
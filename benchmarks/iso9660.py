@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ISO9660 Read Order Benchmark for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Compare reading a disc's directories in the order os.walk() would, in path table order, and in order of where they are on the disc. Usage: benchmarks/iso9660.py [device or image file]
+#Without a disc, an image with a few thousand directories, laid out out of path table order, is made to try it on.
+
+#Import modules.
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests import support
+from tests import isoimage
+from Tools.iso9660 import Image
+
+def Benchmark(Path):
+    """Walk the disc once in each order, and print how long it took and how far the drive had to seek"""
+    print("Order               Time (s)  Reads  Bytes read  Seek distance (sectors)")
+
+    for Name, Order in (("os.walk()", Image.GetWalkOrder), ("Path table", Image.GetPathTableOrder), ("Disc position", Image.GetReadOrder)):
+        Disc = Image(Path)
+
+        #Drop the image from the page cache (where we can), so each run starts cold.
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(Disc.File.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+        Start = time.time()
+        for Entries in Disc.Walk(lambda Table: Order(Disc, Table)):
+            pass
+        Duration = time.time() - Start
+
+        print("%-18s  %8.3f  %5d  %10d  %d" % (Name, Duration, Disc.Reads, Disc.BytesRead, Disc.SeekDistance // Disc.BlockSize))
+        Disc.Close()
+
+def MakeTestImage(Directory):
+    """Make an image with 50 directories of 50 directories, each with a file in it, and return its path"""
+    Path = os.path.join(Directory, "benchmark.iso")
+    Files = {}
+
+    for Outer in range(50):
+        for Inner in range(50):
+            Files["dir"+unicode(Outer)+"/sub"+unicode(Inner)+"/setup.exe"] = b"MZ"
+
+    isoimage.MakeImage(Path, Files, ScatterDirectories=True)
+    return Path
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        Benchmark(sys.argv[1])
+
+    else:
+        TempDir = tempfile.mkdtemp()
+
+        try:
+            Benchmark(MakeTestImage(TempDir))
+
+        finally:
+            shutil.rmtree(TempDir)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ISO9660 Test Images for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Builds small ISO9660 images (with Joliet and Rock Ridge names if wanted) for the tests and benchmarks, so they don't need mkisofs or a real disc.
+
+#Import modules.
+import struct
+
+BlockSize = 2048
+
+def Both16(Value):
+    """Pack a 16-bit number in both byte orders"""
+    return struct.pack("<H", Value) + struct.pack(">H", Value)
+
+def Both32(Value):
+    """Pack a 32-bit number in both byte orders"""
+    return struct.pack("<I", Value) + struct.pack(">I", Value)
+
+def Sectors(Size):
+    """Return how many sectors Size bytes take up"""
+    return max((Size + BlockSize - 1) // BlockSize, 1)
+
+def Record(Name, LBA, Size, IsDirectory, SystemUse=b""):
+    """Build a directory record"""
+    Padding = b"\0" if len(Name) % 2 == 0 else b""
+
+    if (33 + len(Name) + len(Padding) + len(SystemUse)) % 2 == 1:
+        SystemUse += b"\0"
+
+    Length = 33 + len(Name) + len(Padding) + len(SystemUse)
+    return struct.pack("<BB", Length, 0) + Both32(LBA) + Both32(Size) + b"\x76\x01\x01\0\0\0\0" + struct.pack("<BBB", 2 if IsDirectory else 0, 0, 0) + Both16(1) + struct.pack("<B", len(Name)) + Name + Padding + SystemUse
+
+def PackRecords(Records):
+    """Put directory records into sectors, without letting any of them cross a sector boundary"""
+    Data = b""
+
+    for Item in Records:
+        if len(Data) % BlockSize + len(Item) > BlockSize:
+            Data += b"\0" * (BlockSize - len(Data) % BlockSize)
+
+        Data += Item
+
+    return Data + b"\0" * (Sectors(len(Data)) * BlockSize - len(Data))
+
+def RockRidgeName(Name):
+    """Build a Rock Ridge NM entry"""
+    Name = Name.encode("utf-8")
+    return b"NM" + struct.pack("<BBB", 5 + len(Name), 1, 0) + Name
+
+class Directory():
+    """A directory in the image being built"""
+    def __init__(self, Name, Parent):
+        self.Name = Name
+        self.Parent = Parent
+        self.Directories = {}
+        self.Files = {}
+        self.LBA = {}
+        self.Size = {}
+
+class Builder():
+    """Lays out an image with the given files (a dictionary of {path: data}) on it"""
+    def __init__(self, Files, Joliet=False, RockRidge=False, ScatterDirectories=False):
+        self.Joliet = Joliet
+        self.RockRidge = RockRidge
+        self.Root = Directory("", None)
+
+        for Path, Data in sorted(Files.items()):
+            Parts = Path.split("/")
+            Current = self.Root
+
+            for Part in Parts[:-1]:
+                if Part not in Current.Directories:
+                    Current.Directories[Part] = Directory(Part, Current)
+
+                Current = Current.Directories[Part]
+
+            Current.Files[Parts[-1]] = Data
+
+        #Directories in path table order: by depth, then parent, then name.
+        self.Directories = [self.Root]
+
+        for Current in self.Directories:
+            self.Directories.extend(Current.Directories[Name] for Name in sorted(Current.Directories, key=self.IsoName))
+
+        #Put the directories on the disc in reverse path table order if asked, so reading them in path table order seeks back and forth.
+        self.DiscOrder = list(reversed(self.Directories)) if ScatterDirectories else self.Directories
+
+    def IsoName(self, Name, IsDirectory=True):
+        """Return the plain ISO9660 name for Name"""
+        Name = Name.upper().replace(" ", "_").encode("ascii", "replace")
+        return Name if IsDirectory else Name + b";1"
+
+    def JolietName(self, Name, IsDirectory=True):
+        """Return the Joliet name for Name"""
+        return Name.encode("utf-16-be") + (b"" if IsDirectory else b"\0;\x001")
+
+    def Entries(self, Current, Tree):
+        """Return (sort key, name, LBA, size, is directory, original name) for the entries in a directory"""
+        NameFunction = self.JolietName if Tree == "joliet" else self.IsoName
+        Entries = []
+
+        for Name, Child in Current.Directories.items():
+            Entries.append((NameFunction(Name), NameFunction(Name), Child.LBA.get(Tree, 0), Child.Size.get(Tree, BlockSize), True, Name))
+
+        for Name, Data in Current.Files.items():
+            Entries.append((NameFunction(Name, False), NameFunction(Name, False), self.FileLBAs[id(Current), Name], len(Data), False, Name))
+
+        return sorted(Entries)
+
+    def DirectoryData(self, Current, Tree):
+        """Build the records for a directory"""
+        RootSystemUse = b"SP" + struct.pack("<BB", 7, 1) + b"\xbe\xef\0" if Tree == "primary" and self.RockRidge and Current is self.Root else b""
+        Parent = Current.Parent or Current
+        Records = [Record(b"\0", Current.LBA.get(Tree, 0), Current.Size.get(Tree, BlockSize), True, RootSystemUse), Record(b"\x01", Parent.LBA.get(Tree, 0), Parent.Size.get(Tree, BlockSize), True)]
+
+        for Key, Name, LBA, Size, IsDirectory, Original in self.Entries(Current, Tree):
+            Records.append(Record(Name, LBA, Size, IsDirectory, RockRidgeName(Original) if Tree == "primary" and self.RockRidge else b""))
+
+        return PackRecords(Records)
+
+    def PathTable(self, Tree):
+        """Build the little-endian path table"""
+        Data = b""
+
+        for Current in self.Directories:
+            Name = b"\0" if Current is self.Root else (self.JolietName(Current.Name) if Tree == "joliet" else self.IsoName(Current.Name))
+            Parent = self.Directories.index(Current.Parent) + 1 if Current.Parent != None else 1
+            Data += struct.pack("<BBIH", len(Name), 0, Current.LBA.get(Tree, 0), Parent) + Name + (b"\0" if len(Name) % 2 == 1 else b"")
+
+        return Data
+
+    def Descriptor(self, Type, Tree, TotalSectors, PathTableLBA):
+        """Build a primary or supplementary volume descriptor"""
+        PathTableSize = len(self.PathTable(Tree))
+        Data = bytearray(BlockSize)
+        Data[0:7] = struct.pack("<B", Type) + b"CD001\x01"
+        Data[40:72] = b"TEST DISC".ljust(32)
+        Data[80:88] = Both32(TotalSectors)
+
+        if Tree == "joliet":
+            Data[88:91] = b"%/E"
+
+        Data[120:124] = Both16(1)
+        Data[124:128] = Both16(1)
+        Data[128:132] = Both16(BlockSize)
+        Data[132:140] = Both32(PathTableSize)
+        Data[140:144] = struct.pack("<I", PathTableLBA)
+        Data[156:190] = Record(b"\0", self.Root.LBA[Tree], self.Root.Size[Tree], True)
+        return bytes(Data)
+
+    def Build(self):
+        """Lay out the image, and return it"""
+        Trees = ["primary"] + (["joliet"] if self.Joliet else [])
+        Next = 16 + len(Trees) + 1
+
+        #Path tables, then the directories, then the files.
+        PathTableLBAs = {}
+
+        for Tree in Trees:
+            PathTableLBAs[Tree] = Next
+            Next += Sectors(len(self.PathTable(Tree)))
+
+        self.FileLBAs = dict(((id(Current), Name), 0) for Current in self.Directories for Name in Current.Files)
+
+        for Tree in Trees:
+            for Current in self.Directories:
+                Current.Size[Tree] = len(self.DirectoryData(Current, Tree))
+
+            for Current in self.DiscOrder:
+                Current.LBA[Tree] = Next
+                Next += Sectors(Current.Size[Tree])
+
+        for Current in self.Directories:
+            for Name, Data in sorted(Current.Files.items()):
+                self.FileLBAs[id(Current), Name] = Next
+                Next += Sectors(len(Data))
+
+        Image = bytearray(Next * BlockSize)
+
+        for Number, Tree in enumerate(Trees):
+            Image[(16 + Number) * BlockSize:(17 + Number) * BlockSize] = self.Descriptor(1 if Tree == "primary" else 2, Tree, Next, PathTableLBAs[Tree])
+            Table = self.PathTable(Tree)
+            Image[PathTableLBAs[Tree] * BlockSize:PathTableLBAs[Tree] * BlockSize + len(Table)] = Table
+
+            for Current in self.Directories:
+                Data = self.DirectoryData(Current, Tree)
+                Image[Current.LBA[Tree] * BlockSize:Current.LBA[Tree] * BlockSize + len(Data)] = Data
+
+        Image[(17 + len(Trees) - 1) * BlockSize:(18 + len(Trees) - 1) * BlockSize] = bytearray(b"\xffCD001\x01".ljust(BlockSize, b"\0"))
+
+        for Current in self.Directories:
+            for Name, Data in Current.Files.items():
+                LBA = self.FileLBAs[id(Current), Name]
+                Image[LBA * BlockSize:LBA * BlockSize + len(Data)] = Data
+
+        return bytes(Image)
+
+def MakeImage(Path, Files, Joliet=False, RockRidge=False, ScatterDirectories=False):
+    """Write an image with the given files (a dictionary of {path: data}) on it to Path"""
+    with open(Path, "wb") as File:
+        File.write(Builder(Files, Joliet, RockRidge, ScatterDirectories).Build())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Test Support for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import sys
+import os
+import time
+import socket
+import select
+import re
+import threading
+import collections
+import subprocess
+import hashlib
+import json
+import mmap
+import struct
+import heapq
+import fnmatch
+import itertools
+import logging
+import errno
+import fcntl
+
+try:
+    import xml.etree.cElementTree as ElementTree
+
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+
+try:
+    import Queue
+
+except ImportError:
+    import queue as Queue
+
+try:
+    from os import scandir
+
+except ImportError:
+    try:
+        from scandir import scandir
+
+    except ImportError:
+        scandir = None
+
+try:
+    unicode
+
+except NameError:
+    #The packages are written for Python 2, so give them unicode() on Python 3.
+    import builtins
+    builtins.unicode = str
+
+#The directory the tests are in, and the top of the source tree.
+TestsDir = os.path.dirname(os.path.abspath(__file__))
+SourceDir = os.path.dirname(TestsDir)
+sys.path.insert(0, SourceDir)
+
+import GetDevInfo
+import Tools
+
+logger = logging.getLogger("Wine Autostart")
+logger.addHandler(logging.NullHandler())
+
+#Setup custom-made modules the same way WineAutostart.py does (make global variables accessible inside the packages).
+GetDevInfo.getdevinfo.subprocess = subprocess
+GetDevInfo.getdevinfo.os = os
+GetDevInfo.getdevinfo.logger = logger
+GetDevInfo.getdevinfo.ElementTree = ElementTree
+
+Tools.tools.subprocess = subprocess
+Tools.tools.logger = logger
+Tools.tools.os = os
+Tools.tools.time = time
+Tools.tools.socket = socket
+Tools.tools.select = select
+Tools.tools.re = re
+Tools.tools.threading = threading
+Tools.tools.collections = collections
+Tools.tools.scandir = scandir
+Tools.tools.hashlib = hashlib
+Tools.tools.json = json
+Tools.tools.Queue = Queue
+Tools.tools.mmap = mmap
+Tools.tools.struct = struct
+Tools.tools.heapq = heapq
+Tools.tools.fnmatch = fnmatch
+Tools.tools.itertools = itertools
+Tools.tools.iso9660 = Tools.iso9660
+Tools.tools.errno = errno
+Tools.tools.fcntl = fcntl
+Tools.tools.SharedLock = threading.Lock()
+
+Tools.iso9660.os = os
+Tools.iso9660.mmap = mmap
+Tools.iso9660.struct = struct
+Tools.iso9660.logger = logger
+
+Tools.ipc.json = json
+Tools.ipc.threading = threading
+Tools.ipc.Future = Tools.tools.Future
+Tools.ipc.os = os
+Tools.ipc.socket = socket
+Tools.ipc.logger = logger
+
+def GetDataPath(*Parts):
+    """Return the path to a file in the tests directory"""
+    return os.path.join(TestsDir, *Parts)
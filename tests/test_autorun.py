@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Autorun Parser Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import io
+import json
+import sys
+import shutil
+import tempfile
+import unittest
+
+from . import support
+from Tools.tools import Main as BackendTools
+from Tools.tools import PathIndex
+
+#Begin Autorun Tests.
+class AutorunTests(unittest.TestCase):
+    """Check the autorun.inf parser against the files in tests/autorun, and what expected.json says each one means"""
+    def setUp(self):
+        """Load what each file in the corpus should be parsed as"""
+        with io.open(support.GetDataPath("autorun", "expected.json"), "r", encoding="utf-8") as File:
+            self.Expected = json.load(File)
+
+        self.TempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary files"""
+        shutil.rmtree(self.TempDir)
+
+    def testCorpusIsComplete(self):
+        """Every file in the corpus has an entry in expected.json, and vice versa"""
+        Files = [Name for Name in os.listdir(support.GetDataPath("autorun")) if Name.endswith(".inf")]
+        self.assertEqual(sorted(Files), sorted(self.Expected.keys()))
+
+    def testReadAutorunFile(self):
+        """ReadAutorunFile() finds the section, action, exe file, arguments, icon, label and encoding of each file"""
+        for Name, Expected in self.Expected.items():
+            Info = BackendTools().ReadAutorunFile(support.GetDataPath("autorun", Name))
+
+            for Key in ("Section", "Action", "Exe", "Args", "Icon", "Label", "Encoding"):
+                self.assertEqual(Info[Key], Expected[Key], Name+": "+Key+" is "+repr(Info[Key])+", not "+repr(Expected[Key]))
+
+    def testParseAutorunFile(self):
+        """ParseAutorunFile() returns the exe file each file runs (adding .exe if there's no extension), or None if it doesn't run one"""
+        for Name, Expected in self.Expected.items():
+            self.assertEqual(BackendTools().ParseAutorunFile(support.GetDataPath("autorun", Name)), Expected["Result"], Name)
+
+    def testOnlyReadsMaxSize(self):
+        """Only the first MaxSize bytes are used, and a line cut off at the end is ignored"""
+        Path = os.path.join(self.TempDir, "autorun.inf")
+
+        with open(Path, "wb") as File:
+            File.write(b"[autorun]\r\nlabel=Big\r\n" + b"; padding\r\n" * 7000 + b"open=setup.exe\r\n")
+
+        Info = BackendTools().ReadAutorunFile(Path)
+        self.assertEqual(Info["Label"], "Big")
+        self.assertEqual(Info["Exe"], None)
+
+        #A line cut in half by the limit isn't used.
+        with open(Path, "wb") as File:
+            File.write(b"[autorun]\r\nopen=setup.exe\r\n")
+
+        self.assertEqual(BackendTools().ReadAutorunFile(Path, MaxSize=22)["Exe"], None)
+        self.assertEqual(BackendTools().ReadAutorunFile(Path, MaxSize=28)["Exe"], "setup.exe")
+
+    def testNonASCIITargetResolves(self):
+        """An autorun file that runs a file with a non-ASCII name finds it on the disc (the path has to stay unicode, like the mount point and the path index)"""
+        try:
+            "Setüp.exe".encode(sys.getfilesystemencoding())
+
+        except UnicodeEncodeError:
+            self.skipTest("The filesystem encoding ("+sys.getfilesystemencoding()+") can't represent non-ASCII names")
+
+        MountPoint = os.path.join(unicode(self.TempDir), "disc")
+        os.makedirs(os.path.join(MountPoint, "sub"))
+        open(os.path.join(MountPoint, "sub", "setüp.EXE"), "wb").close()
+        shutil.copy(support.GetDataPath("autorun", "non-ascii-target.inf"), os.path.join(MountPoint, "autorun.inf"))
+
+        ExeFile = BackendTools().ParseAutorunFile(os.path.join(MountPoint, "autorun.inf"))
+        self.assertEqual(ExeFile, "SUB/Setüp.exe")
+        self.assertEqual(PathIndex(MountPoint).Resolve(ExeFile, MountPoint), os.path.join(MountPoint, "sub", "setüp.EXE"))
+
+    def testSplitAutorunCommand(self):
+        """Commands are split into the program and its arguments, with or without quotes"""
+        Split = BackendTools().SplitAutorunCommand
+        self.assertEqual(Split('"My Setup\\setup.exe" /q'), ("My Setup/setup.exe", "/q"))
+        self.assertEqual(Split("My Setup\\setup.exe /q"), ("My Setup/setup.exe", "/q"))
+        self.assertEqual(Split("setup"), ("setup", None))
+        self.assertEqual(Split("launcher --fast"), ("launcher", "--fast"))
+        self.assertEqual(Split('""'), (None, None))
+
+#End Autorun Tests.
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Control Socket Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import json
+import socket
+import shutil
+import tempfile
+import unittest
+
+from . import support
+from Tools.ipc import ControlServer, CONTROL_VERSION, MAX_REQUEST_SIZE
+
+def Handle(Request):
+    """Answer Status requests, refuse Rescan requests for unknown drives, and fail on Crash requests"""
+    if Request["Command"] == "Status":
+        return {"RunningBackend": True}
+
+    elif Request["Command"] == "Rescan":
+        raise ValueError("Unknown drive: "+Request.get("Device", ""))
+
+    elif Request["Command"] == "Crash":
+        raise KeyError("Crash")
+
+    raise ValueError("Unknown command: "+Request["Command"])
+
+#Begin Control Socket Tests.
+class ControlSocketTests(unittest.TestCase):
+    """Check the control socket's requests and responses"""
+    def setUp(self):
+        """Start a control server in a temporary directory"""
+        self.TempDir = tempfile.mkdtemp()
+        self.Path = os.path.join(self.TempDir, "wineautostart", "control.sock")
+        self.Server = ControlServer(self.Path, Handle)
+        self.Connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.Connection.connect(self.Path)
+        self.Input = self.Connection.makefile("rb")
+
+    def tearDown(self):
+        """Disconnect, and stop the server"""
+        self.Input.close()
+        self.Connection.close()
+        self.Server.Close()
+        shutil.rmtree(self.TempDir)
+
+    def Request(self, Line):
+        """Send a raw request line, and return the decoded response"""
+        self.Connection.sendall(Line+b"\n")
+        return json.loads(self.Input.readline().decode("utf-8"))
+
+    def testRequests(self):
+        """Requests are answered in order with their IDs, and refused requests and errors are reported without closing the connection"""
+        self.assertEqual(self.Request(b'{"Command": "Status", "ID": 7}'), {"Version": CONTROL_VERSION, "ID": 7, "OK": True, "Result": {"RunningBackend": True}})
+        self.assertEqual(self.Request(b'{"Command": "Rescan", "Device": "/dev/sr9", "ID": "a"}'), {"Version": CONTROL_VERSION, "ID": "a", "OK": False, "Error": "Unknown drive: /dev/sr9"})
+        self.assertEqual(self.Request(b'{"Command": "Crash"}')["Error"][:15], "Internal error:")
+        self.assertEqual(self.Request(b'not json')["Error"], "Invalid JSON")
+        self.assertEqual(self.Request(b'["Status"]')["Error"], "Requests must be objects with a Command")
+        self.assertEqual(self.Request(b'{"Command": "Status"}')["OK"], True)
+
+    def testTooLong(self):
+        """Requests that are too long are refused, and the client is disconnected"""
+        self.assertEqual(self.Request(b" " * (MAX_REQUEST_SIZE + 10))["Error"], "Request too long")
+        self.assertEqual(self.Input.readline(), b"")
+
+    def testPermissions(self):
+        """Only this user can use the socket"""
+        self.assertEqual(os.stat(self.Path).st_mode & 0o777, 0o600)
+        self.assertEqual(os.stat(os.path.dirname(self.Path)).st_mode & 0o777, 0o700)
+
+    def testOneInstance(self):
+        """A second server can't take over a socket that's in use, but can replace one that was left behind"""
+        self.assertRaises(socket.error, ControlServer, self.Path, Handle)
+
+        #Leave a stale socket behind, like a crashed instance would.
+        self.Server.Close()
+        Stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        Stale.bind(self.Path)
+        Stale.close()
+
+        self.Server = ControlServer(self.Path, Handle)
+        Connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        Connection.connect(self.Path)
+        Connection.close()
+
+#End Control Socket Tests.
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Device Event Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import errno
+import socket
+import unittest
+
+from . import support
+from Tools.tools import DeviceEventMonitor, DeviceInfoCache
+
+#Begin Fake Socket.
+class FakeSocket():
+    """Stands in for the netlink socket, returning each of Replies in turn (raising the exceptions), and then EAGAIN"""
+    def __init__(self, Replies):
+        """Set up the socket"""
+        self.Replies = list(Replies)
+        self.Closed = False
+
+    def recv(self, Size, Flags):
+        """Return or raise the next reply"""
+        Reply = self.Replies.pop(0) if self.Replies != [] else socket.error(errno.EAGAIN, "Resource temporarily unavailable")
+
+        if isinstance(Reply, Exception):
+            raise Reply
+
+        return Reply
+
+    def close(self):
+        """Close the socket"""
+        self.Closed = True
+
+#End Fake Socket.
+def Uevent(Action, Name, *Extra):
+    """Build a uevent message for the block device Name"""
+    return b"\0".join([(Action+"@/devices/virtual/block/"+Name).encode("utf-8"), ("ACTION="+Action).encode("utf-8"), b"SUBSYSTEM=block", ("DEVNAME="+Name).encode("utf-8")] + [Field.encode("utf-8") for Field in Extra])
+
+def MakeMonitor(Devices, Replies):
+    """Make an event monitor that reads Replies instead of real uevents"""
+    Monitor = DeviceEventMonitor(Devices)
+    Monitor.Close()
+    Monitor.Socket = FakeSocket(Replies)
+    return Monitor
+
+#Begin Device Event Tests.
+class DeviceEventTests(unittest.TestCase):
+    """Check how uevents are read, and what happens when some are lost"""
+    def testReadEvents(self):
+        """Events are reported for the devices we're monitoring, and the others are ignored"""
+        Monitor = MakeMonitor(["/dev/sr0"], [Uevent("change", "sr0", "DISK_EJECT_REQUEST=1"), Uevent("change", "sr1", "DISK_MEDIA_CHANGE=1"), Uevent("change", "sr0", "DISK_MEDIA_CHANGE=1")])
+        self.assertEqual(Monitor.ReadEvents(), [("eject", "/dev/sr0"), ("media-change", "/dev/sr0")])
+        self.assertEqual(Monitor.ReadEvents(), [])
+        self.assertTrue(Monitor.Available())
+
+    def testOverflow(self):
+        """If the kernel drops events, an overflow is reported once, and the events after it are still read"""
+        Overflow = socket.error(errno.ENOBUFS, "No buffer space available")
+        Monitor = MakeMonitor(None, [Overflow, Uevent("add", "sdb"), Overflow])
+        self.assertEqual(Monitor.ReadEvents(), [("overflow", None), ("add", "/dev/sdb")])
+        self.assertTrue(Monitor.Available())
+
+    def testOtherErrors(self):
+        """Other errors stop the monitor listening, so the caller polls instead, and are reported as an overflow"""
+        Monitor = MakeMonitor(None, [socket.error(errno.EBADF, "Bad file descriptor")])
+        Socket = Monitor.Socket
+        self.assertEqual(Monitor.ReadEvents(), [("overflow", None)])
+        self.assertTrue(Socket.Closed)
+        self.assertFalse(Monitor.Available())
+
+    def testCacheOverflow(self):
+        """The device information cache is thrown away if events were lost, as devices might have been added or removed"""
+        Cache = DeviceInfoCache(lambda: {"/dev/sr0": {}})
+        Cache.EventMonitor.Close()
+        Cache.EventMonitor.Socket = FakeSocket([])
+        self.assertEqual(Cache.Request().Result(5), {"/dev/sr0": {}})
+        self.assertEqual(Cache.Get(), {"/dev/sr0": {}})
+
+        Cache.EventMonitor.Socket = FakeSocket([socket.error(errno.ENOBUFS, "No buffer space available")])
+        self.assertEqual(Cache.Get(), None)
+        Cache.Close()
+
+#End Device Event Tests.
+if __name__ == "__main__":
+    unittest.main()
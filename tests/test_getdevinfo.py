@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Device Information Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import io
+import unittest
+
+from . import support
+import GetDevInfo
+
+try:
+    from bs4 import BeautifulSoup
+
+except ImportError:
+    BeautifulSoup = None
+
+#What both lshw captures should give.
+ExpectedList = {"/dev/cdrom": {"Name": "/dev/cdrom", "Vendor": "MATSHITA", "Product": "DVD-RAM UJ8E2", "Description": "DVD-RAM writer"}, "/dev/sr1": {"Name": "/dev/sr1", "Vendor": "Unknown", "Product": "VBOX CD-ROM", "Description": "DVD reader"}}
+ExpectedRoots = {"/dev/cdrom": {"Name": "/dev/cdrom", "Vendor": "HL-DT-ST", "Product": "DVDRAM GH24NS95", "Description": "DVD writer"}}
+
+def ParseWithBeautifulSoup(Data):
+    """Parse lshw's output the way Wine Autostart did before it streamed it with ElementTree"""
+    DiskInfo = {}
+    Output = BeautifulSoup(Data, "html.parser")
+
+    if Output.list == None:
+        ListOfDevices = Output.children
+
+    else:
+        ListOfDevices = Output.list.children
+
+    for Node in ListOfDevices:
+        if Node.name == None:
+            continue
+
+        HostDisk = unicode(Node.logicalname.string)
+
+        if "/dev/sr" not in HostDisk and "/dev/cdrom" not in HostDisk and "/dev/dvd" not in HostDisk:
+            continue
+
+        DiskInfo[HostDisk] = {"Name": HostDisk, "Description": unicode(Node.description.string)}
+
+        for Key in ("Vendor", "Product"):
+            try:
+                DiskInfo[HostDisk][Key] = unicode(getattr(Node, Key.lower()).string)
+
+            except AttributeError:
+                DiskInfo[HostDisk][Key] = "Unknown"
+
+    return DiskInfo
+
+#Begin Device Information Tests.
+class GetDevInfoTests(unittest.TestCase):
+    """Check that lshw's output is parsed into the right disk information"""
+    def setUp(self):
+        """Start with no disk information"""
+        GetDevInfo.getdevinfo.DiskInfo = {}
+
+    def Parse(self, Name):
+        """Parse one of the lshw captures, and return the disk information"""
+        with open(support.GetDataPath("lshw", Name), "rb") as File:
+            GetDevInfo.getdevinfo.Main().ParseLshwOutput(File)
+
+        return GetDevInfo.getdevinfo.DiskInfo
+
+    def testList(self):
+        """Optical drives are found in a list of devices, and other disks and their volumes are ignored"""
+        self.assertEqual(self.Parse("list.xml"), ExpectedList)
+
+    def testRootNodes(self):
+        """Optical drives are found when older versions of lshw output several root nodes instead of a list"""
+        self.assertEqual(self.Parse("roots.xml"), ExpectedRoots)
+
+    def testTruncated(self):
+        """A drive that was read before lshw's output was cut off is kept, and the error is raised"""
+        with open(support.GetDataPath("lshw", "list.xml"), "rb") as File:
+            Data = File.read()
+
+        Data = Data[:Data.index(b"<node id=\"disk:1\"")]
+
+        self.assertRaises(SyntaxError, GetDevInfo.getdevinfo.Main().ParseLshwOutput, io.BytesIO(Data))
+
+        self.assertEqual(GetDevInfo.getdevinfo.DiskInfo, {"/dev/cdrom": ExpectedList["/dev/cdrom"]})
+
+    @unittest.skipIf(BeautifulSoup == None, "BeautifulSoup isn't installed")
+    def testMatchesBeautifulSoup(self):
+        """The streaming parser finds the same drives as the BeautifulSoup parser it replaced"""
+        for Name in ("list.xml", "roots.xml"):
+            with open(support.GetDataPath("lshw", Name), "rb") as File:
+                Expected = ParseWithBeautifulSoup(File.read())
+
+            GetDevInfo.getdevinfo.DiskInfo = {}
+            self.assertEqual(self.Parse(Name), Expected)
+
+#End Device Information Tests.
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Indicator Message Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import json
+import unittest
+
+from . import support
+from Tools.ipc import Channel, PROTOCOL_VERSION
+
+#Begin Channel Tests.
+class ChannelTests(unittest.TestCase):
+    """Check the messages between Wine Autostart and its indicator, through a pair of pipes"""
+    def setUp(self):
+        """Connect two channels together"""
+        ToIndicator, FromMain = os.pipe()
+        ToMain, FromIndicator = os.pipe()
+        self.Main = Channel(os.fdopen(ToMain, "rb"), os.fdopen(FromMain, "wb"))
+        self.Indicator = Channel(os.fdopen(ToIndicator, "rb"), os.fdopen(FromIndicator, "wb"))
+
+    def tearDown(self):
+        """Close the pipes"""
+        for Side in (self.Main, self.Indicator):
+            for File in (Side.Input, Side.Output):
+                if File.closed == False:
+                    File.close()
+
+    def testFraming(self):
+        """Each message is read with its fields, version, type and a new ID"""
+        self.Main.Send("SetStatus", Status="Checking for disk...")
+        self.Main.Send("Quit")
+
+        self.assertEqual(self.Indicator.ReadMessage(), {"Version": PROTOCOL_VERSION, "Type": "SetStatus", "ID": 1, "Status": "Checking for disk..."})
+        self.assertEqual(self.Indicator.ReadMessage(), {"Version": PROTOCOL_VERSION, "Type": "Quit", "ID": 2})
+
+    def testAcknowledge(self):
+        """Acknowledgements complete the sender's futures (with the error, if any), and aren't returned as messages"""
+        First = self.Main.Send("StartBackend")
+        Second = self.Main.Send("StopBackend")
+        self.Indicator.Acknowledge(self.Indicator.ReadMessage())
+        self.Indicator.Acknowledge(self.Indicator.ReadMessage(), Error="Couldn't stop")
+        self.Indicator.Send("Quit")
+
+        self.assertEqual(self.Main.ReadMessage()["Type"], "Quit")
+        self.assertTrue(First.IsDone())
+        self.assertEqual(First.Result(), None)
+        self.assertEqual(Second.Result(), "Couldn't stop")
+
+    def testOtherLines(self):
+        """Lines that aren't messages, and messages from another version of the protocol, are returned so they can be logged"""
+        self.Indicator.Output.write(b"(indicator:123): Gtk-WARNING **: cannot open display\n\n")
+        self.Indicator.Output.write((json.dumps({"Version": PROTOCOL_VERSION + 1, "Type": "SetStatus", "ID": 1})+"\n").encode("ascii"))
+        self.Indicator.Output.flush()
+
+        self.assertEqual(self.Main.ReadMessage(), {"Type": "Text", "Text": "(indicator:123): Gtk-WARNING **: cannot open display"})
+        self.assertEqual(self.Main.ReadMessage()["Type"], "Unsupported")
+
+    def testOtherEndGone(self):
+        """When the other end goes away, reading returns None, and messages that weren't acknowledged fail"""
+        Result = self.Main.Send("SetStatus", Status="Stopped.")
+        self.Indicator.Output.close()
+
+        self.assertEqual(self.Main.ReadMessage(), None)
+        self.assertRaises(IOError, Result.Result)
+
+#End Channel Tests.
+if __name__ == "__main__":
+    unittest.main()
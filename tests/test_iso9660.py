@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ISO9660 Reader Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import shutil
+import tempfile
+import unittest
+
+from . import support
+from . import isoimage
+from Tools.iso9660 import Image
+from Tools.tools import Main as BackendTools
+from Tools.tools import ScanResult
+
+#The files on the test images.
+Files = {"Setup.exe": b"MZ" * 10, "Data/Long File.cab": b"x" * 5000, "Data/Sub/Read Me.txt": b"hi", "Other/Empty.txt": b""}
+
+#Add enough files to one directory that it takes up more than one sector.
+for Number in range(100):
+    Files["Big/File "+unicode(Number)+".dat"] = b"y"
+
+#Begin ISO9660 Reader Tests.
+class Iso9660Tests(unittest.TestCase):
+    """Check reading the directory tree of ISO9660 images, with each kind of names"""
+    def setUp(self):
+        """Make a directory for the images"""
+        self.TempDir = tempfile.mkdtemp()
+        self.Path = os.path.join(self.TempDir, "disc.iso")
+
+    def tearDown(self):
+        """Remove the images"""
+        shutil.rmtree(self.TempDir)
+
+    def Walk(self, Order=None, **Options):
+        """Make an image with the given options, and return (naming, {path: (is directory, size)}, the image) after walking it"""
+        isoimage.MakeImage(self.Path, Files, **Options)
+        Disc = Image(self.Path)
+
+        try:
+            Entries = dict((Item.Path, (Item.IsDirectory, Item.Size)) for Batch in Disc.Walk(Order(Disc) if Order != None else None) for Item in Batch)
+
+        finally:
+            Disc.Close()
+
+        return Disc.Naming, Entries, Disc
+
+    def Expected(self, Convert):
+        """Return the {path: (is directory, size)} we expect, with Convert applied to each name"""
+        Expected = {}
+
+        for Path, Data in Files.items():
+            Parts = [Convert(Part) for Part in Path.split("/")]
+            Expected["/".join(Parts)] = (False, len(Data))
+
+            for Number in range(1, len(Parts)):
+                Expected["/".join(Parts[:Number])] = (True, 0)
+
+        return Expected
+
+    def testPlainNames(self):
+        """Without extensions, names are lowercased like the kernel does, and multi-sector directories are read completely"""
+        Naming, Entries, Disc = self.Walk()
+        self.assertEqual(Naming, "iso9660")
+        self.assertEqual(Entries, self.Expected(lambda Name: Name.lower().replace(" ", "_")))
+
+    def testJoliet(self):
+        """Joliet names keep their case and spaces"""
+        Naming, Entries, Disc = self.Walk(Joliet=True)
+        self.assertEqual(Naming, "joliet")
+        self.assertEqual(Entries, self.Expected(lambda Name: Name))
+
+    def testRockRidge(self):
+        """Rock Ridge names are preferred over Joliet names, like the kernel does"""
+        Naming, Entries, Disc = self.Walk(Joliet=True, RockRidge=True)
+        self.assertEqual(Naming, "rockridge")
+        self.assertEqual(Entries, self.Expected(lambda Name: Name))
+
+    def testReadOrder(self):
+        """Reading directories in order of where they are on the disc gives the same entries as path table order, but seeks much less"""
+        Naming, ByPosition, Disc = self.Walk(ScatterDirectories=True)
+        PositionSeek = Disc.SeekDistance
+
+        Naming, ByPathTable, Disc = self.Walk(lambda Disc: Disc.GetPathTableOrder, ScatterDirectories=True)
+        self.assertEqual(ByPosition, ByPathTable)
+        self.assertTrue(PositionSeek < Disc.SeekDistance)
+
+    def testCancel(self):
+        """Walking stops, and is marked as truncated, when it's cancelled"""
+        isoimage.MakeImage(self.Path, Files)
+        Disc = Image(self.Path)
+        Batches = list(Disc.Walk(Cancelled=lambda: True))
+        Disc.Close()
+
+        self.assertTrue(Disc.Truncated)
+        self.assertEqual([Item for Batch in Batches for Item in Batch if Item.IsDirectory == False], [])
+
+    def testStreaming(self):
+        """Each directory's entries are yielded as soon as it's read, after its parent's, in whatever order the directories are read"""
+        isoimage.MakeImage(self.Path, Files, ScatterDirectories=True)
+        Disc = Image(self.Path)
+
+        try:
+            Seen = set([""])
+
+            for Batch in Disc.Walk():
+                #Everything in a batch is in the same directory, which must have been listed already.
+                Parents = set(Item.Path.rpartition("/")[0] for Item in Batch)
+                self.assertEqual(len(Parents), 1)
+                self.assertTrue(Parents.issubset(Seen))
+                Seen.update(Item.Path for Item in Batch if Item.IsDirectory)
+
+        finally:
+            Disc.Close()
+
+        self.assertEqual(Seen, set([""]) | set(Path for Path, (IsDirectory, Size) in self.Expected(lambda Name: Name.lower().replace(" ", "_")).items() if IsDirectory))
+
+    def testScanImage(self):
+        """Scanning an image yields the exe files in each directory as it's read, and fills in the whole result"""
+        isoimage.MakeImage(self.Path, dict(Files, **{"Data/Sub/Game.exe": b"MZ", "Data/Setup.exe.txt": b"no"}), Joliet=True)
+        Result = ScanResult("/media/disc")
+        Batches = [ExeFiles for ExeFiles in BackendTools().IterScanImage(self.Path, "/media/disc", Result) if ExeFiles != []]
+
+        self.assertEqual(Batches, [["/media/disc/Setup.exe"], ["/media/disc/Data/Sub/Game.exe"]])
+        self.assertEqual(sorted(Result.ExeFiles), sorted(Batches[0] + Batches[1]))
+        self.assertEqual(Result.Sizes["/media/disc/Setup.exe"], 20)
+        self.assertTrue(Result.IsComplete())
+
+    def testSameAsMounted(self):
+        """Scanning an image finds the same exe files as scanning the same files on a mounted filesystem"""
+        MountPoint = os.path.join(self.TempDir, "mounted")
+        Tree = dict(Files, **{"Data/Sub/Game.EXE": b"MZ", "Data/Setup.exe.txt": b"no", "Other/exe": b"no"})
+        isoimage.MakeImage(self.Path, Tree, Joliet=True)
+
+        for Path, Data in Tree.items():
+            if os.path.isdir(os.path.dirname(os.path.join(MountPoint, Path))) == False:
+                os.makedirs(os.path.dirname(os.path.join(MountPoint, Path)))
+
+            with open(os.path.join(MountPoint, Path), "wb") as File:
+                File.write(Data)
+
+        Expected = sorted(os.path.join(MountPoint, Path) for Path in ("Setup.exe", "Data/Sub/Game.EXE"))
+        self.assertEqual(sorted(BackendTools().ScanImage(self.Path, MountPoint).ExeFiles), Expected)
+        self.assertEqual(sorted(BackendTools().ScanDisc(MountPoint).ExeFiles), Expected)
+
+    def testNotISO9660(self):
+        """Files that aren't ISO9660 are rejected"""
+        with open(self.Path, "wb") as File:
+            File.write(b"\0" * 40960)
+
+        self.assertRaises(ValueError, Image, self.Path)
+
+#End ISO9660 Reader Tests.
+if __name__ == "__main__":
+    unittest.main()
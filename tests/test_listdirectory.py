@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Directory Listing Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from . import support
+import Tools.tools
+from Tools.tools import DirectoryLister, Main
+
+#Begin Directory Listing Tests.
+class ListDirectoryTests(unittest.TestCase):
+    """Check listing directories with a stall timeout"""
+    def setUp(self):
+        """Make a few directories to list"""
+        self.TempDir = tempfile.mkdtemp()
+
+        for Number in range(20):
+            os.mkdir(os.path.join(self.TempDir, "dir"+unicode(Number)))
+
+            with open(os.path.join(self.TempDir, "dir"+unicode(Number), "setup.exe"), "w") as File:
+                File.write("MZ")
+
+    def tearDown(self):
+        """Remove the directories"""
+        shutil.rmtree(self.TempDir)
+
+    def testSameEntries(self):
+        """Listing with a timeout gives the same entries as listing directly, and errors are raised in the caller"""
+        Lister = DirectoryLister()
+
+        for Limit in (None, 5):
+            self.assertEqual(sorted(Lister.List(self.TempDir, Limit, 5)), sorted(Main().ListDirectory(self.TempDir, Limit)))
+
+        self.assertRaises(OSError, Lister.List, os.path.join(self.TempDir, "missing"), None, 5)
+
+    def testReusesThread(self):
+        """Directories are listed in the same thread one after the other, rather than starting a thread for each one"""
+        Lister = DirectoryLister()
+
+        for Number in range(20):
+            self.assertEqual(Lister.List(os.path.join(self.TempDir, "dir"+unicode(Number)), None, 5)[0][0], "setup.exe")
+
+        self.assertEqual(Lister.Threads, 1)
+
+    def testStall(self):
+        """A directory that takes too long to read is given up on, and the next one is read in a new thread while the stuck one finishes"""
+        Lister = DirectoryLister()
+        Stalled = os.path.join(self.TempDir, "dir0")
+        Release = threading.Event()
+        OriginalListDirectory = Main.ListDirectory
+
+        def ListDirectory(self, Path, Limit=None, Timeout=None):
+            """Stall while reading the stalled directory, until the test lets it finish"""
+            if Path == Stalled:
+                Release.wait(10)
+
+            return OriginalListDirectory(self, Path, Limit, Timeout)
+
+        Main.ListDirectory = ListDirectory
+
+        try:
+            self.assertEqual(Lister.List(Stalled, None, 0.2), None)
+            self.assertEqual(Lister.List(os.path.join(self.TempDir, "dir1"), None, 5)[0][0], "setup.exe")
+            self.assertEqual(Lister.Threads, 2)
+
+            #Once the stuck read finishes, its thread is used again.
+            Release.set()
+
+            for Number in range(2, 20):
+                Lister.List(os.path.join(self.TempDir, "dir"+unicode(Number)), None, 5)
+
+            self.assertEqual(Lister.Threads, 2)
+
+        finally:
+            Release.set()
+            Main.ListDirectory = OriginalListDirectory
+
+    @unittest.skipIf(Tools.tools.scandir == None, "scandir isn't available")
+    def testClosesDirectory(self):
+        """The directory is closed straight away, even when we stop reading it early"""
+        Closed = []
+        OriginalScandir = Tools.tools.scandir
+
+        class Entries(object):
+            """Wrap a scandir iterator, and record when it's closed"""
+            def __init__(self, Path):
+                """Start reading the directory"""
+                self.Entries = OriginalScandir(Path)
+
+            def __iter__(self):
+                """Iterate over the entries"""
+                return iter(self.Entries)
+
+            def close(self):
+                """Close the directory"""
+                Closed.append(True)
+                self.Entries.close()
+
+        Tools.tools.scandir = Entries
+
+        try:
+            for Limit in (None, 5):
+                Main().ListDirectory(self.TempDir, Limit)
+
+        finally:
+            Tools.tools.scandir = OriginalScandir
+
+        self.assertEqual(Closed, [True, True])
+
+#End Directory Listing Tests.
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mount Table Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import threading
+import unittest
+
+from . import support
+from Tools.tools import MountTable
+
+#Mounts a tmpfs in a private mount namespace (see testSelectUsesUpNotification), and reports what the mount table index saw.
+NamespaceScript = """
+import json, os, select, subprocess, sys, tempfile
+sys.path.insert(0, %r)
+from tests import support
+from Tools.tools import MountTable
+
+Table = MountTable()
+Dir = tempfile.mkdtemp()
+subprocess.check_call(["mount", "-t", "tmpfs", "/dev/wineautostart-test", Dir])
+Result = {"Exceptional": select.select([], [], [Table], 5)[2] != []}
+Result["Changed"] = Table.Changed()
+Result["Before"] = Table.GetMountPoint("/dev/wineautostart-test")
+Table.Rebuild()
+Result["After"] = Table.GetMountPoint("/dev/wineautostart-test")
+Result["Dir"] = Dir
+subprocess.check_call(["umount", Dir])
+os.rmdir(Dir)
+print(json.dumps(Result))
+"""
+
+#Begin Mount Table Tests.
+class MountTableTests(unittest.TestCase):
+    """Check the mount table index"""
+    def setUp(self):
+        """Make a directory for a fake mount table"""
+        self.TempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the fake mount table"""
+        shutil.rmtree(self.TempDir)
+
+    def testIndex(self):
+        """Mount points and filesystem types are found for block devices, with escaped characters undone, keeping the first mount of each device"""
+        Path = os.path.join(self.TempDir, "mountinfo")
+
+        with open(Path, "w") as File:
+            File.write("22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw\n")
+            File.write("36 22 11:0 / /media/user/My\\040Disc ro,nosuid shared:2 - iso9660 /dev/sr0 ro\n")
+            File.write("37 22 11:0 / /mnt/again ro shared:3 - iso9660 /dev/sr0 ro\n")
+            File.write("38 22 0:40 / /run/user rw shared:4 - tmpfs tmpfs rw\n")
+            File.write("39 22 0:41 / /mnt/bad rw - \n")
+
+        Table = MountTable(Path)
+        self.assertEqual(Table.GetMountPoint("/dev/sr0"), "/media/user/My Disc")
+        self.assertEqual(Table.GetFSType("/dev/sr0"), "iso9660")
+        self.assertEqual(Table.GetMountPoint("/dev/sda1"), "/")
+        self.assertEqual(Table.GetMountPoint("/dev/sr1"), None)
+        self.assertEqual(Table.GetMountPoint("tmpfs"), None)
+        Table.Close()
+
+    def testConcurrentRebuilds(self):
+        """Rebuilding the index from several threads at once (like the worker pool does) never leaves it incomplete"""
+        Path = os.path.join(self.TempDir, "mountinfo")
+
+        with open(Path, "w") as File:
+            for Number in range(300):
+                File.write("%d 22 8:%d / /media/disc%d ro shared:1 - iso9660 /dev/sr%d ro\n" % (Number + 100, Number, Number, Number))
+
+        Table = MountTable(Path)
+        Missing = []
+
+        def Rebuild():
+            """Rebuild the index, and check every device can still be looked up"""
+            for Round in range(300):
+                Table.Rebuild()
+
+                if Table.GetMountPoint("/dev/sr299") != "/media/disc299" or Table.GetFSType("/dev/sr0") != "iso9660":
+                    Missing.append(Round)
+
+        Threads = [threading.Thread(target=Rebuild) for Number in range(8)]
+
+        for Thread in Threads:
+            Thread.start()
+
+        for Thread in Threads:
+            Thread.join()
+
+        Table.Close()
+        self.assertEqual(Missing, [])
+
+    def testSelectUsesUpNotification(self):
+        """Once select() has reported a change to the mount table, Changed() doesn't see it again, so the backend has to call Rebuild() itself to find the new mount"""
+        try:
+            Output = subprocess.check_output(["unshare", "-rm", sys.executable, "-c", NamespaceScript % support.SourceDir], stderr=subprocess.STDOUT)
+
+        except (OSError, subprocess.CalledProcessError) as Error:
+            self.skipTest("Can't mount a tmpfs in a private mount namespace ("+unicode(Error)+")")
+
+        Result = json.loads(Output.decode("utf-8").strip().split("\n")[-1])
+        self.assertTrue(Result["Exceptional"])
+        self.assertFalse(Result["Changed"])
+        self.assertEqual(Result["Before"], None)
+        self.assertEqual(Result["After"], Result["Dir"])
+
+#End Mount Table Tests.
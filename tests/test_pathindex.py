@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Path Index Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import shutil
+import tempfile
+import unittest
+
+from . import support
+from Tools.tools import PathIndex
+
+#The files on the test disc.
+Files = ["Setup.exe", "AUTORUN.INF", "Data/Install/Game.EXE", "Data/readme.txt", "Other/Setup.exe"]
+
+#Begin Path Index Tests.
+class PathIndexTests(unittest.TestCase):
+    """Check resolving Windows-style paths on a disc"""
+    def setUp(self):
+        """Make a directory to stand in for the disc"""
+        self.MountPoint = tempfile.mkdtemp()
+
+        for Path in Files:
+            FullPath = os.path.join(self.MountPoint, Path)
+
+            if os.path.isdir(os.path.dirname(FullPath)) == False:
+                os.makedirs(os.path.dirname(FullPath))
+
+            with open(FullPath, "w") as File:
+                File.write("MZ")
+
+    def tearDown(self):
+        """Remove the disc"""
+        shutil.rmtree(self.MountPoint)
+
+    def testCase(self):
+        """Paths are matched without regard to case, with either kind of separator"""
+        Index = PathIndex(self.MountPoint)
+        self.assertEqual(Index.Resolve("setup.EXE"), os.path.join(self.MountPoint, "Setup.exe"))
+        self.assertEqual(Index.Resolve("DATA\\install\\game.exe"), os.path.join(self.MountPoint, "Data/Install/Game.EXE"))
+        self.assertEqual(Index.Resolve("data/./Install/../readme.TXT"), os.path.join(self.MountPoint, "Data/readme.txt"))
+
+    def testRelative(self):
+        """Paths are relative to the given directory, unless they start with a separator"""
+        Index = PathIndex(self.MountPoint)
+        Directory = os.path.join(self.MountPoint, "Other")
+        self.assertEqual(Index.Resolve("SETUP.EXE", Directory), os.path.join(self.MountPoint, "Other/Setup.exe"))
+        self.assertEqual(Index.Resolve("\\SETUP.EXE", Directory), os.path.join(self.MountPoint, "Setup.exe"))
+        self.assertEqual(Index.Resolve("..\\Data\\readme.txt", Directory), os.path.join(self.MountPoint, "Data/readme.txt"))
+
+    def testNotFound(self):
+        """Missing files, directories, and paths outside the disc aren't resolved"""
+        Index = PathIndex(self.MountPoint)
+        self.assertEqual(Index.Resolve("missing.exe"), None)
+        self.assertEqual(Index.Resolve("Data\\Missing\\setup.exe"), None)
+        self.assertEqual(Index.Resolve("Setup.exe\\setup.exe"), None)
+        self.assertEqual(Index.Resolve("Data"), None)
+        self.assertEqual(Index.Resolve("..\\Setup.exe"), None)
+        self.assertEqual(Index.Resolve(""), None)
+
+    def testOnlyReadsWhatsNeeded(self):
+        """Only the directories on the way to the file are read, and directories that have been added aren't read again"""
+        Index = PathIndex(self.MountPoint)
+        Index.AddDirectory("", [("Setup.exe", False, 1), ("Data", True, 2)])
+
+        #This isn't on the disc, but it's in the index, so the disc isn't read.
+        Index.AddDirectory("Data", [("Only In Index.exe", False, 3), ("Install", True, 4)])
+        self.assertEqual(Index.Resolve("data\\only in index.exe"), os.path.join(self.MountPoint, "Data/Only In Index.exe"))
+
+        self.assertEqual(Index.Resolve("data\\install\\game.exe"), os.path.join(self.MountPoint, "Data/Install/Game.EXE"))
+        self.assertEqual(Index.Listed, set(["", "data", "data/install"]))
+
+    def testStallTimeout(self):
+        """Directories are still read when a stall timeout is given"""
+        Index = PathIndex(self.MountPoint)
+        self.assertEqual(Index.Resolve("other\\setup.exe", StallTimeout=5), os.path.join(self.MountPoint, "Other/Setup.exe"))
+
+#End Path Index Tests.
+if __name__ == "__main__":
+    unittest.main()
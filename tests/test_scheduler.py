@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Scheduler Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import threading
+import unittest
+
+from . import support
+from Tools.tools import Scheduler
+
+#Begin Scheduler Tests.
+class SchedulerTests(unittest.TestCase):
+    """Check waking up and cancelling the scheduler"""
+    def setUp(self):
+        """Make a scheduler"""
+        self.Scheduler = Scheduler()
+
+    def tearDown(self):
+        """Close the scheduler"""
+        self.Scheduler.Close()
+
+    def testWake(self):
+        """Wait() returns the reasons it was woken for, and they're kept for diagnostics"""
+        self.Scheduler.Wake("media-change")
+        self.Scheduler.Wake("rescan")
+        self.assertEqual(self.Scheduler.Wait(Timeout=5), ["media-change", "rescan"])
+        self.assertEqual([Reasons for Time, Reasons in self.Scheduler.GetDiagnostics()["WakeReasons"]], [["media-change", "rescan"]])
+
+    def testTimeoutNotKept(self):
+        """Timing out isn't kept in the diagnostics, as it happens all the time while software is running"""
+        for Number in range(3):
+            self.assertEqual(self.Scheduler.Wait(Timeout=0), ["timeout"])
+
+        self.assertEqual(self.Scheduler.GetDiagnostics()["WakeReasons"], [])
+
+    def testWakeWhenFull(self):
+        """Waking the scheduler doesn't block when nothing has been waiting for a long time, and every reason is still returned"""
+        Thread = threading.Thread(target=lambda: [self.Scheduler.Wake("event") for Number in range(100000)])
+        Thread.start()
+        Thread.join(10)
+
+        self.assertFalse(Thread.is_alive())
+        self.assertEqual(len(self.Scheduler.Wait(Timeout=5)), 100000)
+
+#End Scheduler Tests.
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Wine Session Tests for Wine Autostart Version 2.0.2
+# This file is part of Wine Autostart.
+# Copyright (C) 2013-2016 Hamish McIntyre-Bhatty
+# Wine Autostart is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# Wine Autostart is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Wine Autostart.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from . import support
+from Tools.tools import Scheduler, WineSession
+
+#Begin Wine Session Tests.
+class WineSessionTests(unittest.TestCase):
+    """Check waiting for software run with Wine, using a fake wine command"""
+    def setUp(self):
+        """Put a fake wine command first in the PATH"""
+        self.TempDir = tempfile.mkdtemp()
+        self.OldPath = os.environ["PATH"]
+        os.environ["PATH"] = self.TempDir+os.pathsep+self.OldPath
+
+    def tearDown(self):
+        """Remove the fake wine command"""
+        os.environ["PATH"] = self.OldPath
+        shutil.rmtree(self.TempDir)
+
+    def FakeWine(self, Script):
+        """Make the fake wine command run the given shell script"""
+        Path = os.path.join(self.TempDir, "wine")
+
+        with open(Path, "w") as File:
+            File.write("#!/bin/sh\n"+Script+"\n")
+
+        os.chmod(Path, 0o755)
+
+    def testWaitUntilExit(self):
+        """Wait() returns as soon as the software exits, rather than at the next check"""
+        self.FakeWine("sleep 0.5")
+        Session = WineSession("setup.exe")
+        Start = time.time()
+        self.assertTrue(Session.Wait(Scheduler=Scheduler()))
+        self.assertTrue(time.time() - Start < 1.5)
+        self.assertFalse(Session.Crashed())
+
+    def testTimeout(self):
+        """Wait() gives up after Timeout seconds if the software is still running"""
+        self.FakeWine("exec sleep 5")
+        Session = WineSession("setup.exe")
+        self.assertFalse(Session.Wait(Timeout=0.2))
+        Session.Process.kill()
+        self.assertTrue(Session.Wait(Timeout=5))
+
+    def testCancel(self):
+        """Cancelling the scheduler stops Wait() straight away, while the software is still running"""
+        self.FakeWine("exec sleep 30")
+        Session = WineSession("setup.exe")
+        Waiter = Scheduler()
+        Results = []
+        Thread = threading.Thread(target=lambda: Results.append(Session.Wait(Scheduler=Waiter)))
+        Thread.start()
+
+        time.sleep(0.3)
+        Start = time.time()
+        Waiter.Cancel()
+        Thread.join(5)
+
+        self.assertEqual(Results, [False])
+        self.assertTrue(time.time() - Start < 1)
+        Session.Process.kill()
+        Session.Process.wait()
+        Waiter.Close()
+
+    def testClose(self):
+        """Close() releases the file descriptors used to wait for a session we've given up on, without stopping the software"""
+        self.FakeWine("exec sleep 30")
+        Session = WineSession("setup.exe")
+        self.assertFalse(Session.Wait(Timeout=0.2))
+
+        Descriptors = [Session.ExitRead, Session.ExitWrite] + list(Session.Pidfds.values())
+        Session.Close()
+
+        for Descriptor in Descriptors:
+            self.assertRaises(OSError, os.fstat, Descriptor)
+
+        self.assertEqual(Session.Process.poll(), None)
+
+        #The process exiting afterwards is still noticed, without closing anything twice.
+        Session.Process.kill()
+        self.assertTrue(Session.Exited.wait(5))
+        self.assertEqual(Session.ExitWrite, None)
+
+#End Wine Session Tests.
+if __name__ == "__main__":
+    unittest.main()